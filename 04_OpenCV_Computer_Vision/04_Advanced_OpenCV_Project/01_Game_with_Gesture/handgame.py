@@ -3,14 +3,21 @@ import mediapipe as mp
 import pyautogui
 import time
 from collections import deque
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[3]))     # repo root, for cv_utils
+from cv_utils import PerfMeter, open_source, source_from_argv
+from cv_utils.hand_tracker import RoiHandTracker
 
 mp_drawing = mp.solutions.drawing_utils
 mp_hands = mp.solutions.hands
 
 class IndexFingerSwipeTracker:
-    def __init__(self, min_detection_confidence=0.7, max_num_hands=1):
-        self.hands = mp_hands.Hands(min_detection_confidence=min_detection_confidence,
-                                    max_num_hands=max_num_hands)
+    def __init__(self, min_detection_confidence=0.7, max_num_hands=1, roi_tracking=True):
+        # Runs on a crop around the last hand; full-frame detection only on loss or every 30 frames
+        self.hands = RoiHandTracker(min_detection_confidence=min_detection_confidence,
+                                    max_num_hands=max_num_hands, tracking=roi_tracking)
         self.last_pos = None
         self.raw_last = None
         self.alpha = 0.6
@@ -20,8 +27,7 @@ class IndexFingerSwipeTracker:
         self.last_trigger = 0
 
     def detect_gesture(self, frame):
-        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        results = self.hands.process(frame_rgb)
+        results = self.hands.process_bgr(frame)
         gesture = None
         hand_landmarks = None
 
@@ -60,10 +66,10 @@ def trigger_key(gesture, tracker):
         pyautogui.press(gesture)
         tracker.last_trigger = now
 
-def run_hand_game(hud=True, trail=True):
-    cap = cv2.VideoCapture(0)
-    tracker = IndexFingerSwipeTracker()
-    fps_prev = 0
+def run_hand_game(hud=True, trail=True, source=0, roi_tracking=True):
+    cap = open_source(source)
+    tracker = IndexFingerSwipeTracker(roi_tracking=roi_tracking)
+    perf = PerfMeter("handgame")
     pts = deque(maxlen=64) if trail else None
 
     instructions = [
@@ -75,8 +81,10 @@ def run_hand_game(hud=True, trail=True):
         ret, frame = cap.read()
         if not ret:
             break
+        perf.lap("capture")
         frame = cv2.flip(frame, 1)
         gesture, landmarks = tracker.detect_gesture(frame)
+        perf.lap("infer")
 
         if landmarks:
             mp_drawing.draw_landmarks(frame, landmarks, mp_hands.HAND_CONNECTIONS,
@@ -93,6 +101,7 @@ def run_hand_game(hud=True, trail=True):
                     cv2.line(frame, pts[i - 1], pts[i], (0, 255, 255), thickness)
 
         if hud:
+            tracker.hands.draw_roi(frame)
             cv2.rectangle(frame, (5, 5), (430, 70), (0, 0, 0), -1)
             y0 = 20
             for line in instructions:
@@ -104,13 +113,13 @@ def run_hand_game(hud=True, trail=True):
                         cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 128, 255), 2)
             trigger_key(gesture, tracker)
 
-        fps_now = time.time()
-        fps = 1 / (fps_now - fps_prev) if fps_prev else 0
-        fps_prev = fps_now
-        cv2.putText(frame, f"FPS: {int(fps)}", (10, 140), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
+        perf.lap("draw")
+        perf.draw(frame, origin=(10, 140), scale=0.7)
 
         cv2.imshow("Gesture Game Controller", frame)
         key = cv2.waitKey(1) & 0xFF
+        perf.lap("display")
+        perf.tick()
         if key == 27 or key == ord('q'):
             break
         elif key == ord('c') and trail:
@@ -118,6 +127,8 @@ def run_hand_game(hud=True, trail=True):
 
     cap.release()
     cv2.destroyAllWindows()
+    tracker.hands.close()
+    perf.close()
 
 if __name__ == '__main__':
-    run_hand_game(hud=True, trail=True)
+    run_hand_game(hud=True, trail=True, source=source_from_argv())
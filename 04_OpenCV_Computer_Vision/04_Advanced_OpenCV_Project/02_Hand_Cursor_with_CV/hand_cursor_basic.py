@@ -2,35 +2,41 @@
 hand_cursor_basic.py
 Air-draw using wrist position tracked by MediaPipe Hands.
 - Left-click style drawing (continuous lines)
-- HUD overlay, FPS counter, clear canvas (c), exit ESC/q
+- HUD overlay, FPS + stage timings (cv_utils.PerfMeter), clear canvas (c), exit ESC/q
+- Hands runs on a crop around the last hand (cv_utils.hand_tracker.RoiHandTracker)
 - Run locally in VSCode/terminal (webcam + GUI required)
 """
 import cv2
 import mediapipe as mp
-import time
 from collections import deque
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[3]))     # repo root, for cv_utils
+from cv_utils import PerfMeter, open_source, source_from_argv
+from cv_utils.hand_tracker import RoiHandTracker
 
 mp_hands = mp.solutions.hands
 mp_drawing = mp.solutions.drawing_utils
 
 class HandCursorController:
-    def __init__(self, max_num_hands=1, min_detection_confidence=0.6):
-        self.hands = mp_hands.Hands(static_image_mode=False,
-                                    max_num_hands=max_num_hands,
+    def __init__(self, max_num_hands=1, min_detection_confidence=0.6, roi_tracking=True):
+        # Crop around the last hand position; full-frame detection only on loss or every 30 frames
+        self.hands = RoiHandTracker(max_num_hands=max_num_hands,
                                     min_detection_confidence=min_detection_confidence,
-                                    min_tracking_confidence=0.5)
+                                    min_tracking_confidence=0.5,
+                                    tracking=roi_tracking)
         self.trail = deque(maxlen=512)  # store points for drawing
 
     def process(self, frame):
-        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        results = self.hands.process(rgb)
+        results = self.hands.process_bgr(frame)   # converts only the crop to RGB
         return results
 
-def run_hand_cursor(hud=True, canvas_size=(640,480)):
-    cap = cv2.VideoCapture(0)
-    controller = HandCursorController()
+def run_hand_cursor(hud=True, canvas_size=(640,480), source=0, roi_tracking=True):
+    cap = open_source(source)
+    controller = HandCursorController(roi_tracking=roi_tracking)
     canvas = None
-    fps_prev = 0
+    perf = PerfMeter("hand_cursor_basic")
 
     instructions = [
         "Air-draw: Move your wrist to draw.",
@@ -41,12 +47,14 @@ def run_hand_cursor(hud=True, canvas_size=(640,480)):
         ret, frame = cap.read()
         if not ret:
             break
+        perf.lap("capture")
         frame = cv2.flip(frame, 1)
         h, w = frame.shape[:2]
         if canvas is None:
             canvas = 255 * np.ones((h, w, 3), dtype='uint8')
 
         results = controller.process(frame)
+        perf.lap("infer")
 
         # get wrist coords (hand landmark 0)
         if results.multi_hand_landmarks:
@@ -79,14 +87,15 @@ def run_hand_cursor(hud=True, canvas_size=(640,480)):
                 cv2.putText(overlay, line, (10,y0), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255,255,255), 1)
                 y0 += 20
 
-        # FPS
-        now = time.time()
-        fps = 1 / (now - fps_prev) if fps_prev else 0
-        fps_prev = now
-        cv2.putText(overlay, f"FPS: {int(fps)}", (10,95), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0,255,0), 2)
+        perf.lap("draw")
+
+        # FPS + per-stage timings
+        perf.draw(overlay, origin=(10,95), scale=0.6)
 
         cv2.imshow("Hand Cursor - Air Draw", overlay)
         key = cv2.waitKey(1) & 0xFF
+        perf.lap("display")
+        perf.tick()
         if key == 27 or key == ord('q'):
             break
         elif key == ord('c'):
@@ -94,7 +103,9 @@ def run_hand_cursor(hud=True, canvas_size=(640,480)):
 
     cap.release()
     cv2.destroyAllWindows()
+    controller.hands.close()
+    perf.close()
 
 if __name__ == '__main__':
     import numpy as np
-    run_hand_cursor(hud=True)
+    run_hand_cursor(hud=True, source=source_from_argv())
@@ -3,13 +3,17 @@ hand_cursor_face_draw.py
 Draw on detected face region using index fingertip (landmark 8).
 - Uses Haar Cascade for face ROI and MediaPipe for finger tracking
 - Drawing limited to face bounding box for AR effects
-- HUD, FPS, clear canvas (c), quit ESC/q
+- HUD, FPS + stage timings (cv_utils.PerfMeter), clear canvas (c), quit ESC/q
 """
 import cv2
 import mediapipe as mp
-import time
 from collections import deque
 import numpy as np
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[3]))     # repo root, for cv_utils
+from cv_utils import PerfMeter, open_source, source_from_argv
 
 mp_hands = mp.solutions.hands
 mp_drawing = mp.solutions.drawing_utils
@@ -27,11 +31,11 @@ class FaceDrawController:
         results = self.hands.process(rgb)
         return results
 
-def run_face_draw(hud=True):
-    cap = cv2.VideoCapture(0)
+def run_face_draw(hud=True, source=0):
+    cap = open_source(source)
     controller = FaceDrawController()
     canvas = None
-    fps_prev = 0
+    perf = PerfMeter("hand_cursor_face_draw")
 
     instructions = [
         "Draw on face using index fingertip (point index).",
@@ -42,6 +46,7 @@ def run_face_draw(hud=True):
         ret, frame = cap.read()
         if not ret:
             break
+        perf.lap("capture")
         frame = cv2.flip(frame, 1)
         h, w = frame.shape[:2]
         if canvas is None:
@@ -49,8 +54,10 @@ def run_face_draw(hud=True):
 
         gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
         faces = face_cascade.detectMultiScale(gray, scaleFactor=1.1, minNeighbors=5, minSize=(80,80))
+        perf.lap("faces")
 
         results = controller.process(frame)
+        perf.lap("infer")
 
         # get index fingertip coords (landmark 8)
         if results.multi_hand_landmarks and len(faces) > 0:
@@ -90,14 +97,15 @@ def run_face_draw(hud=True):
                 cv2.putText(overlay, line, (10,y0), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255,255,255), 1)
                 y0 += 20
 
-        # FPS
-        now = time.time()
-        fps = 1 / (now - fps_prev) if fps_prev else 0
-        fps_prev = now
-        cv2.putText(overlay, f"FPS: {int(fps)}", (10,95), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0,255,0), 2)
+        perf.lap("draw")
+
+        # FPS + per-stage timings
+        perf.draw(overlay, origin=(10,95), scale=0.6)
 
         cv2.imshow("Face-aware Hand Drawing", overlay)
         key = cv2.waitKey(1) & 0xFF
+        perf.lap("display")
+        perf.tick()
         if key == 27 or key == ord('q'):
             break
         elif key == ord('c'):
@@ -105,6 +113,7 @@ def run_face_draw(hud=True):
 
     cap.release()
     cv2.destroyAllWindows()
+    perf.close()
 
 if __name__ == '__main__':
-    run_face_draw(hud=True)
+    run_face_draw(hud=True, source=source_from_argv())
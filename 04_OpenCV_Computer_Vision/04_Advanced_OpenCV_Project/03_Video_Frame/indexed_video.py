@@ -0,0 +1,291 @@
+"""
+indexed_video.py
+Decode-ahead, seekable frame source used by video_frame_reader.py.
+
+Features:
+- Background thread decodes ahead into a ring of preallocated frame buffers
+- Frame/timestamp/keyframe index built on first open and cached in a sidecar file (<video>.index.npz)
+- O(1) lookup of frames already in the ring, keyframe-aligned random seek otherwise
+- Reverse stepping: decodes the preceding chunk once, then steps back through the ring
+- Keyframes come from PyAV when it is installed (packet demux only, no decoding);
+  without it the index holds timestamps and seeks fall back to OpenCV's exact seek
+- process_parallel(): keyframe-aligned chunks decoded and processed in worker processes,
+  results merged back in frame order
+"""
+import os
+import threading
+from multiprocessing import Pool
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+
+# ➤ Index: frame timestamps + keyframe positions, cached next to the video
+def index_path(video_path):
+    video_path = Path(video_path)
+    return video_path.with_name(video_path.name + ".index.npz")
+
+
+def _index_with_pyav(video_path):
+    import av
+    with av.open(str(video_path)) as container:
+        stream = container.streams.video[0]
+        pts, keyframe = [], []
+        for packet in container.demux(stream):
+            if packet.pts is None:
+                continue
+            pts.append(packet.pts)
+            keyframe.append(packet.is_keyframe)
+        time_base = float(stream.time_base)
+    # Packets come in decode order; frame numbers follow presentation order
+    order = np.argsort(pts, kind="stable")
+    pts = np.asarray(pts, dtype=np.float64)[order]
+    timestamps = (pts - pts[0]) * time_base * 1000 if len(pts) else pts
+    keyframes = np.flatnonzero(np.asarray(keyframe, dtype=bool)[order])
+    return timestamps, keyframes
+
+
+def _index_with_opencv(video_path):
+    cap = cv2.VideoCapture(str(video_path))
+    timestamps = []
+    while cap.grab():                                   # grab() decodes but skips the BGR conversion
+        timestamps.append(cap.get(cv2.CAP_PROP_POS_MSEC))
+    cap.release()
+    return np.asarray(timestamps, dtype=np.float64), np.empty(0, dtype=np.int64)
+
+
+def build_index(video_path):
+    """Scan the video once: (timestamps_ms, keyframes). Keyframes are empty without PyAV."""
+    try:
+        return _index_with_pyav(video_path)
+    except ImportError:
+        return _index_with_opencv(video_path)
+
+
+def load_index(video_path, rebuild=False):
+    """Index from the sidecar file if it matches the video's size and mtime, else build and cache it."""
+    video_path = Path(video_path)
+    stat = video_path.stat()
+    sidecar = index_path(video_path)
+    if sidecar.exists() and not rebuild:
+        with np.load(sidecar) as cached:
+            if int(cached["size"]) == stat.st_size and int(cached["mtime_ns"]) == stat.st_mtime_ns:
+                return cached["timestamps"], cached["keyframes"]
+    timestamps, keyframes = build_index(video_path)
+    try:
+        with open(sidecar, "wb") as f:                  # file handle: np.savez would append .npz to the name
+            np.savez(f, timestamps=timestamps, keyframes=keyframes,
+                     size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+    except OSError:
+        pass                                            # read-only location: just don't cache
+    return timestamps, keyframes
+
+
+class IndexedVideo:
+    """
+    Seekable video source with a decode-ahead thread.
+
+    Frames are addressed by index: frame(i) returns frame i (copied into `out` if given),
+    next()/previous() step from the current position. The returned ring buffer is only valid
+    until the next call; draw overlays on a copy (or pass `out`).
+    """
+
+    def __init__(self, video_path, ring_size=32, rebuild_index=False):
+        self.path = Path(video_path)
+        self.cap = cv2.VideoCapture(str(self.path))
+        if not self.cap.isOpened():
+            raise IOError(f"Could not open video: {self.path}")
+        self.fps = self.cap.get(cv2.CAP_PROP_FPS) or 30.0
+        self.timestamps, self.keyframes = load_index(self.path, rebuild_index)
+        self.frame_count = len(self.timestamps) or int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+
+        # Ring: frame i lives in slot i % ring_size while slot_frame[slot] == i
+        self.ring_size = ring_size
+        self.buffers = np.empty((ring_size, height, width, 3), dtype=np.uint8)
+        self.slot_frame = np.full(ring_size, -1, dtype=np.int64)
+        self.position = -1
+        self.direction = 1
+        self._decode_pos = 0                            # index the capture will return next
+        self._cond = threading.Condition()
+        self._stopped = False
+        self.stats = {"decoded": 0, "seeks": 0, "hits": 0, "waits": 0}
+        self._thread = threading.Thread(target=self._decode_loop, daemon=True)
+        self._thread.start()
+
+    def __len__(self):
+        return self.frame_count
+
+    # ➤ Decoder thread
+    def _window(self):
+        """Frames the decoder should have ready around the current position, in decode order."""
+        if self.position < 0:
+            start = 0
+        elif self.direction >= 0:
+            start = self.position
+        else:
+            start = max(self.position - (self.ring_size - 2), 0)
+        return range(start, min(start + self.ring_size - 1, self.frame_count))
+
+    def _wanted(self):
+        for i in self._window():
+            if self.slot_frame[i % self.ring_size] != i:
+                return i
+        return None
+
+    def _seek_capture(self, target):
+        """Move the capture so the next read returns `target` (keyframe seek + grab forward)."""
+        keyframe = None
+        if len(self.keyframes):
+            keyframe = int(self.keyframes[max(np.searchsorted(self.keyframes, target, "right") - 1, 0)])
+        if keyframe is not None:
+            # Grabbing forward beats seeking when we are already inside the target's GOP
+            start = self._decode_pos if keyframe <= self._decode_pos <= target else keyframe
+        else:
+            start = self._decode_pos if 0 <= target - self._decode_pos <= 2 * self.ring_size else target
+        if start != self._decode_pos:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, start)
+            self.stats["seeks"] += 1
+        for _ in range(target - start):
+            self.cap.grab()
+        self._decode_pos = target
+
+    def _decode_loop(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._stopped or self._wanted() is not None)
+                if self._stopped:
+                    return
+                target = self._wanted()
+                slot = target % self.ring_size
+                self.slot_frame[slot] = -1              # slot is being rewritten
+            if target != self._decode_pos:
+                self._seek_capture(target)
+            ok, _ = self.cap.read(self.buffers[slot])   # decodes straight into the preallocated buffer
+            with self._cond:
+                if ok:
+                    self.slot_frame[slot] = target
+                    self._decode_pos = target + 1
+                    self.stats["decoded"] += 1
+                else:
+                    self.frame_count = min(self.frame_count, target)   # header frame count was optimistic
+                self._cond.notify_all()
+
+    # ➤ Consumer API
+    def frame(self, index, out=None, timeout=5.0):
+        """Frame `index` (None past the end). Copied into `out` when given, else a ring-buffer view."""
+        with self._cond:
+            if not 0 <= index < self.frame_count:
+                return None
+            self.direction = 1 if index >= self.position else -1
+            self.position = index
+            slot = index % self.ring_size
+            if self.slot_frame[slot] == index:
+                self.stats["hits"] += 1
+            else:
+                self.stats["waits"] += 1
+                self._cond.notify_all()
+                self._cond.wait_for(lambda: self.slot_frame[slot] == index or index >= self.frame_count
+                                    or self._stopped, timeout)
+                if self.slot_frame[slot] != index:
+                    return None
+            self._cond.notify_all()                     # let the decoder refill the window
+            if out is None:
+                return self.buffers[slot]
+            np.copyto(out, self.buffers[slot])
+            return out
+
+    def next(self, out=None):
+        return self.frame(self.position + 1, out)
+
+    def previous(self, out=None):
+        return self.frame(self.position - 1, out) if self.position > 0 else None
+
+    def seek(self, index, out=None, keyframe=False):
+        """Jump to a frame; keyframe=True snaps to the nearest preceding keyframe (fastest scrubbing)."""
+        if keyframe and len(self.keyframes):
+            index = int(self.keyframes[max(np.searchsorted(self.keyframes, index, "right") - 1, 0)])
+        return self.frame(index, out)
+
+    def seek_time(self, seconds, out=None):
+        """Jump to the frame shown at `seconds` (uses the index timestamps)."""
+        index = int(np.searchsorted(self.timestamps, seconds * 1000, "right")) - 1
+        return self.frame(min(max(index, 0), self.frame_count - 1), out)
+
+    def timestamp(self, index=None):
+        index = self.position if index is None else index
+        if 0 <= index < len(self.timestamps):
+            return self.timestamps[index] / 1000
+        return index / self.fps
+
+    def close(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        self._thread.join(timeout=1.0)
+        self.cap.release()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# ➤ Parallel chunk processing: one decoder per worker process, each starting on a keyframe
+def keyframe_chunks(frame_count, keyframes, num_chunks):
+    """Split [0, frame_count) into about num_chunks (start, stop) ranges that begin on keyframes."""
+    starts = np.asarray(keyframes, dtype=np.int64)
+    if len(starts) == 0:
+        starts = np.arange(frame_count)                 # unknown GOPs: any frame can start a chunk
+    targets = np.linspace(0, frame_count, num_chunks, endpoint=False)
+    picks = starts[np.clip(np.searchsorted(starts, targets, "right") - 1, 0, len(starts) - 1)]
+    bounds = np.unique(np.concatenate([[0], picks[picks < frame_count], [frame_count]]))
+    return list(zip(bounds[:-1].tolist(), bounds[1:].tolist()))
+
+
+def _init_worker():
+    cv2.setNumThreads(1)                                # one core per process; avoid oversubscription
+
+
+def _process_chunk(job):
+    video_path, start, stop, start_ms, tolerance_ms, fn = job
+    cap = cv2.VideoCapture(str(video_path))
+    if start:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, start)
+    ok = cap.grab()
+    if start and ok and abs(cap.get(cv2.CAP_PROP_POS_MSEC) - start_ms) > tolerance_ms:
+        # Seek landed on the wrong frame (e.g. stale index): fall back to grabbing from the start
+        cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+        for _ in range(start + 1):
+            ok = cap.grab()
+    results = []
+    frame = None
+    for index in range(start, stop):
+        if not ok:
+            break
+        ok, frame = cap.retrieve(frame)                 # reuse one buffer for the whole chunk
+        if not ok:
+            break
+        results.append(fn(frame, index))
+        ok = cap.grab()
+    cap.release()
+    return results
+
+
+def process_parallel(video_path, fn, workers=None, chunks_per_worker=4):
+    """
+    Run fn(frame, index) over every frame of a video using all cores; returns results in frame order.
+    fn must be a top-level (picklable) function.
+    """
+    workers = workers or os.cpu_count() or 1
+    timestamps, keyframes = load_index(video_path)
+    chunks = keyframe_chunks(len(timestamps), keyframes, workers * chunks_per_worker)
+    fps = cv2.VideoCapture(str(video_path)).get(cv2.CAP_PROP_FPS) or 30.0
+    tolerance_ms = 500.0 / fps                          # half a frame
+    jobs = [(str(video_path), start, stop, float(timestamps[start]), tolerance_ms, fn) for start, stop in chunks]
+    with Pool(workers, initializer=_init_worker) as pool:
+        parts = pool.map(_process_chunk, jobs, chunksize=1)   # map keeps chunk order
+    return [result for part in parts for result in part]
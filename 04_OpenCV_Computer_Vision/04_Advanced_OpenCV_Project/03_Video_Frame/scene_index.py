@@ -0,0 +1,157 @@
+"""
+scene_index.py
+Scene-change index and memory-mapped thumbnail sprite sheet for fast video browsing.
+
+Features:
+- One streaming pass: every frame is downscaled once, its HSV histogram compared with the previous one
+- Scene boundaries where the histogram distance jumps (with a minimum scene length)
+- Thumbnails every N frames plus one per scene, stored as memory-mapped .npy sprite sheets
+- Cached next to the video (<video>.scenes/) and rebuilt only when the video changes
+- Navigation/preview read thumbnails straight from the memory map — no video decoding
+
+Usage:
+    index = SceneIndex.load_or_build("los_angeles.mp4")
+    index.scenes                      # first frame of every scene
+    index.scene_of(frame_index)       # scene number containing a frame
+    cv2.imshow("Scenes", index.contact_sheet())
+"""
+import json
+import shutil
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+THUMB_WIDTH = 160
+
+
+def index_dir(video_path):
+    video_path = Path(video_path)
+    return video_path.with_name(video_path.name + ".scenes")
+
+
+def frame_histogram(thumb):
+    """Normalized 2D hue/saturation histogram of a (small) BGR frame."""
+    hsv = cv2.cvtColor(thumb, cv2.COLOR_BGR2HSV)
+    hist = cv2.calcHist([hsv], [0, 1], None, [30, 32], [0, 180, 0, 256])
+    return cv2.normalize(hist, hist, 1.0, 0.0, cv2.NORM_L1)
+
+
+class SceneIndex:
+    def __init__(self, path):
+        """Open an existing index directory (see build())."""
+        self.path = Path(path)
+        self.meta = json.loads((self.path / "meta.json").read_text())
+        self.frame_count = self.meta["frames"]
+        self.thumb_every = self.meta["thumb_every"]
+        self.scores = np.load(self.path / "scores.npy", mmap_mode="r")
+        self.scenes = np.load(self.path / "scenes.npy")
+        self.thumbs = np.load(self.path / "thumbs.npy", mmap_mode="r")[:self.meta["thumbs"]]   # (N, h, w, 3)
+        self.scene_thumbs = np.load(self.path / "scene_thumbs.npy", mmap_mode="r")    # (S, h, w, 3)
+
+    # ➤ Build: one pass over the video
+    @classmethod
+    def build(cls, video_path, threshold=0.35, min_scene_len=15, thumb_every=15, thumb_width=THUMB_WIDTH):
+        video_path = Path(video_path)
+        target = index_dir(video_path)
+        tmp = target.with_name(target.name + ".tmp")
+        shutil.rmtree(tmp, ignore_errors=True)
+        tmp.mkdir(parents=True)
+
+        cap = cv2.VideoCapture(str(video_path))
+        if not cap.isOpened():
+            raise IOError(f"Could not open video: {video_path}")
+        fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+        width, height = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        thumb_size = (thumb_width, max(int(round(height * thumb_width / max(width, 1))), 1))
+        capacity = int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) + 64          # header count can be approximate
+
+        scores = np.zeros(capacity, dtype=np.float32)
+        thumbs = np.lib.format.open_memmap(tmp / "thumbs.npy", "w+", np.uint8,
+                                           (capacity // thumb_every + 1, thumb_size[1], thumb_size[0], 3))
+        scene_thumbs, previous, frame, count = [], None, None, 0
+        while True:
+            ok, frame = cap.read(frame)
+            if not ok:
+                break
+            if count == len(scores):                                     # header undercounted: grow
+                scores = np.concatenate([scores, np.zeros_like(scores)])
+            thumb = cv2.resize(frame, thumb_size, interpolation=cv2.INTER_AREA)
+            hist = frame_histogram(thumb)
+            if previous is not None:
+                scores[count] = cv2.compareHist(previous, hist, cv2.HISTCMP_BHATTACHARYYA)
+            previous = hist
+            if count % thumb_every == 0 and count // thumb_every < len(thumbs):
+                thumbs[count // thumb_every] = thumb
+            # A scene starts where the histogram distance jumps, at least min_scene_len frames in
+            if count == 0 or (scores[count] > threshold and count - scene_thumbs[-1][0] >= min_scene_len):
+                scene_thumbs.append((count, thumb))
+            count += 1
+        cap.release()
+
+        scores = scores[:count]
+        scenes = np.array([start for start, _ in scene_thumbs], dtype=np.int64)
+        stored = min((count + thumb_every - 1) // thumb_every, len(thumbs))
+        thumbs.flush()
+        del thumbs
+        np.save(tmp / "scores.npy", scores)
+        np.save(tmp / "scenes.npy", scenes)
+        np.save(tmp / "scene_thumbs.npy", np.stack([thumb for _, thumb in scene_thumbs]) if scene_thumbs
+                else np.zeros((0, thumb_size[1], thumb_size[0], 3), np.uint8))
+        stat = video_path.stat()
+        meta = {"video": video_path.name, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns,
+                "frames": count, "fps": fps, "thumb_every": thumb_every,
+                "thumbs": stored, "threshold": threshold,
+                "min_scene_len": min_scene_len, "scenes": len(scenes)}
+        (tmp / "meta.json").write_text(json.dumps(meta, indent=2))
+        shutil.rmtree(target, ignore_errors=True)
+        tmp.rename(target)
+        return cls(target)
+
+    @classmethod
+    def load_or_build(cls, video_path, **build_kwargs):
+        """Cached index if it matches the video's size and mtime, otherwise build it."""
+        video_path = Path(video_path)
+        target = index_dir(video_path)
+        if (target / "meta.json").exists():
+            meta = json.loads((target / "meta.json").read_text())
+            stat = video_path.stat()
+            if meta["size"] == stat.st_size and meta["mtime_ns"] == stat.st_mtime_ns:
+                return cls(target)
+        return cls.build(video_path, **build_kwargs)
+
+    # ➤ Lookup
+    def scene_of(self, frame_index):
+        return int(np.searchsorted(self.scenes, frame_index, "right")) - 1
+
+    def next_scene(self, frame_index):
+        """First frame of the scene after the one containing frame_index (None at the last scene)."""
+        scene = self.scene_of(frame_index) + 1
+        return int(self.scenes[scene]) if scene < len(self.scenes) else None
+
+    def previous_scene(self, frame_index):
+        """Start of the current scene, or of the previous one if already at its first frame."""
+        scene = self.scene_of(frame_index)
+        if scene > 0 and frame_index == self.scenes[scene]:
+            scene -= 1
+        return int(self.scenes[max(scene, 0)])
+
+    def thumbnail(self, frame_index):
+        """Nearest stored thumbnail at or before frame_index (read from the memory map)."""
+        return self.thumbs[min(frame_index // self.thumb_every, len(self.thumbs) - 1)]
+
+    def contact_sheet(self, columns=6, scenes=True, highlight=None):
+        """Grid image of scene (or sampled) thumbnails; `highlight` frames a cell in green."""
+        sprites = self.scene_thumbs if scenes else self.thumbs
+        if len(sprites) == 0:
+            return np.zeros((1, 1, 3), np.uint8)
+        rows = (len(sprites) + columns - 1) // columns
+        h, w = sprites.shape[1:3]
+        sheet = np.zeros((rows * h, columns * w, 3), dtype=np.uint8)
+        grid = sheet.reshape(rows, h, columns, w, 3)
+        for i, sprite in enumerate(sprites):
+            grid[i // columns, :, i % columns] = sprite
+        if highlight is not None:
+            row, col = divmod(highlight, columns)
+            cv2.rectangle(sheet, (col * w, row * h), ((col + 1) * w - 1, (row + 1) * h - 1), (0, 255, 0), 2)
+        return sheet
@@ -4,15 +4,24 @@ Enhanced demonstration of reading and displaying video frames using OpenCV.
 
 Features:
 - Single frame preview
-- Manual frame navigation
-- Continuous playback with FPS display
-- Keyboard controls: SPACE (pause/resume), ESC (quit)
+- Manual frame navigation (forward, backward and jump)
+- Continuous playback with FPS + decode/draw/display timings (cv_utils.PerfMeter), paced to the source FPS
+- Decode-ahead, seekable frame source (indexed_video.py) instead of inline cap.read()
+- Keyboard controls: SPACE (pause/resume), A/D (step while paused), ESC (quit)
+- Parallel per-frame analysis over keyframe-aligned chunks on all cores
+- Scene-change index + thumbnail sprite sheet (scene_index.py): jump between scenes, browse a contact sheet
 """
 import cv2
+import sys
 import time
 import numpy as np
 from pathlib import Path
 
+sys.path.append(str(Path(__file__).resolve().parents[3]))     # repo root, for cv_utils
+from cv_utils import PerfMeter
+from indexed_video import IndexedVideo, process_parallel
+from scene_index import SceneIndex
+
 # ➤ Load video using relative path
 VIDEO_PATH = Path(__file__).parent / "los_angeles.mp4"
 
@@ -28,50 +37,125 @@ def show_single_frame(video_path=VIDEO_PATH):
     cv2.destroyAllWindows()
 
 def manual_frame_navigation(video_path=VIDEO_PATH):
-    cap = cv2.VideoCapture(str(video_path))
-    print("▶ Manual Frame Navigation: Press any key to move to next frame. ESC to quit.")
-    while True:
-        ret, frame = cap.read()
-        if not ret:
-            break
-        cv2.imshow("Manual Frame Navigation", frame)
+    # ➤ Decode-ahead source: stepping back is served from the ring buffer instead of re-reading the file
+    video = IndexedVideo(video_path)
+    scenes = SceneIndex.load_or_build(video_path)  # one pass on first use, cached afterwards
+    print("▶ Manual Frame Navigation: D/any key = next, A = previous, N/P = next/previous scene, "
+          "0-9 = jump to 0-90%. ESC to quit.")
+    frame = video.next()
+    while frame is not None:
+        display = frame.copy()
+        cv2.putText(display, f"Frame {video.position + 1}/{len(video)}  t={video.timestamp():.2f}s  "
+                    f"scene {scenes.scene_of(video.position) + 1}/{len(scenes.scenes)}", (10, 30),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 0), 2)
+        cv2.imshow("Manual Frame Navigation", display)
         key = cv2.waitKey(0) & 0xFF
         if key == 27:
             break
-    cap.release()
+        elif key == ord('a'):
+            frame = video.previous() if video.position > 0 else frame
+        elif key == ord('n'):
+            target = scenes.next_scene(video.position)
+            frame = video.seek(target) if target is not None else frame
+        elif key == ord('p'):
+            frame = video.seek(scenes.previous_scene(video.position))
+        elif ord('0') <= key <= ord('9'):
+            frame = video.seek(len(video) * (key - ord('0')) // 10)
+        else:
+            frame = video.next()
+    video.close()
     cv2.destroyAllWindows()
 
 def continuous_playback(video_path=VIDEO_PATH):
-    cap = cv2.VideoCapture(str(video_path))
-    fps_prev = 0
-    print("▶ Continuous Playback: Press SPACE to pause, ESC to quit.")
+    # ➤ Frames are decoded ahead on a background thread; the loop only draws, shows and waits
+    video = IndexedVideo(video_path)
+    frame_time = 1.0 / video.fps
+    decoded = np.empty(video.buffers.shape[1:], dtype=np.uint8)  # reused clean frame (redrawn while paused)
+    display = np.empty_like(decoded)                              # reused overlay buffer
+    perf = PerfMeter("continuous_playback")
+    print(f"▶ Continuous Playback at {video.fps:.1f} FPS: SPACE pause, A/D step while paused, ESC to quit.")
 
     paused = False
-    while True:
-        if not paused:
-            ret, frame = cap.read()
-            if not ret:
-                print("⚠️ End of video reached.")
-                break
+    deadline = time.perf_counter()
+    frame = video.next(out=decoded)
+    while frame is not None:
+        perf.lap("decode")
 
-            now = time.time()
-            fps = 1 / (now - fps_prev) if fps_prev else 0
-            fps_prev = now
+        # HUD overlay on a copy, so redrawing a paused frame never stacks text on the previous HUD
+        np.copyto(display, frame)
+        perf.draw(display, origin=(10,30), scale=1)
+        cv2.putText(display, "Press SPACE to pause/resume | ESC to quit", (10,80),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255,255,255), 1)
+        perf.lap("draw")
+        cv2.imshow("Continuous Playback", display)
 
-            # HUD overlay
-            cv2.putText(frame, f"FPS: {int(fps)}", (10,30), cv2.FONT_HERSHEY_SIMPLEX, 1, (0,255,0), 2)
-            cv2.putText(frame, "Press SPACE to pause/resume | ESC to quit", (10,60),
-                        cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255,255,255), 1)
-            cv2.imshow("Continuous Playback", frame)
-
-        key = cv2.waitKey(20) & 0xFF
+        # Wait only for what is left of this frame's slot, so playback holds the source FPS
+        deadline += frame_time
+        wait_ms = max(int((deadline - time.perf_counter()) * 1000), 1)
+        key = cv2.waitKey(0 if paused else wait_ms) & 0xFF
+        perf.lap("display")                 # includes the pacing wait
+        perf.tick()
         if key == 27:
             break
         elif key == 32:  # SPACE to pause/resume
             paused = not paused
+        if paused:
+            if key == ord('a') and video.position > 0:
+                frame = video.previous(out=decoded)
+            elif key == ord('d'):
+                frame = video.next(out=decoded)
+            deadline = time.perf_counter()
+            continue
+        if deadline < time.perf_counter() - frame_time:
+            deadline = time.perf_counter()  # fell behind (e.g. window dragged): don't race to catch up
+        frame = video.next(out=decoded)
+    else:
+        print("⚠️ End of video reached.")
 
-    cap.release()
+    video.close()
     cv2.destroyAllWindows()
+    perf.close()
+
+def scene_browser(video_path=VIDEO_PATH, columns=6):
+    # ➤ Contact sheet of scene thumbnails: moving the selection never decodes the video
+    scenes = SceneIndex.load_or_build(video_path)
+    video = None
+    selected = 0
+    print(f"▶ Scene Browser: {len(scenes.scenes)} scenes. A/D = select, ENTER = open full frame, ESC to quit.")
+    while True:
+        cv2.imshow("Scene Browser", scenes.contact_sheet(columns, highlight=selected))
+        key = cv2.waitKey(0) & 0xFF
+        if key == 27:
+            break
+        elif key == ord('a'):
+            selected = max(selected - 1, 0)
+        elif key == ord('d'):
+            selected = min(selected + 1, len(scenes.scenes) - 1)
+        elif key == 13:  # ENTER: decode only the selected scene's first frame
+            video = video or IndexedVideo(video_path)
+            frame = video.seek(int(scenes.scenes[selected]))
+            if frame is not None:
+                cv2.imshow("Scene Start", frame)
+    if video:
+        video.close()
+    cv2.destroyAllWindows()
+
+def frame_brightness(frame, index):
+    # Per-frame analysis run inside the worker processes (must be a top-level function)
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    return float(gray.mean())
+
+def parallel_frame_analysis(video_path=VIDEO_PATH, analyse=frame_brightness, workers=None):
+    # ➤ Each worker decodes its own keyframe-aligned chunk; results come back in frame order
+    start = time.perf_counter()
+    results = process_parallel(video_path, analyse, workers)
+    elapsed = time.perf_counter() - start
+    print(f"▶ Parallel analysis: {len(results)} frames in {elapsed:.2f}s ({len(results) / elapsed:.0f} frames/s)")
+    if results:
+        values = np.array(results)
+        print(f"   brightness min {values.min():.1f} / mean {values.mean():.1f} / max {values.max():.1f}, "
+              f"darkest frame #{int(values.argmin())}")
+    return results
 
 if __name__ == "__main__":
     print("1️⃣ Showing single frame...")
@@ -80,3 +164,7 @@ if __name__ == "__main__":
     manual_frame_navigation()
     print("3️⃣ Continuous playback demo...")
     continuous_playback()
+    print("4️⃣ Scene browser demo...")
+    scene_browser()
+    print("5️⃣ Parallel frame analysis demo...")
+    parallel_frame_analysis()
@@ -8,29 +8,36 @@ import cv2
 import mediapipe as mp
 import numpy as np
 import math
+import sys
 from pathlib import Path
 import time
 
+sys.path.append(str(Path(__file__).resolve().parents[3]))     # repo root, for cv_utils
+from cv_utils import PerfMeter, open_source, source_from_argv
+from cv_utils.hand_tracker import RoiHandTracker
+
 mp_hands = mp.solutions.hands
 mp_draw = mp.solutions.drawing_utils
 
 def euclidean_distance(pt1, pt2):
     return math.hypot(pt1[0]-pt2[0], pt1[1]-pt2[1])
 
-def run_pinch_draw(threshold=40):
-    cap = cv2.VideoCapture(0)
-    hands = mp_hands.Hands(max_num_hands=1, min_detection_confidence=0.6)
+def run_pinch_draw(threshold=40, source=0, roi_tracking=True):
+    cap = open_source(source)
+    hands = RoiHandTracker(max_num_hands=1, min_detection_confidence=0.6, tracking=roi_tracking)   # crop around the last hand
     canvas = np.zeros((480, 640, 3), dtype=np.uint8)
     prev = (0,0)
-    fps_prev = 0
+    perf = PerfMeter("gesture_distance_draw")
     while cap.isOpened():
         ret, frame = cap.read()
         if not ret:
             break
+        perf.lap("capture")
         frame = cv2.flip(frame, 1)
         h, w = frame.shape[:2]
-        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        results = hands.process(rgb)
+        perf.lap("convert")
+        results = hands.process_bgr(frame)
+        perf.lap("infer")
         drawing = False
         if results.multi_hand_landmarks:
             for hand_landmarks in results.multi_hand_landmarks:
@@ -49,14 +56,14 @@ def run_pinch_draw(threshold=40):
                     prev = (0,0)
                 mp_draw.draw_landmarks(frame, hand_landmarks, mp_hands.HAND_CONNECTIONS)
         overlay = cv2.addWeighted(frame, 0.6, canvas, 0.4, 0)
-        # HUD and FPS
-        now = time.time()
-        fps = 1/(now-fps_prev) if fps_prev else 0
-        fps_prev = now
+        perf.lap("draw")
+        # HUD and FPS + per-stage timings
         cv2.putText(overlay, "Pinch (thumb+index) to draw. Press 's' to save. ESC/q to quit.", (10,20), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255,255,255),1)
-        cv2.putText(overlay, f"FPS: {int(fps)}", (10,45), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0,255,0),2)
+        perf.draw(overlay, origin=(10,45), scale=0.6)
         cv2.imshow("Pinch Draw", overlay)
         key = cv2.waitKey(1) & 0xFF
+        perf.lap("display")
+        perf.tick()
         if key == ord('s'):
             Path.cwd().joinpath("gesture_paint_{}.png".format(int(time.time()))).write_bytes(cv2.imencode('.png', canvas)[1].tobytes())
             print("Saved artwork")
@@ -64,6 +71,8 @@ def run_pinch_draw(threshold=40):
             break
     cap.release()
     cv2.destroyAllWindows()
+    hands.close()
+    perf.close()
 
 if __name__ == '__main__':
-    run_pinch_draw()
+    run_pinch_draw(source=source_from_argv())
@@ -7,55 +7,57 @@ Virtual painter using index fingertip as brush.
 import cv2
 import numpy as np
 import mediapipe as mp
-import time
+import sys
 from pathlib import Path
 
+sys.path.append(str(Path(__file__).resolve().parents[3]))     # repo root, for cv_utils
+from cv_utils import PerfMeter, open_source, source_from_argv
+from cv_utils.hand_tracker import RoiHandTracker
+from cv_utils.landmarks import HAND_LANDMARKS, LandmarkArrays
+
 mp_hands = mp.solutions.hands
 mp_draw = mp.solutions.drawing_utils
 
-def fingers_up_from_landmarks(lm_list):
-    fingers = []
-    # tips: [8,12,16,20], compare y to y-2
-    for tip_id in [8,12,16,20]:
-        fingers.append(1 if lm_list[tip_id][1] < lm_list[tip_id-2][1] else 0)
-    return fingers
+FINGER_TIPS = np.array([8,12,16,20])
+
+def fingers_up_from_landmarks(points):
+    # points: (21, 2) pixel coordinates; a finger is up when its tip is above the joint two below it
+    return (points[FINGER_TIPS, 1] < points[FINGER_TIPS - 2, 1]).astype(int).tolist()
 
-def run_basic_painter(brush_thickness=8):
-    cap = cv2.VideoCapture(0)
-    hands = mp_hands.Hands(max_num_hands=1)
+def run_basic_painter(brush_thickness=8, source=0, roi_tracking=True):
+    cap = open_source(source)
+    hands = RoiHandTracker(max_num_hands=1, tracking=roi_tracking)   # crop around the last hand
+    hand_arrays = LandmarkArrays(HAND_LANDMARKS, max_items=1)   # reused landmark/pixel buffers
     canvas = None
     xp, yp = 0,0
-    fps_prev = 0
+    perf = PerfMeter("gesture_painter_basic")
     while True:
         ret, frame = cap.read()
         if not ret:
             break
+        perf.lap("capture")
         frame = cv2.flip(frame,1)
-        h,w = frame.shape[:2]
         if canvas is None:
             canvas = np.zeros_like(frame)
-        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        result = hands.process(rgb)
-        if result.multi_hand_landmarks:
-            for handLms in result.multi_hand_landmarks:
-                lm_list = []
-                for id, lm in enumerate(handLms.landmark):
-                    cx, cy = int(lm.x*w), int(lm.y*h)
-                    lm_list.append((cx,cy))
-                if lm_list:
-                    x1,y1 = lm_list[8]  # index tip
-                    x2,y2 = lm_list[12] # middle tip
-                    fingers = fingers_up_from_landmarks(lm_list)
-                    if fingers[0] and not fingers[1]:
-                        cv2.circle(frame, (x1,y1), 8, (255,0,255), -1)
-                        if xp == 0 and yp == 0:
-                            xp, yp = x1, y1
-                        cv2.line(canvas, (xp,yp), (x1,y1), (255,0,255), brush_thickness)
+        perf.lap("convert")
+        result = hands.process_bgr(frame)
+        perf.lap("infer")
+        _, pixels = hand_arrays.update(result.multi_hand_landmarks, frame.shape)
+        if len(pixels):
+            for points, handLms in zip(pixels, result.multi_hand_landmarks):
+                x1,y1 = points[8].tolist()  # index tip
+                x2,y2 = points[12].tolist() # middle tip
+                fingers = fingers_up_from_landmarks(points)
+                if fingers[0] and not fingers[1]:
+                    cv2.circle(frame, (x1,y1), 8, (255,0,255), -1)
+                    if xp == 0 and yp == 0:
                         xp, yp = x1, y1
-                    else:
-                        xp, yp = 0,0
-                    if all(fingers):
-                        canvas = np.zeros_like(frame)
+                    cv2.line(canvas, (xp,yp), (x1,y1), (255,0,255), brush_thickness)
+                    xp, yp = x1, y1
+                else:
+                    xp, yp = 0,0
+                if all(fingers):
+                    canvas = np.zeros_like(frame)
                 mp_draw.draw_landmarks(frame, handLms, mp_hands.HAND_CONNECTIONS)
         # merge canvas and frame
         gray_canvas = cv2.cvtColor(canvas, cv2.COLOR_BGR2GRAY)
@@ -64,15 +66,18 @@ def run_basic_painter(brush_thickness=8):
         frame_bg = cv2.bitwise_and(frame, frame, mask=inv_mask)
         frame_fg = cv2.bitwise_and(canvas, canvas, mask=mask)
         final = cv2.add(frame_bg, frame_fg)
-        now = time.time()
-        fps = 1/(now-fps_prev) if fps_prev else 0
-        fps_prev = now
-        cv2.putText(final, f"FPS: {int(fps)}", (10,30), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0,255,0),2)
+        perf.lap("draw")
+        perf.draw(final, origin=(10,30), scale=0.6)
         cv2.imshow("Virtual Painter Basic", final)
-        if cv2.waitKey(1) & 0xFF == ord('q'):
+        key = cv2.waitKey(1) & 0xFF
+        perf.lap("display")
+        perf.tick()
+        if key == ord('q'):
             break
     cap.release()
     cv2.destroyAllWindows()
+    hands.close()
+    perf.close()
 
 if __name__ == '__main__':
-    run_basic_painter()
+    run_basic_painter(source=source_from_argv())
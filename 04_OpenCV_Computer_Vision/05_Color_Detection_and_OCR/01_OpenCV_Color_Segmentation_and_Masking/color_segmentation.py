@@ -14,8 +14,12 @@ Controls:
 import cv2
 import numpy as np
 import time
+import sys
 from pathlib import Path
 
+sys.path.append(str(Path(__file__).resolve().parents[3]))     # repo root, for cv_utils
+from cv_utils import PerfMeter, open_source, source_from_argv
+
 # HSV ranges for colors (tunable)
 COLOR_RANGES = {
     "red": [([0,120,70], [10,255,255]), ([170,120,70], [180,255,255])],  # two ranges for red
@@ -33,14 +37,14 @@ def get_mask(hsv, ranges):
         mask = m if mask is None else cv2.bitwise_or(mask, m)
     return mask
 
-def main():
-    cap = cv2.VideoCapture(0)
+def main(source=0):
+    cap = open_source(source)
     if not cap.isOpened():
         print("Error: Could not open webcam.")
         return
     mode = "original"
     save_count = 0
-    fps_prev = time.time()
+    perf = PerfMeter("color_segmentation")
 
     print("Controls: r=red, g=green, b=blue, a=all except white, o=original, h=hsv, s=save mask, ESC/q=quit")
 
@@ -48,9 +52,11 @@ def main():
         ret, frame = cap.read()
         if not ret:
             break
+        perf.lap("capture")
         frame = cv2.flip(frame,1)
         hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
         display = frame.copy()
+        perf.lap("convert")
 
         if mode == "red":
             mask = get_mask(hsv, COLOR_RANGES["red"])
@@ -68,15 +74,17 @@ def main():
             display = cv2.cvtColor(hsv, cv2.COLOR_HSV2BGR)
         else:
             display = frame
+        perf.lap("mask")
 
         # HUD
-        fps_now = time.time()
-        fps = 1/(fps_now - fps_prev) if fps_prev else 0
-        fps_prev = fps_now
-        cv2.putText(display, f"Mode: {mode} | FPS: {int(fps)}", (10,30), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0,255,0),2)
+        cv2.putText(display, f"Mode: {mode}", (10,30), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0,255,0),2)
+        perf.draw(display, origin=(10,60))
+        perf.lap("draw")
         cv2.imshow("Color Segmentation", display)
 
         key = cv2.waitKey(1) & 0xFF
+        perf.lap("display")
+        perf.tick()
         if key == 27 or key == ord('q'):
             break
         elif key == ord('r'):
@@ -102,6 +110,7 @@ def main():
 
     cap.release()
     cv2.destroyAllWindows()
+    perf.close()
 
 if __name__ == '__main__':
-    main()
+    main(source=source_from_argv())
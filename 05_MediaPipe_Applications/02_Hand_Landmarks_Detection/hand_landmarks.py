@@ -1,49 +1,72 @@
 import cv2
 import mediapipe as mp
 import warnings
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))     # repo root, for cv_utils
+from cv_utils import LandmarkArrays, LandmarkClient, MeshRenderer, PerfMeter, open_source, source_from_argv
+from cv_utils.landmarks import HAND_LANDMARKS
+from cv_utils.mesh_draw import ConnectionLayer, PointLayer
+
 warnings.filterwarnings("ignore")
 
-def run_hand_tracking():
-    # ➤ Initialize MediaPipe Hands and Drawing Utilities
-    mp_hands = mp.solutions.hands
-    hands = mp_hands.Hands()
-    mp_drawing = mp.solutions.drawing_utils
+def run_hand_tracking(source=0):
+    # ➤ Access the webcam (or "service:" — frames and landmarks from a running landmark service)
+    cap = open_source(source)
+    shared = isinstance(cap, LandmarkClient)
+    perf = PerfMeter("hand_landmarks")
 
-    # ➤ Access the webcam
-    cap = cv2.VideoCapture(0)
+    # ➤ Initialize MediaPipe Hands (not needed when the service runs it) and the drawing layers
+    mp_hands = mp.solutions.hands
+    hands = None if shared else mp_hands.Hands()
+    hand_arrays = LandmarkArrays(HAND_LANDMARKS, max_items=2)
+    renderer = MeshRenderer([ConnectionLayer(mp_hands.HAND_CONNECTIONS, thickness=2), PointLayer()])
 
     while cap.isOpened():
         success, frame = cap.read()
         if not success:
             print("Failed to capture frame from webcam. Exiting...")
             break
+        perf.lap("capture")
 
-        # Flip for mirror effect
-        frame = cv2.flip(frame, 1)
+        if shared:
+            hand_px = cap.pixels("hands")
+        else:
+            # Flip for mirror effect
+            frame = cv2.flip(frame, 1)
 
-        # Convert frame from BGR (OpenCV) to RGB (MediaPipe expects RGB)
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            # Convert frame from BGR (OpenCV) to RGB (MediaPipe expects RGB)
+            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            perf.lap("convert")
 
-        # Process the frame and detect hand landmarks
-        result = hands.process(rgb_frame)
+            # Process the frame and detect hand landmarks
+            result = hands.process(rgb_frame)
+            perf.lap("infer")
+            _, hand_px = hand_arrays.update(result.multi_hand_landmarks, frame.shape)
 
         # Draw landmarks if detected
-        if result.multi_hand_landmarks:
-            for hand_landmarks in result.multi_hand_landmarks:
-                mp_drawing.draw_landmarks(
-                    frame, hand_landmarks, mp_hands.HAND_CONNECTIONS)
+        renderer.draw(frame, hand_px)
+        perf.lap("draw")
+
+        # ➤ FPS + per-stage timings
+        perf.draw(frame, origin=(10, 40), color=(255, 255, 0))
 
         # Display the processed frame
         cv2.imshow("MediaPipe Hand Tracking", frame)
 
         # Exit loop when ESC key is pressed
-        if cv2.waitKey(5) & 0xFF == 27:
+        key = cv2.waitKey(5) & 0xFF
+        perf.lap("display")
+        perf.tick()
+        if key == 27:
             break
 
     # ➤ Release resources
     cap.release()
     cv2.destroyAllWindows()
+    perf.close()
 
 
 if __name__ == "__main__":
-    run_hand_tracking()
+    run_hand_tracking(source=source_from_argv())
@@ -1,10 +1,22 @@
 import cv2
 import mediapipe as mp
+import sys
+from pathlib import Path
 
-def run_face_landmarks():
-    # ➤ Initialize Face Mesh Model
+sys.path.append(str(Path(__file__).resolve().parents[2]))     # repo root, for cv_utils
+from cv_utils import LandmarkArrays, LandmarkClient, PerfMeter, face_mesh_renderer, open_source, source_from_argv
+from cv_utils.landmarks import FACE_LANDMARKS
+
+def run_face_landmarks(source=0, lod_width=120):
+    """lod_width: faces narrower than this many pixels are drawn with contours only (None = always full mesh)"""
+    # ➤ Start Webcam (or "service:" — frames and landmarks from a running landmark service)
+    cap = open_source(source)
+    shared = isinstance(cap, LandmarkClient)
+    perf = PerfMeter("face_landmarks")
+
+    # ➤ Initialize Face Mesh Model (not needed when the service runs it)
     mp_face = mp.solutions.face_mesh
-    face_mesh = mp_face.FaceMesh(
+    face_mesh = None if shared else mp_face.FaceMesh(
         max_num_faces=2,
         min_detection_confidence=0.5,
         min_tracking_confidence=0.5
@@ -12,47 +24,49 @@ def run_face_landmarks():
     mp_drawing = mp.solutions.drawing_utils
     drawing_spec = mp_drawing.DrawingSpec(thickness=1, circle_radius=1)
 
-    # ➤ Start Webcam
-    cap = cv2.VideoCapture(0)
+    # ➤ Batched mesh drawing: connection index arrays built once, one cv2.polylines call per layer
+    faces = LandmarkArrays(FACE_LANDMARKS, max_items=2)
+    renderer = face_mesh_renderer(mp_face, spec=drawing_spec, lod_width=lod_width)
+
     while cap.isOpened():
         success, frame = cap.read()
         if not success:
             print("Failed to capture frame. Exiting...")
             break
+        perf.lap("capture")
 
-        # Flip for mirror view and convert to RGB
-        frame = cv2.flip(frame, 1)
-        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        if shared:
+            px = cap.pixels("face_mesh")
+        else:
+            # Flip for mirror view and convert to RGB
+            frame = cv2.flip(frame, 1)
+            rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            perf.lap("convert")
 
-        # ➤ Process the frame to detect face landmarks
-        results = face_mesh.process(rgb)
+            # ➤ Process the frame to detect face landmarks
+            results = face_mesh.process(rgb)
+            perf.lap("infer")
+            _, px = faces.update(results.multi_face_landmarks, frame.shape)
 
         # ➤ Draw landmarks if detected
-        if results.multi_face_landmarks:
-            for face_landmarks in results.multi_face_landmarks:
-                mp_drawing.draw_landmarks(
-                    image=frame,
-                    landmark_list=face_landmarks,
-                    connections=mp_face.FACEMESH_TESSELATION,
-                    landmark_drawing_spec=None,
-                    connection_drawing_spec=drawing_spec
-                )
-                mp_drawing.draw_landmarks(
-                    image=frame,
-                    landmark_list=face_landmarks,
-                    connections=mp_face.FACEMESH_CONTOURS,
-                    landmark_drawing_spec=None,
-                    connection_drawing_spec=drawing_spec
-                )
+        renderer.draw(frame, px)
+        perf.lap("draw")
+
+        # ➤ FPS + per-stage timings
+        perf.draw(frame, origin=(10, 40), color=(255, 255, 0))
 
         # ➤ Show output frame
         cv2.imshow("Face Landmarks Detection", frame)
-        if cv2.waitKey(5) & 0xFF == 27:  # ESC key
+        key = cv2.waitKey(5) & 0xFF
+        perf.lap("display")
+        perf.tick()
+        if key == 27:  # ESC key
             break
 
     cap.release()
     cv2.destroyAllWindows()
+    perf.close()
 
 
 if __name__ == "__main__":
-    run_face_landmarks()
+    run_face_landmarks(source=source_from_argv())
@@ -1,55 +1,71 @@
 import cv2
 import mediapipe as mp
-import time
+import sys
+from pathlib import Path
 
-def run_pose_tracking():
-    # ➤ Initialize Pose model
+sys.path.append(str(Path(__file__).resolve().parents[2]))     # repo root, for cv_utils
+from cv_utils import LandmarkArrays, LandmarkClient, MeshRenderer, PerfMeter, open_source, source_from_argv
+from cv_utils.landmarks import POSE_LANDMARKS
+from cv_utils.mesh_draw import ConnectionLayer, PointLayer
+
+def run_pose_tracking(source=0):
+    # ➤ Access webcam (or "service:" — frames and landmarks from a running landmark service)
+    cap = open_source(source)
+    shared = isinstance(cap, LandmarkClient)
+    perf = PerfMeter("pose_landmarks")
+
+    # ➤ Initialize Pose model (not needed when the service runs it) and the drawing layers
     mp_pose = mp.solutions.pose
-    pose = mp_pose.Pose(min_detection_confidence=0.5, min_tracking_confidence=0.5)
+    pose = None if shared else mp_pose.Pose(min_detection_confidence=0.5, min_tracking_confidence=0.5)
     mp_drawing = mp.solutions.drawing_utils
-
-    # ➤ Access webcam
-    cap = cv2.VideoCapture(0)
-    previous_time = 0
+    pose_arrays = LandmarkArrays(POSE_LANDMARKS)
+    renderer = MeshRenderer([
+        ConnectionLayer(mp_pose.POSE_CONNECTIONS, mp_drawing.DrawingSpec(color=(0,0,255), thickness=2, circle_radius=2)),
+        PointLayer(mp_drawing.DrawingSpec(color=(0,255,0), thickness=2, circle_radius=2))
+    ])
 
     while cap.isOpened():
         success, frame = cap.read()
         if not success:
             print("Failed to read frame from webcam.")
             break
+        perf.lap("capture")
+
+        if shared:
+            pose_px, visibility = cap.pixels("pose"), cap.results["pose"]["visibility"]
+        else:
+            # Flip for mirror effect
+            frame = cv2.flip(frame, 1)
 
-        # Flip for mirror effect
-        frame = cv2.flip(frame, 1)
+            # Convert BGR to RGB
+            rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            perf.lap("convert")
 
-        # Convert BGR to RGB
-        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            # ➤ Process frame with MediaPipe Pose
+            results = pose.process(rgb)
+            perf.lap("infer")
+            _, pose_px = pose_arrays.update(results.pose_landmarks, frame.shape)
+            visibility = pose_arrays.visibility[:len(pose_px)]
 
-        # ➤ Process frame with MediaPipe Pose
-        results = pose.process(rgb)
+        # ➤ Draw pose landmarks if detected (low-visibility joints hidden, as mp_drawing does)
+        renderer.draw(frame, pose_px, visibility)
 
-        # ➤ Draw pose landmarks if detected
-        if results.pose_landmarks:
-            mp_drawing.draw_landmarks(
-                frame,
-                results.pose_landmarks,
-                mp_pose.POSE_CONNECTIONS,
-                mp_drawing.DrawingSpec(color=(0,255,0), thickness=2, circle_radius=2),
-                mp_drawing.DrawingSpec(color=(0,0,255), thickness=2, circle_radius=2)
-            )
+        perf.lap("draw")
 
-        # ➤ Calculate and display FPS
-        current_time = time.time()
-        fps = 1 / (current_time - previous_time) if previous_time else 0
-        previous_time = current_time
-        cv2.putText(frame, f"FPS: {int(fps)}", (10, 40), cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 0), 2)
+        # ➤ FPS + per-stage timings
+        perf.draw(frame, origin=(10, 40), color=(255, 255, 0))
 
         # ➤ Show frame
         cv2.imshow("MediaPipe Pose Landmarks", frame)
-        if cv2.waitKey(5) & 0xFF == 27:  # ESC key
+        key = cv2.waitKey(5) & 0xFF
+        perf.lap("display")
+        perf.tick()
+        if key == 27:  # ESC key
             break
 
     cap.release()
     cv2.destroyAllWindows()
+    perf.close()
 
 if __name__ == "__main__":
-    run_pose_tracking()
+    run_pose_tracking(source=source_from_argv())
@@ -1,8 +1,12 @@
 import cv2
 import mediapipe as mp
-import time
+import sys
+from pathlib import Path
 
-def run_objectron_webcam(model_name='Cup'):
+sys.path.append(str(Path(__file__).resolve().parents[2]))     # repo root, for cv_utils
+from cv_utils import PerfMeter, open_source, source_from_argv
+
+def run_objectron_webcam(model_name='Cup', source=0):
     # ➤ Initialize MediaPipe Objectron and drawing utils
     mp_objectron = mp.solutions.objectron
     mp_drawing = mp.solutions.drawing_utils
@@ -17,21 +21,24 @@ def run_objectron_webcam(model_name='Cup'):
     )
 
     # ➤ Access webcam
-    cap = cv2.VideoCapture(0)
-    prev_time = 0
+    cap = open_source(source)
+    perf = PerfMeter("objectron_3d")
 
     while cap.isOpened():
         success, frame = cap.read()
         if not success:
             print("Failed to capture frame from webcam.")
             break
+        perf.lap("capture")
 
         # Flip frame for mirror effect and convert color space
         frame = cv2.flip(frame, 1)
         rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        perf.lap("convert")
 
         # ➤ Process frame for 3D object detection
         results = objectron.process(rgb_frame)
+        perf.lap("infer")
 
         # ➤ Draw detected 3D bounding boxes and axes
         if results.detected_objects:
@@ -47,22 +54,24 @@ def run_objectron_webcam(model_name='Cup'):
                     detected_object.translation
                 )
 
-        # ➤ Calculate and display FPS
-        curr_time = time.time()
-        fps = 1 / (curr_time - prev_time) if prev_time else 0
-        prev_time = curr_time
-        cv2.putText(frame, f"FPS: {int(fps)}", (10, 30),
-                    cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
+        perf.lap("draw")
+
+        # ➤ FPS + per-stage timings
+        perf.draw(frame, origin=(10, 30))
 
         # ➤ Display output
         cv2.imshow("MediaPipe Objectron 3D Detection", frame)
+        key = cv2.waitKey(5) & 0xFF
+        perf.lap("display")
+        perf.tick()
 
-        if cv2.waitKey(5) & 0xFF == 27:  # ESC key to exit
+        if key == 27:  # ESC key to exit
             break
 
     cap.release()
     cv2.destroyAllWindows()
+    perf.close()
 
 
 if __name__ == "__main__":
-    run_objectron_webcam()
+    run_objectron_webcam(source=source_from_argv())
@@ -1,8 +1,14 @@
 import cv2
-import time
 import mediapipe as mp
+import sys
+from pathlib import Path
 
-def run_holistic_tracking():
+sys.path.append(str(Path(__file__).resolve().parents[2]))     # repo root, for cv_utils
+from cv_utils import LandmarkArrays, PerfMeter, face_mesh_renderer, open_source, source_from_argv
+from cv_utils.landmarks import FACE_LANDMARKS
+
+def run_holistic_tracking(source=0, lod_width=120):
+    """lod_width: faces narrower than this many pixels are drawn with contours only (None = always full mesh)"""
     # ➤ Initialize Holistic model and drawing utilities
     mp_holistic = mp.solutions.holistic
     holistic = mp_holistic.Holistic(min_detection_confidence=0.5, min_tracking_confidence=0.5)
@@ -14,14 +20,19 @@ def run_holistic_tracking():
     hand_spec = mp_drawing.DrawingSpec(color=(0,255,0), thickness=2, circle_radius=2)
     pose_spec = mp_drawing.DrawingSpec(color=(0,0,255), thickness=2, circle_radius=2)
 
-    cap = cv2.VideoCapture(0)
-    prev_time = 0
+    # ➤ Face mesh (~2.5k edges) drawn batched; hands and pose are small enough for mp_drawing
+    face = LandmarkArrays(FACE_LANDMARKS)
+    face_renderer = face_mesh_renderer(mp_holistic, spec=face_conn_spec, points=face_spec, lod_width=lod_width)
+
+    cap = open_source(source)
+    perf = PerfMeter("holistic_integration")
 
     while cap.isOpened():
         success, frame = cap.read()
         if not success:
             print("Failed to read frame from webcam.")
             break
+        perf.lap("capture")
 
         # Resize for stability (optional) and mirror
         frame = cv2.resize(frame, (960, 720))
@@ -30,28 +41,17 @@ def run_holistic_tracking():
         # Convert color and process
         rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
         rgb.flags.writeable = False
+        perf.lap("convert")
         results = holistic.process(rgb)
         rgb.flags.writeable = True
+        perf.lap("infer")
 
         # Convert back to BGR for OpenCV drawing
         image = cv2.cvtColor(rgb, cv2.COLOR_RGB2BGR)
 
-        # Draw face landmarks (mesh & contours) if present
-        if results.face_landmarks:
-            mp_drawing.draw_landmarks(
-                image,
-                results.face_landmarks,
-                mp_holistic.FACEMESH_TESSELATION,
-                landmark_drawing_spec=face_spec,
-                connection_drawing_spec=face_conn_spec
-            )
-            mp_drawing.draw_landmarks(
-                image,
-                results.face_landmarks,
-                mp_holistic.FACEMESH_CONTOURS,
-                landmark_drawing_spec=face_spec,
-                connection_drawing_spec=face_conn_spec
-            )
+        # Draw face landmarks (mesh, contours & points) if present
+        _, face_px = face.update(results.face_landmarks, image.shape)
+        face_renderer.draw(image, face_px)
 
         # Draw right hand landmarks
         if results.right_hand_landmarks:
@@ -83,18 +83,21 @@ def run_holistic_tracking():
                 connection_drawing_spec=pose_spec
             )
 
-        # FPS
-        curr_time = time.time()
-        fps = 1 / (curr_time - prev_time) if prev_time else 0
-        prev_time = curr_time
-        cv2.putText(image, f"FPS: {int(fps)}", (10, 40), cv2.FONT_HERSHEY_SIMPLEX, 1, (0,255,0), 2)
+        perf.lap("draw")
+
+        # FPS + per-stage timings
+        perf.draw(image, origin=(10, 40))
 
         cv2.imshow("MediaPipe Holistic Integration", image)
-        if cv2.waitKey(5) & 0xFF == 27:  # ESC to exit
+        key = cv2.waitKey(5) & 0xFF
+        perf.lap("display")
+        perf.tick()
+        if key == 27:  # ESC to exit
             break
 
     cap.release()
     cv2.destroyAllWindows()
+    perf.close()
 
 if __name__ == '__main__':
-    run_holistic_tracking()
+    run_holistic_tracking(source=source_from_argv())
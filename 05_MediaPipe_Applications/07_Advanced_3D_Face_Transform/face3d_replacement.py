@@ -1,15 +1,23 @@
 import cv2
 import mediapipe as mp
 import numpy as np
+import sys
+from pathlib import Path
 
-def face3d_replacement():
+sys.path.append(str(Path(__file__).resolve().parents[2]))     # repo root, for cv_utils
+from cv_utils import PerfMeter, open_source, source_from_argv
+from cv_utils.landmarks import FACE_LANDMARKS, LandmarkArrays
+
+def face3d_replacement(source=0):
     mp_drawing = mp.solutions.drawing_utils
     mp_face_mesh = mp.solutions.face_mesh
 
     face_mesh = mp_face_mesh.FaceMesh(static_image_mode=False, max_num_faces=1, min_detection_confidence=0.5)
     drawing_spec = mp_drawing.DrawingSpec(thickness=1, color=(0, 255, 0))
 
-    cap = cv2.VideoCapture(0)
+    faces = LandmarkArrays(FACE_LANDMARKS, max_items=1)   # reused (faces, 468, 3) + pixel buffers
+    cap = open_source(source)
+    perf = PerfMeter("face3d_replacement")
 
     # Capture a replacement face once (press 'c' to capture replacement face)
     replacement_face = None
@@ -20,7 +28,9 @@ def face3d_replacement():
         if not success:
             break
         image = cv2.flip(image, 1)
+        perf.lap("capture")
         k = cv2.waitKey(1) & 0xFF
+        perf.lap("keys")
         if k == ord('c'):
             replacement_face = image.copy()
             print("Replacement face captured.")
@@ -28,17 +38,17 @@ def face3d_replacement():
             break
 
         image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+        perf.lap("convert")
         results = face_mesh.process(image_rgb)
+        perf.lap("infer")
         transformed_image = image.copy()
 
-        if results.multi_face_landmarks and replacement_face is not None:
-            for face_landmarks in results.multi_face_landmarks:
-                # Convert landmarks to pixel coordinates
-                landmarks = [(lm.x, lm.y, lm.z) for lm in face_landmarks.landmark]
-                x_coords = [int(l[0] * image.shape[1]) for l in landmarks]
-                y_coords = [int(l[1] * image.shape[0]) for l in landmarks]
-                xmin, xmax = min(x_coords), max(x_coords)
-                ymin, ymax = min(y_coords), max(y_coords)
+        _, pixels = faces.update(results.multi_face_landmarks, image.shape)
+        if len(pixels) and replacement_face is not None:
+            for face_px, face_landmarks in zip(pixels, results.multi_face_landmarks):
+                # Bounding box of the pixel landmarks, clipped so a face at the border still fits the slice
+                xmin, ymin = np.maximum(face_px.min(axis=0), 0).tolist()
+                xmax, ymax = np.minimum(face_px.max(axis=0), (image.shape[1], image.shape[0])).tolist()
 
                 # Resize replacement face to ROI and blend
                 roi_width = xmax - xmin
@@ -56,9 +66,16 @@ def face3d_replacement():
 
                 mp_drawing.draw_landmarks(transformed_image, face_landmarks, mp_face_mesh.FACEMESH_TESSELATION, landmark_drawing_spec=drawing_spec, connection_drawing_spec=drawing_spec)
 
+        perf.lap("draw")
+
+        # ➤ FPS + per-stage timings
+        perf.draw(transformed_image, origin=(10, 40), color=(255, 255, 0))
         cv2.imshow('Face Replacement / Morphing (Press c to capture replacement)', transformed_image)
+        perf.lap("display")
+        perf.tick()
     cap.release()
     cv2.destroyAllWindows()
+    perf.close()
 
 if __name__ == '__main__':
-    face3d_replacement()
+    face3d_replacement(source=source_from_argv())
@@ -1,8 +1,14 @@
 import cv2
 import mediapipe as mp
 import numpy as np
+import sys
+from pathlib import Path
 
-def face3d_transform_matrix(scale=1.5):
+sys.path.append(str(Path(__file__).resolve().parents[2]))     # repo root, for cv_utils
+from cv_utils import PerfMeter, open_source, source_from_argv
+from cv_utils.landmarks import FACE_LANDMARKS, LandmarkArrays
+
+def face3d_transform_matrix(scale=1.5, source=0):
     mp_drawing = mp.solutions.drawing_utils
     mp_face_mesh = mp.solutions.face_mesh
 
@@ -12,42 +18,53 @@ def face3d_transform_matrix(scale=1.5):
     # 3x3 transformation matrix (apply to x,y,z normalized coords)
     transformation_matrix = np.array([[scale, 0, 0],
                                       [0, scale, 0],
-                                      [0, 0, 1]])
+                                      [0, 0, 1]], dtype=np.float32)
+
+    # Reused (faces, 468, 3) float32 buffer, filled without a per-landmark loop
+    faces = LandmarkArrays(FACE_LANDMARKS, max_items=1)
 
-    cap = cv2.VideoCapture(0)
+    cap = open_source(source)
+    perf = PerfMeter("face3d_transform_matrix")
     while cap.isOpened():
         success, image = cap.read()
         if not success:
             break
+        perf.lap("capture")
         image = cv2.flip(image, 1)
         image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+        perf.lap("convert")
         results = face_mesh.process(image_rgb)
+        perf.lap("infer")
 
         transformed_image = image.copy()
-        if results.multi_face_landmarks:
-            for face_landmarks in results.multi_face_landmarks:
-                landmarks = np.zeros((468, 3), dtype=np.float32)
-                for i, lm in enumerate(face_landmarks.landmark):
-                    landmarks[i] = [lm.x, lm.y, lm.z]
-
+        landmarks, _ = faces.update(results.multi_face_landmarks)
+        if len(landmarks):
+            for face, face_landmarks in zip(landmarks, results.multi_face_landmarks):
                 # Apply transformation
-                transformed = landmarks @ transformation_matrix.T
+                transformed = face @ transformation_matrix.T
 
-                # Draw transformed landmarks
-                for (x_norm, y_norm, z) in transformed:
-                    x = int(x_norm * image.shape[1])
-                    y = int(y_norm * image.shape[0])
+                # Project to pixels in one op, then draw transformed landmarks
+                points = (transformed[:, :2] * (image.shape[1], image.shape[0])).astype(np.int32)
+                for x, y in points.tolist():
                     cv2.circle(transformed_image, (x, y), 1, (255, 0, 0), -1)
 
                 # Also draw original mesh for comparison
                 mp_drawing.draw_landmarks(transformed_image, face_landmarks, mp_face_mesh.FACEMESH_TESSELATION, landmark_drawing_spec=drawing_spec, connection_drawing_spec=drawing_spec)
 
+        perf.lap("draw")
+
+        # ➤ FPS + per-stage timings
+        perf.draw(transformed_image, origin=(10, 40), color=(255, 255, 0))
         cv2.imshow('Face 3D Transform (Matrix Scaling)', transformed_image)
-        if cv2.waitKey(1) & 0xFF == ord('q'):
+        key = cv2.waitKey(1) & 0xFF
+        perf.lap("display")
+        perf.tick()
+        if key == ord('q'):
             break
 
     cap.release()
     cv2.destroyAllWindows()
+    perf.close()
 
 if __name__ == '__main__':
-    face3d_transform_matrix()
+    face3d_transform_matrix(source=source_from_argv())
@@ -1,12 +1,23 @@
 import cv2
 import mediapipe as mp
+import sys
+from pathlib import Path
 
-def face3d_visualization():
-    mp_drawing = mp.solutions.drawing_utils
+sys.path.append(str(Path(__file__).resolve().parents[2]))     # repo root, for cv_utils
+from cv_utils import LandmarkArrays, PerfMeter, face_mesh_renderer, open_source, source_from_argv
+from cv_utils.landmarks import FACE_LANDMARKS
+
+def face3d_visualization(source=0, lod_width=120):
+    """lod_width: faces narrower than this many pixels are drawn with contours and irises only"""
     mp_drawing_styles = mp.solutions.drawing_styles
     mp_face_mesh = mp.solutions.face_mesh
 
-    cap = cv2.VideoCapture(0)
+    # Default mediapipe styles, batched: one cv2.polylines call per color instead of one cv2.line per edge
+    faces = LandmarkArrays(FACE_LANDMARKS)
+    renderer = face_mesh_renderer(mp_face_mesh, styles=mp_drawing_styles, irises=True, lod_width=lod_width)
+
+    cap = open_source(source)
+    perf = PerfMeter("face3d_visualization")
     with mp_face_mesh.FaceMesh(
         max_num_faces=1,
         refine_landmarks=True,
@@ -17,38 +28,32 @@ def face3d_visualization():
             if not success:
                 print("Ignoring empty camera frame.")
                 continue
+            perf.lap("capture")
 
             image.flags.writeable = False
             image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+            perf.lap("convert")
             results = face_mesh.process(image)
+            perf.lap("infer")
 
             image.flags.writeable = True
             image = cv2.cvtColor(image, cv2.COLOR_RGB2BGR)
-            if results.multi_face_landmarks:
-                for face_landmarks in results.multi_face_landmarks:
-                    mp_drawing.draw_landmarks(
-                        image=image,
-                        landmark_list=face_landmarks,
-                        connections=mp_face_mesh.FACEMESH_TESSELATION,
-                        landmark_drawing_spec=None,
-                        connection_drawing_spec=mp_drawing_styles.get_default_face_mesh_tesselation_style())
-                    mp_drawing.draw_landmarks(
-                        image=image,
-                        landmark_list=face_landmarks,
-                        connections=mp_face_mesh.FACEMESH_CONTOURS,
-                        landmark_drawing_spec=None,
-                        connection_drawing_spec=mp_drawing_styles.get_default_face_mesh_contours_style())
-                    mp_drawing.draw_landmarks(
-                        image=image,
-                        landmark_list=face_landmarks,
-                        connections=mp_face_mesh.FACEMESH_IRISES,
-                        landmark_drawing_spec=None,
-                        connection_drawing_spec=mp_drawing_styles.get_default_face_mesh_iris_connections_style())
-            cv2.imshow('MediaPipe Face Mesh - 3D Visualization', cv2.flip(image, 1))
-            if cv2.waitKey(1) & 0xFF == ord('q'):
+            _, px = faces.update(results.multi_face_landmarks, image.shape)
+            renderer.draw(image, px)
+            image = cv2.flip(image, 1)
+            perf.lap("draw")
+
+            # ➤ FPS + per-stage timings (drawn after the flip so the text reads normally)
+            perf.draw(image, origin=(10, 40), color=(255, 255, 0))
+            cv2.imshow('MediaPipe Face Mesh - 3D Visualization', image)
+            key = cv2.waitKey(1) & 0xFF
+            perf.lap("display")
+            perf.tick()
+            if key == ord('q'):
                 break
     cap.release()
     cv2.destroyAllWindows()
+    perf.close()
 
 if __name__ == '__main__':
-    face3d_visualization()
+    face3d_visualization(source=source_from_argv())
@@ -1,8 +1,13 @@
 import cv2
 import mediapipe as mp
 import numpy as np
+import sys
+from pathlib import Path
 
-def pose_color_ar():
+sys.path.append(str(Path(__file__).resolve().parents[2]))     # repo root, for cv_utils
+from cv_utils import PerfMeter, open_source, source_from_argv
+
+def pose_color_ar(source=0):
     mp_drawing = mp.solutions.drawing_utils
     mp_pose = mp.solutions.pose
 
@@ -13,14 +18,18 @@ def pose_color_ar():
     upper_color = np.array([50, 50, 50])
     new_color = np.array([0, 0, 255])
 
-    cap = cv2.VideoCapture(0)
+    cap = open_source(source)
+    perf = PerfMeter("pose_color_ar")
     while cap.isOpened():
         success, image = cap.read()
         if not success:
             break
+        perf.lap("capture")
         image = cv2.flip(image, 1)
         image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+        perf.lap("convert")
         results = pose.process(image_rgb)
+        perf.lap("infer")
 
         if results.pose_landmarks:
             mp_drawing.draw_landmarks(image, results.pose_landmarks, mp_pose.POSE_CONNECTIONS, drawing_spec, drawing_spec)
@@ -33,14 +42,21 @@ def pose_color_ar():
             colored_mask = cv2.bitwise_and(image, image, mask=mask)
             colored_mask[mask > 0] = new_color
             result = cv2.bitwise_or(image, colored_mask)
-            cv2.imshow('Pose-driven AR Color Change', result)
         else:
-            cv2.imshow('Pose-driven AR Color Change', image)
-
-        if cv2.waitKey(1) & 0xFF == ord('q'):
+            result = image
+        perf.lap("draw")
+
+        # ➤ FPS + per-stage timings
+        perf.draw(result, origin=(10, 40), color=(255, 255, 0))
+        cv2.imshow('Pose-driven AR Color Change', result)
+        key = cv2.waitKey(1) & 0xFF
+        perf.lap("display")
+        perf.tick()
+        if key == ord('q'):
             break
     cap.release()
     cv2.destroyAllWindows()
+    perf.close()
 
 if __name__ == '__main__':
-    pose_color_ar()
+    pose_color_ar(source=source_from_argv())
@@ -1,9 +1,13 @@
 import cv2
 import mediapipe as mp
-import time
 from collections import deque
+import sys
+from pathlib import Path
 
-def run_motion_tracking(trail_length=64, draw_trail=True):
+sys.path.append(str(Path(__file__).resolve().parents[2]))     # repo root, for cv_utils
+from cv_utils import PerfMeter, open_source, source_from_argv
+
+def run_motion_tracking(trail_length=64, draw_trail=True, source=0):
     # Real-time hand motion tracking using MediaPipe Hands.
     # - trail_length: number of points to remember for trail
     # - draw_trail: whether to draw motion trajectory for index fingertip
@@ -17,8 +21,8 @@ def run_motion_tracking(trail_length=64, draw_trail=True):
     # Deque to store fingertip positions for trail (index finger tip = landmark 8)
     pts = deque(maxlen=trail_length)
 
-    cap = cv2.VideoCapture(0)
-    previous_time = 0
+    cap = open_source(source)
+    perf = PerfMeter("motion_tracking")
 
     with mp_hands.Hands(static_image_mode=False, max_num_hands=2,
                         min_detection_confidence=0.5, min_tracking_confidence=0.5) as hands:
@@ -27,10 +31,13 @@ def run_motion_tracking(trail_length=64, draw_trail=True):
             if not success:
                 print("Failed to grab frame. Exiting...")
                 break
+            perf.lap("capture")
 
             frame = cv2.flip(frame, 1)  # mirror view
             rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            perf.lap("convert")
             results = hands.process(rgb)
+            perf.lap("infer")
 
             # Draw landmarks
             if results.multi_hand_landmarks:
@@ -52,14 +59,15 @@ def run_motion_tracking(trail_length=64, draw_trail=True):
                     thickness = int(max(1, 10 * (1 - i / float(len(pts)))))
                     cv2.line(frame, pts[i - 1], pts[i], (0, 255, 255), thickness)
 
-            # FPS calculation
-            current_time = time.time()
-            fps = 1 / (current_time - previous_time) if previous_time else 0
-            previous_time = current_time
-            cv2.putText(frame, f"FPS: {int(fps)}", (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 1, (0,255,0), 2)
+            perf.lap("draw")
+
+            # FPS + per-stage timings
+            perf.draw(frame)
 
             cv2.imshow("Instant Motion Tracking - MediaPipe Hands", frame)
             key = cv2.waitKey(1) & 0xFF
+            perf.lap("display")
+            perf.tick()
             if key == 27 or key == ord('q'):  # ESC or q to quit
                 break
             elif key == ord('c'):  # clear trail
@@ -67,6 +75,7 @@ def run_motion_tracking(trail_length=64, draw_trail=True):
 
     cap.release()
     cv2.destroyAllWindows()
+    perf.close()
 
 if __name__ == '__main__':
-    run_motion_tracking()
+    run_motion_tracking(source=source_from_argv())
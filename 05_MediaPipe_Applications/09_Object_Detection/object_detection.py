@@ -1,13 +1,17 @@
 import cv2
 import mediapipe as mp
-import time
+import sys
+from pathlib import Path
 
-def run_face_detection(min_detection_confidence=0.5):
+sys.path.append(str(Path(__file__).resolve().parents[2]))     # repo root, for cv_utils
+from cv_utils import PerfMeter, open_source, source_from_argv
+
+def run_face_detection(min_detection_confidence=0.5, source=0):
     mp_face_detection = mp.solutions.face_detection
     mp_drawing = mp.solutions.drawing_utils
 
-    cap = cv2.VideoCapture(0)
-    prev_time = 0
+    cap = open_source(source)
+    perf = PerfMeter("face_detection")
 
     with mp_face_detection.FaceDetection(min_detection_confidence=min_detection_confidence) as face_detection:
         while cap.isOpened():
@@ -15,11 +19,14 @@ def run_face_detection(min_detection_confidence=0.5):
             if not success:
                 print("Failed to read frame from webcam.")
                 break
+            perf.lap("capture")
 
             frame = cv2.flip(frame, 1)
             rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            perf.lap("convert")
 
             results = face_detection.process(rgb)
+            perf.lap("infer")
 
             face_count = 0
             if results.detections:
@@ -42,22 +49,24 @@ def run_face_detection(min_detection_confidence=0.5):
                     cv2.rectangle(frame, (x, y-25), (x + len(label)*10, y), (0, 0, 0), -1)
                     cv2.putText(frame, label, (x+2, y-5), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0,255,0), 2)
 
-            # FPS
-            curr_time = time.time()
-            fps = 1 / (curr_time - prev_time) if prev_time else 0
-            prev_time = curr_time
-            cv2.putText(frame, f"FPS: {int(fps)}", (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 1, (0,255,0), 2)
+            perf.lap("draw")
+
+            # FPS + per-stage timings
+            perf.draw(frame)
 
-            # Face count
-            cv2.putText(frame, f"Faces: {face_count}", (10, 60), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255,255,0), 2)
+            # Face count (below the stage timings line)
+            cv2.putText(frame, f"Faces: {face_count}", (10, 80), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255,255,0), 2)
 
             cv2.imshow("MediaPipe Face Detection - 2D", frame)
             key = cv2.waitKey(1) & 0xFF
+            perf.lap("display")
+            perf.tick()
             if key == 27 or key == ord('q'):
                 break
 
     cap.release()
     cv2.destroyAllWindows()
+    perf.close()
 
 if __name__ == '__main__':
-    run_face_detection()
+    run_face_detection(source=source_from_argv())
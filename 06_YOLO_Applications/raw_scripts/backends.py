@@ -0,0 +1,236 @@
+"""
+backends.py
+-----------
+Export-and-cache layer that lets the YOLO raw_scripts switch inference backends at runtime.
+
+✅ Each weight file is exported once to ONNX (and optionally INT8-quantized ONNX) or OpenVINO.
+✅ Artifacts are cached in weights/cache/, keyed by weight-file hash + imgsz, and reused on later runs.
+✅ `--backend {torch,onnx,onnx-int8,openvino}` switch for every script via add_backend_argument().
+✅ Benchmark: latency and mAP drift (vs. the PyTorch outputs) per backend on the demo videos.
+
+Usage:
+    python backends.py export --weights yolov8n.pt yolov8n-seg.pt --backend onnx onnx-int8
+    python backends.py benchmark --weights yolov8n.pt --videos demo_videos/*.mp4
+"""
+import argparse
+import hashlib
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+from ultralytics import YOLO
+
+from tracker import detections_from_result, iou_matrix
+
+WEIGHTS_DIR = Path(__file__).resolve().parent.parent / "weights"
+CACHE_DIR = WEIGHTS_DIR / "cache"
+BACKENDS = ["torch", "onnx", "onnx-int8", "openvino"]
+
+
+def resolve_weights(name):
+    """Prefer the bundled copy in weights/, fall back to the name (Ultralytics auto-downloads)."""
+    path = Path(name)
+    if path.exists():
+        return path
+    if (WEIGHTS_DIR / path.name).exists():
+        return WEIGHTS_DIR / path.name
+    return path
+
+
+def guess_task(weights):
+    stem = Path(weights).stem
+    if stem.endswith("-seg"):
+        return "segment"
+    if stem.endswith("-pose"):
+        return "pose"
+    return "detect"
+
+
+def file_hash(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()[:12]
+
+
+def _export_into_cache(weights, target, **export_kwargs):
+    """
+    Export from a private copy of the weights (Ultralytics writes next to the .pt) and move the result
+    into place with os.replace, so concurrent processes on a cold cache never clobber each other.
+    """
+    with tempfile.TemporaryDirectory(dir=CACHE_DIR, prefix=f".export-{os.getpid()}-") as scratch:
+        private = Path(scratch) / weights.name
+        shutil.copy2(weights, private)
+        exported = Path(YOLO(str(private)).export(**export_kwargs))
+        try:
+            os.replace(exported, target)
+        except OSError:
+            if not target.exists():                          # a directory (OpenVINO) another process already
+                raise                                        # placed is left as is; anything else is an error
+    return target
+
+
+def cached_artifact(weights, backend, imgsz=640):
+    """Path of the exported artifact for (weights, backend, imgsz), exporting it on first use."""
+    weights = resolve_weights(weights)
+    if backend == "torch":
+        return weights
+    if not weights.exists():
+        YOLO(str(weights))                                   # trigger the Ultralytics download
+        weights = resolve_weights(weights.name)
+    key = f"{weights.stem}-{file_hash(weights)}-{imgsz}"
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+
+    if backend == "openvino":
+        target = CACHE_DIR / f"{key}_openvino_model"
+        if not target.exists():
+            _export_into_cache(weights, target, format="openvino", imgsz=imgsz, dynamic=True)
+        return target
+
+    onnx_path = CACHE_DIR / f"{key}.onnx"
+    if not onnx_path.exists():
+        print(f"⏳ Exporting {weights.name} → ONNX (one-time)...")
+        _export_into_cache(weights, onnx_path, format="onnx", imgsz=imgsz, dynamic=True, simplify=True)
+    if backend == "onnx":
+        return onnx_path
+
+    int8_path = CACHE_DIR / f"{key}.int8.onnx"
+    if not int8_path.exists():
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+        print(f"⏳ Quantizing {onnx_path.name} → INT8 (one-time)...")
+        partial = int8_path.with_name(f".{int8_path.stem}.{os.getpid()}.onnx")
+        quantize_dynamic(str(onnx_path), str(partial), weight_type=QuantType.QUInt8)
+        os.replace(partial, int8_path)
+    return int8_path
+
+
+def load_model(weights, backend="torch", imgsz=640):
+    """Drop-in replacement for YOLO(weights) that honours the --backend switch."""
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend '{backend}', choose from {BACKENDS}")
+    return YOLO(str(cached_artifact(weights, backend, imgsz)), task=guess_task(weights))
+
+
+def add_backend_argument(parser):
+    parser.add_argument("--backend", choices=BACKENDS, default="torch",
+                        help="Inference backend; non-torch backends are exported once and cached (default: torch)")
+    return parser
+
+
+# ➤ Benchmark
+def average_precision(reference, predictions, iou_threshold=0.5):
+    """
+    AP@iou of `predictions` against `reference` detections (both lists of (N, 6) arrays per frame).
+    Used as "mAP drift": how far a backend's outputs move away from the PyTorch outputs.
+    """
+    scores, hits, total = [], [], 0
+    for ref, pred in zip(reference, predictions):
+        total += len(ref)
+        if not len(pred):
+            continue
+        order = np.argsort(-pred[:, 4])
+        pred = pred[order]
+        matched = np.zeros(len(ref), dtype=bool)
+        if len(ref):
+            iou = iou_matrix(pred[:, :4], ref[:, :4]) * (pred[:, 5:6] == ref[None, :, 5])
+        else:
+            iou = np.zeros((len(pred), 0))
+        for i in range(len(pred)):
+            candidates = np.where(~matched & (iou[i] >= iou_threshold))[0]
+            hit = len(candidates) > 0
+            if hit:
+                matched[candidates[np.argmax(iou[i, candidates])]] = True
+            scores.append(pred[i, 4])
+            hits.append(hit)
+    if not total:
+        return float("nan")
+    order = np.argsort(-np.array(scores))
+    tp = np.cumsum(np.array(hits, dtype=float)[order])
+    precision = tp / np.arange(1, len(tp) + 1)
+    recall = tp / total
+    # Area under the monotone precision envelope
+    precision = np.maximum.accumulate(precision[::-1])[::-1]
+    return float(np.sum(np.diff(np.r_[0.0, recall]) * precision))
+
+
+def read_frames(videos, max_frames):
+    frames = []
+    for video in videos:
+        cap = cv2.VideoCapture(str(video))
+        while len(frames) < max_frames:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            frames.append(frame)
+        cap.release()
+    return frames
+
+
+def benchmark(weights, backends, videos, imgsz=640, max_frames=200, warmup=5):
+    frames = read_frames(videos, max_frames)
+    if not frames:
+        raise FileNotFoundError("No frames could be read from the given videos")
+    report, reference = {}, None
+    for backend in backends:
+        model = load_model(weights, backend, imgsz)
+        for frame in frames[:warmup]:
+            model.predict(frame, imgsz=imgsz, verbose=False)
+        latencies, outputs = [], []
+        for frame in frames:
+            start = time.perf_counter()
+            result = model.predict(frame, imgsz=imgsz, verbose=False)[0]
+            latencies.append((time.perf_counter() - start) * 1000)
+            outputs.append(detections_from_result(result))
+        if reference is None:
+            reference = outputs                             # the first backend (torch) is the reference
+        latencies = np.array(latencies)
+        report[backend] = {
+            "mean_ms": round(float(latencies.mean()), 2),
+            "p50_ms": round(float(np.percentile(latencies, 50)), 2),
+            "p95_ms": round(float(np.percentile(latencies, 95)), 2),
+            "fps": round(1000 / float(latencies.mean()), 1),
+            "map50_vs_reference": round(average_precision(reference, outputs), 4),
+        }
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export / benchmark YOLO inference backends")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    export = sub.add_parser("export", help="Export weights to cached backend artifacts")
+    export.add_argument("--weights", nargs="+", default=[p.name for p in sorted(WEIGHTS_DIR.glob("*.pt"))])
+    export.add_argument("--backend", nargs="+", choices=BACKENDS[1:], default=["onnx", "onnx-int8"])
+    export.add_argument("--imgsz", type=int, default=640)
+
+    bench = sub.add_parser("benchmark", help="Latency and mAP drift per backend")
+    bench.add_argument("--weights", default="yolov8n.pt")
+    bench.add_argument("--backend", nargs="+", choices=BACKENDS, default=["torch", "onnx", "onnx-int8"])
+    bench.add_argument("--videos", nargs="+",
+                       default=sorted(str(p) for p in (Path(__file__).parent / "demo_videos").glob("*.mp4")))
+    bench.add_argument("--imgsz", type=int, default=640)
+    bench.add_argument("--max-frames", type=int, default=200)
+    args = parser.parse_args()
+
+    if args.command == "export":
+        for weights in args.weights:
+            for backend in args.backend:
+                print(f"✅ {weights} [{backend}] → {cached_artifact(weights, backend, args.imgsz)}")
+        return
+
+    backends = ["torch"] + [b for b in args.backend if b != "torch"]
+    report = benchmark(args.weights, backends, args.videos, args.imgsz, args.max_frames)
+    print(f"\n📊 {args.weights} @ {args.imgsz} on {len(args.videos)} video(s)")
+    print(f"{'backend':<12}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}{'fps':>8}{'mAP50 vs torch':>16}")
+    for backend, row in report.items():
+        print(f"{backend:<12}{row['mean_ms']:>10}{row['p50_ms']:>10}{row['p95_ms']:>10}{row['fps']:>8}"
+              f"{row['map50_vs_reference']:>16}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+"""
+bench.py
+--------
+Benchmark suite for the YOLO tasks on the bundled demo videos, with machine-readable JSON output.
+
+✅ Runs detection, segmentation, pose and tracking over demo_videos/*.mp4 × weight files.
+✅ Per-stage timings: decode, preprocess, inference, postprocess, track, render, encode.
+✅ p50 / p95 / p99 latency per stage and end to end, frames/sec, peak RSS.
+✅ Each (video, weights, task) run gets its own process, so peak RSS isn't polluted by earlier runs.
+✅ --compare old.json prints per-run regressions between two reports.
+
+Usage:
+    python bench.py --out bench.json
+    python bench.py --tasks detect track --weights yolov8n.pt --max-frames 100 --out after.json --compare before.json
+"""
+import argparse
+import json
+import platform
+import resource
+import sys
+import tempfile
+import time
+from multiprocessing import get_context
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from backends import WEIGHTS_DIR, guess_task, load_model
+from renderer import Renderer
+from tracker import ByteTracker, detections_from_result, draw_tracks
+
+DEMO_VIDEOS = Path(__file__).resolve().parent / "demo_videos"
+DEFAULT_WEIGHTS = ["yolov8n.pt", "yolov8n-seg.pt", "yolov8n-pose.pt"]
+STAGES = ["decode", "preprocess", "inference", "postprocess", "track", "render", "encode"]
+PERCENTILES = (50, 95, 99)
+
+
+def summarize(values_ms):
+    values = np.asarray(values_ms, dtype=np.float64)
+    if not len(values):
+        return None
+    summary = {"mean": round(float(values.mean()), 3)}
+    summary.update({f"p{q}": round(float(v), 3) for q, v in zip(PERCENTILES, np.percentile(values, PERCENTILES))})
+    return summary
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process (ru_maxrss is KiB on Linux, bytes on macOS)."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def run_case(case):
+    """Benchmark one (video, weights, task, backend) case and return its JSON record."""
+    video, weights, task = case["video"], case["weights"], case["task"]
+    model = load_model(weights, case["backend"], case["imgsz"])
+    renderer = Renderer(model.names)
+    tracker = ByteTracker() if task == "track" else None
+    cap = cv2.VideoCapture(video)
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    timings = {stage: [] for stage in STAGES}
+    totals = []
+    writer = None
+
+    with tempfile.TemporaryDirectory() as tmp:
+        frames = 0
+        while frames < case["max_frames"] + case["warmup"]:
+            start = time.perf_counter()
+            ok, frame = cap.read()
+            if not ok:
+                break
+            decoded = time.perf_counter()
+
+            result = model.predict(frame, imgsz=case["imgsz"], verbose=False)[0]
+            predicted = time.perf_counter()
+            tracks = tracker.update(detections_from_result(result)) if tracker else None
+            tracked = time.perf_counter()
+            annotated = draw_tracks(frame, tracks, model.names) if tracker else renderer.draw(frame, result)
+            rendered = time.perf_counter()
+
+            if writer is None:
+                height, width = annotated.shape[:2]
+                writer = cv2.VideoWriter(str(Path(tmp) / "bench.mp4"), cv2.VideoWriter_fourcc(*"mp4v"),
+                                         fps, (width, height))
+            writer.write(annotated)
+            encoded = time.perf_counter()
+
+            frames += 1
+            if frames <= case["warmup"]:
+                continue
+            # Ultralytics reports its own pre/inference/post split in ms; the rest is wall-clock here
+            speed = result.speed
+            timings["decode"].append((decoded - start) * 1000)
+            timings["preprocess"].append(speed.get("preprocess", 0.0))
+            timings["inference"].append(speed.get("inference", 0.0))
+            timings["postprocess"].append(speed.get("postprocess", 0.0))
+            if tracker:
+                timings["track"].append((tracked - predicted) * 1000)
+            timings["render"].append((rendered - tracked) * 1000)
+            timings["encode"].append((encoded - rendered) * 1000)
+            totals.append((encoded - start) * 1000)
+        if writer is not None:
+            writer.release()
+    cap.release()
+
+    measured = len(totals)
+    return {
+        "video": Path(video).name,
+        "weights": Path(weights).name,
+        "task": task,
+        "backend": case["backend"],
+        "imgsz": case["imgsz"],
+        "frames": measured,
+        "fps": round(measured / (sum(totals) / 1000), 2) if measured else 0.0,
+        "latency_ms": summarize(totals),
+        "stages_ms": {stage: summarize(values) for stage, values in timings.items() if values},
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def build_cases(videos, weights, tasks, backend, imgsz, max_frames, warmup):
+    cases = []
+    for weight in weights:
+        task = guess_task(weight)
+        for run_task in [task] + (["track"] if task == "detect" else []):
+            if run_task not in tasks:
+                continue
+            for video in videos:
+                cases.append({"video": str(video), "weights": weight, "task": run_task, "backend": backend,
+                              "imgsz": imgsz, "max_frames": max_frames, "warmup": warmup})
+    return cases
+
+
+def environment():
+    info = {"python": platform.python_version(), "platform": platform.platform(),
+            "processor": platform.processor() or platform.machine(), "opencv": cv2.__version__,
+            "numpy": np.__version__, "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S")}
+    try:
+        import torch
+        import ultralytics
+        info.update(torch=torch.__version__, ultralytics=ultralytics.__version__,
+                    cuda=torch.cuda.get_device_name(0) if torch.cuda.is_available() else None)
+    except ImportError:
+        pass
+    return info
+
+
+def compare(old_report, new_report, metric="p50"):
+    """Print the end-to-end latency change per run present in both reports."""
+    def key(run):
+        return run["video"], run["weights"], run["task"], run["backend"], run["imgsz"]
+
+    old_runs = {key(run): run for run in old_report["runs"]}
+    print(f"\n📈 Latency {metric} change vs. previous report")
+    for run in new_report["runs"]:
+        old = old_runs.get(key(run))
+        if not old or not old["latency_ms"] or not run["latency_ms"]:
+            continue
+        before, after = old["latency_ms"][metric], run["latency_ms"][metric]
+        change = (after - before) / before * 100 if before else 0.0
+        flag = "⚠️ " if change > 5 else "  "
+        print(f"{flag}{run['task']:<8}{run['weights']:<20}{run['video']:<32}"
+              f"{before:>9.2f} → {after:>9.2f} ms ({change:+.1f}%)")
+
+
+def main():
+    bundled = sorted(p.name for p in WEIGHTS_DIR.glob("*.pt"))
+    parser = argparse.ArgumentParser(description="Benchmark YOLO tasks on the demo videos")
+    parser.add_argument("--videos", nargs="+", default=sorted(str(p) for p in DEMO_VIDEOS.glob("*.mp4")))
+    parser.add_argument("--weights", nargs="+", default=sorted(set(DEFAULT_WEIGHTS + bundled)),
+                        help="Weight files (default: the scripts' weights plus everything in weights/)")
+    parser.add_argument("--tasks", nargs="+", choices=["detect", "segment", "pose", "track"],
+                        default=["detect", "segment", "pose", "track"])
+    parser.add_argument("--backend", default="torch", help="Inference backend (see backends.py)")
+    parser.add_argument("--imgsz", type=int, default=640)
+    parser.add_argument("--max-frames", type=int, default=300, help="Measured frames per video")
+    parser.add_argument("--warmup", type=int, default=10, help="Unmeasured frames at the start of each run")
+    parser.add_argument("--no-isolate", action="store_true", help="Run every case in this process")
+    parser.add_argument("--out", default="bench.json", help="JSON report path")
+    parser.add_argument("--compare", metavar="JSON", help="Previous report to diff against")
+    args = parser.parse_args()
+
+    cases = build_cases(args.videos, args.weights, args.tasks, args.backend, args.imgsz,
+                        args.max_frames, args.warmup)
+    if not cases:
+        parser.error("no (video, weights, task) combinations to run")
+
+    runs = []
+    if args.no_isolate:
+        results = map(run_case, cases)
+    else:
+        pool = get_context("spawn").Pool(1, maxtasksperchild=1)
+        results = pool.imap(run_case, cases)
+    for run in results:
+        runs.append(run)
+        latency = run["latency_ms"] or {}
+        print(f"✅ {run['task']:<8}{run['weights']:<20}{run['video']:<32}{run['fps']:>8} fps  "
+              f"p50 {latency.get('p50', 0):>7.2f} ms  p99 {latency.get('p99', 0):>7.2f} ms  "
+              f"RSS {run['peak_rss_mb']} MB")
+    if not args.no_isolate:
+        pool.close()
+        pool.join()
+
+    report = {"environment": environment(), "config": vars(args), "runs": runs}
+    Path(args.out).write_text(json.dumps(report, indent=2))
+    print(f"📊 Wrote {len(runs)} runs to {args.out}")
+    if args.compare:
+        compare(json.loads(Path(args.compare).read_text()), report)
+
+
+if __name__ == "__main__":
+    main()
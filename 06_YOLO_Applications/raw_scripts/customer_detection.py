@@ -1,34 +1,60 @@
-import cv2
-from ultralytics import YOLO
+import argparse
+import sys
+from pathlib import Path
+
+from backends import add_backend_argument, load_model
+from motion_gate import MotionGate, add_motion_gate_arguments, print_report
+from pipeline import ThreadedPipeline
+from renderer import Renderer
+from roi import add_roi_arguments, roi_from_args
+from tracker import detections_from_result, draw_tracks
+from video_writer import add_writer_arguments, writer_from_args
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))   # repo root, for cv_utils
+from cv_utils.frame_source import add_source_argument, source_from_args
+
+parser = argparse.ArgumentParser(description="YOLOv8 customer detection")
+add_backend_argument(parser)
+add_writer_arguments(parser)
+add_motion_gate_arguments(parser)
+add_roi_arguments(parser)
+add_source_argument(parser)
+args = parser.parse_args()
 
 # Load the YOLOv8 model trained for customer detection
-model = YOLO('yolov8n-custom.pt')
+model = load_model('yolov8n-custom.pt', args.backend)
 
-# Initialize the video capture object
-cap = cv2.VideoCapture(0)
+# Draws into the captured frame in place instead of allocating a new image like results[0].plot()
+renderer = Renderer(model.names)
 
-if not cap.isOpened():
-    print("Error: Could not open video stream.")
-    exit()
+# Entrance/aisle cameras: optionally analyse only the ROI polygons, at the smallest imgsz that fits --min-object
+roi = roi_from_args(model, args)
 
-while True:
-    ret, frame = cap.read()
-    if not ret:
-        print("Error: Could not read frame.")
-        break
+# Static store scenes: optionally run YOLO only when enough pixels change, tracking boxes in between
+gate = None
+if args.motion_gate is not None:
+    detect = roi.detections if roi else (lambda frame: detections_from_result(model(frame)[0]))
+    gate = MotionGate(detect, threshold=args.motion_gate, max_interval=args.max_interval)
 
-    # Perform inference on the frame
-    results = model(frame)
 
+def render(frame, output):
     # Annotate the frame
-    annotated_frame = results[0].plot()
-
-    # Display the annotated frame
-    cv2.imshow('YOLOv8 Customer Detection', annotated_frame)
+    frame = draw_tracks(frame, output, model.names) if gate else renderer.draw(frame, output)
+    return roi.draw(frame) if roi else frame
 
-    # Exit on pressing 'q'
-    if cv2.waitKey(1) & 0xFF == ord('q'):
-        break
 
-cap.release()
-cv2.destroyAllWindows()
\ No newline at end of file
+# Initialize the video capture object
+cap = source_from_args(args)
+
+# Capture, inference and display run on separate threads
+pipeline = ThreadedPipeline(
+    cap,
+    infer=gate or roi or (lambda frame: model(frame)[0]),  # Perform inference on the frame
+    render=render,
+    window_name='YOLOv8 Customer Detection',
+    writer=writer_from_args(args, cap),  # Optional non-blocking recording (--save)
+)
+pipeline.run()
+
+if gate:
+    print_report(gate)
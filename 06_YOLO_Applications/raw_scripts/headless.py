@@ -0,0 +1,230 @@
+"""
+headless.py
+-----------
+Headless batch video processing for the YOLO raw_scripts (no webcam, no cv2.imshow).
+
+✅ Same six tasks as the live scripts: detect, segment, pose, count, track, customer.
+✅ Takes video files and/or directories of videos.
+✅ Frame skipping (--stride) and batched inference (--batch).
+✅ Writes an annotated MP4 (software mp4v encoder, no GPU/hardware codec needed) plus a JSONL or
+   Parquet results file per video.
+✅ Progress reported in frames/sec; --workers shards videos across processes.
+
+Usage:
+    python headless.py detect demo_videos/ --out outputs/
+    python headless.py track demo_videos/Squats.demo.video.mp4 --stride 2 --batch 8 --workers 2
+    python headless.py pose demo_videos/ --results parquet --no-video
+"""
+import argparse
+import json
+import time
+from multiprocessing import Pool
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from backends import add_backend_argument, cached_artifact, load_model
+from counting import LineZoneCounter
+from tracker import ByteTracker, detections_from_result, draw_tracks
+from video_writer import AsyncVideoWriter
+
+TASKS = {
+    "detect": "yolov8n.pt",
+    "segment": "yolov8n-seg.pt",
+    "pose": "yolov8n-pose.pt",
+    "count": "yolov8n.pt",
+    "track": "yolov8n.pt",
+    "customer": "yolov8n-custom.pt",
+}
+VIDEO_SUFFIXES = {".mp4", ".avi", ".mov", ".mkv", ".m4v"}
+
+
+def collect_videos(inputs):
+    """Expand files and directories into a sorted list of video paths."""
+    videos = []
+    for item in map(Path, inputs):
+        if item.is_dir():
+            videos += sorted(p for p in item.iterdir() if p.suffix.lower() in VIDEO_SUFFIXES)
+        elif item.exists():
+            videos.append(item)
+        else:
+            print(f"⚠️ Skipping missing input: {item}")
+    return videos
+
+
+def frame_record(video, index, timestamp, result, tracks=None):
+    """One JSON-serializable record per processed frame."""
+    record = {"video": video, "frame": index, "time": round(timestamp, 4)}
+    if tracks is not None:
+        record.update(boxes=tracks[:, :4].round(1).tolist(), track_ids=tracks[:, 4].astype(int).tolist(),
+                      scores=tracks[:, 5].round(3).tolist(), classes=tracks[:, 6].astype(int).tolist())
+        return record
+    boxes = result.boxes
+    record.update(boxes=boxes.xyxy.cpu().numpy().round(1).tolist(),
+                  scores=boxes.conf.cpu().numpy().round(3).tolist(),
+                  classes=boxes.cls.cpu().numpy().astype(int).tolist())
+    if result.keypoints is not None:
+        record["keypoints"] = result.keypoints.data.cpu().numpy().round(2).tolist()
+    return record
+
+
+def write_results(records, path):
+    if path.suffix == ".parquet":
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        pq.write_table(pa.Table.from_pylist(records), path)
+    else:
+        with open(path, "w", encoding="utf-8") as f:
+            for record in records:
+                f.write(json.dumps(record) + "\n")
+
+
+class VideoJob:
+    """Processes one video for one task: read → (skip) → batch predict → annotate → encode."""
+
+    def __init__(self, model, task, out_dir, stride=1, batch=8, imgsz=640, write_video=True,
+                 results_format="jsonl", progress_every=2.0):
+        self.model = model
+        self.task = task
+        self.out_dir = Path(out_dir)
+        self.stride = max(1, stride)
+        self.batch = max(1, batch)
+        self.imgsz = imgsz
+        self.write_video = write_video
+        self.results_format = results_format
+        self.progress_every = progress_every
+
+    def run(self, video_path):
+        video_path = Path(video_path)
+        cap = cv2.VideoCapture(str(video_path))
+        if not cap.isOpened():
+            print(f"❌ Could not open video: {video_path}")
+            return None
+        fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+        total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        stem = f"{video_path.stem}.{self.task}"
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+
+        writer = None
+        tracker = ByteTracker() if self.task in ("track", "count") else None
+        counter = LineZoneCounter(lines={"line": np.array([[0, 0.5], [1, 0.5]])},
+                                  max_age=tracker.max_age) if self.task == "count" else None
+        records, pending = [], []
+        processed, index = 0, 0
+        started = last_report = time.perf_counter()
+
+        def flush():
+            nonlocal writer, processed
+            results = self.model.predict([frame for _, frame in pending], imgsz=self.imgsz, verbose=False)
+            for (frame_index, frame), result in zip(pending, results):
+                tracks = None
+                if tracker is not None:
+                    tracks = tracker.update(detections_from_result(result))
+                    annotated = draw_tracks(frame, tracks, self.model.names)
+                    if counter is not None:
+                        counter.update(tracks, frame.shape)
+                        counter.draw(annotated)
+                else:
+                    annotated = result.plot() if self.write_video else None
+                records.append(frame_record(video_path.name, frame_index, frame_index / fps, result, tracks))
+                if self.write_video:
+                    if writer is None:
+                        # Encoding overlaps with decode/inference; block=True so no frame is ever dropped
+                        writer = AsyncVideoWriter(self.out_dir / f"{stem}.mp4", fps / self.stride, block=True)
+                    writer.write(annotated)
+                processed += 1
+            pending.clear()
+
+        while True:
+            # grab() skips decoding-to-BGR work for frames we are not going to process
+            if index % self.stride:
+                if not cap.grab():
+                    break
+                index += 1
+                continue
+            ret, frame = cap.read()
+            if not ret:
+                break
+            pending.append((index, frame))
+            index += 1
+            if len(pending) == self.batch:
+                flush()
+            now = time.perf_counter()
+            if now - last_report >= self.progress_every:
+                print(f"  [{video_path.name}] {index}/{total} frames read, "
+                      f"{processed / (now - started):.1f} fps processed")
+                last_report = now
+        if pending:
+            flush()
+
+        cap.release()
+        if writer is not None:
+            writer.close()
+        results_path = self.out_dir / f"{stem}.{self.results_format}"
+        write_results(records, results_path)
+        elapsed = time.perf_counter() - started
+        summary = {"video": str(video_path), "frames_read": index, "frames_processed": processed,
+                   "seconds": round(elapsed, 2), "fps": round(processed / max(elapsed, 1e-9), 2),
+                   "results": str(results_path)}
+        if counter is not None:
+            summary["line_in"], summary["line_out"] = int(counter.line_in[0]), int(counter.line_out[0])
+        print(f"✅ {video_path.name}: {processed} frames in {elapsed:.1f}s ({summary['fps']} fps)")
+        return summary
+
+
+# ➤ Process pool: one model per worker, loaded once
+_job = None
+
+
+def _init_worker(job_kwargs):
+    global _job
+    model = load_model(job_kwargs.pop("weights"), job_kwargs.pop("backend"))
+    _job = VideoJob(model, **job_kwargs)
+
+
+def _run_video(video_path):
+    return _job.run(video_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless batch YOLO video processing")
+    parser.add_argument("task", choices=sorted(TASKS), help="Which raw_script task to run")
+    parser.add_argument("inputs", nargs="+", help="Video files and/or directories")
+    parser.add_argument("--out", "-o", default="outputs", help="Output directory (default: outputs)")
+    parser.add_argument("--weights", help="Override the task's default weights")
+    parser.add_argument("--stride", type=int, default=1, help="Process every Nth frame (default: 1)")
+    parser.add_argument("--batch", type=int, default=8, help="Frames per predict call (default: 8)")
+    parser.add_argument("--imgsz", type=int, default=640, help="Inference size (default: 640)")
+    parser.add_argument("--results", choices=["jsonl", "parquet"], default="jsonl", help="Results file format")
+    parser.add_argument("--no-video", action="store_true", help="Skip writing annotated MP4s")
+    parser.add_argument("--workers", type=int, default=1, help="Shard videos across N processes")
+    add_backend_argument(parser)
+    args = parser.parse_args()
+
+    videos = collect_videos(args.inputs)
+    if not videos:
+        parser.error("no input videos found")
+
+    job_kwargs = dict(weights=args.weights or TASKS[args.task], backend=args.backend, task=args.task,
+                      out_dir=args.out, stride=args.stride, batch=args.batch, imgsz=args.imgsz,
+                      write_video=not args.no_video, results_format=args.results)
+    print(f"🚀 {args.task}: {len(videos)} video(s), {args.workers} worker(s)")
+    started = time.perf_counter()
+    if args.workers > 1:
+        cached_artifact(job_kwargs["weights"], args.backend)     # export once here, not in every worker
+        with Pool(min(args.workers, len(videos)), initializer=_init_worker, initargs=(job_kwargs,)) as pool:
+            summaries = pool.map(_run_video, videos, chunksize=1)
+    else:
+        _init_worker(job_kwargs)
+        summaries = [_run_video(video) for video in videos]
+
+    summaries = [s for s in summaries if s]
+    frames = sum(s["frames_processed"] for s in summaries)
+    elapsed = time.perf_counter() - started
+    print(f"📊 {frames} frames from {len(summaries)} video(s) in {elapsed:.1f}s "
+          f"({frames / max(elapsed, 1e-9):.1f} fps overall)")
+
+
+if __name__ == "__main__":
+    main()
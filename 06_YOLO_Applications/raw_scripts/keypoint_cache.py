@@ -0,0 +1,187 @@
+"""
+keypoint_cache.py
+-----------------
+Persistent pose-keypoint cache, so re-tuning exercise thresholds doesn't mean re-running YOLO pose.
+
+✅ Stores per-frame keypoints, boxes and confidences as memory-mapped .npy files.
+✅ Keyed by (video content hash, weights hash, imgsz, conf) — any change to the inputs is a cache miss.
+✅ Re-analysis on the same inputs is near-instant and memory-maps only the frame range it reads.
+✅ Entries are written to a temp directory and renamed when complete, so a crash never leaves a half cache.
+
+Layout:
+    weights/cache/keypoints/<key>/
+        meta.json              frames, fps, max_persons, source info
+        keypoints.npy          (T, P, 17, 3) float32, NaN-padded
+        boxes.npy              (T, P, 4) float32
+        scores.npy             (T, P) float32 (NaN where no person)
+
+Usage:
+    cache = KeypointCache()
+    entry = cache.get_or_compute("demo_videos/Squats.demo.video.mp4", "yolo11m-pose.pt")
+    kpts = entry.keypoints[300:600]                 # only these frames are paged in
+
+    python keypoint_cache.py demo_videos/ --weights yolo11m-pose.pt
+"""
+import argparse
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from backends import CACHE_DIR, file_hash, load_model, resolve_weights
+
+KEYPOINT_CACHE_DIR = CACHE_DIR / "keypoints"
+MAX_PERSONS = 8
+
+
+class CacheEntry:
+    """Read-only, memory-mapped view of one cached analysis."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.meta = json.loads((self.path / "meta.json").read_text())
+        self.frames = self.meta["frames"]
+        self.fps = self.meta["fps"]
+        self._arrays = {}
+
+    def _array(self, name):
+        if name not in self._arrays:
+            self._arrays[name] = np.load(self.path / f"{name}.npy", mmap_mode="r")[:self.frames]
+        return self._arrays[name]
+
+    @property
+    def keypoints(self):
+        return self._array("keypoints")
+
+    @property
+    def boxes(self):
+        return self._array("boxes")
+
+    @property
+    def scores(self):
+        return self._array("scores")
+
+    def primary_person(self, start=0, stop=None):
+        """(T, 17, 3) keypoints of the most confident person per frame over [start, stop)."""
+        scores = np.nan_to_num(np.asarray(self.scores[start:stop]), nan=-1.0)
+        best = scores.argmax(axis=1)
+        keypoints = np.asarray(self.keypoints[start:stop])
+        return keypoints[np.arange(len(best)), best]
+
+
+class KeypointCache:
+    def __init__(self, root=KEYPOINT_CACHE_DIR):
+        self.root = Path(root)
+        self._hash_index_path = self.root / "video_hashes.json"
+
+    # ➤ Keys
+    def video_hash(self, video_path):
+        """Content hash of a video, memoized by (path, size, mtime) so big files are hashed once."""
+        video_path = Path(video_path).resolve()
+        stat = video_path.stat()
+        index = json.loads(self._hash_index_path.read_text()) if self._hash_index_path.exists() else {}
+        stamp = f"{stat.st_size}:{stat.st_mtime_ns}"
+        known = index.get(str(video_path))
+        if known and known["stamp"] == stamp:
+            return known["hash"]
+        digest = file_hash(video_path)
+        index[str(video_path)] = {"stamp": stamp, "hash": digest}
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._hash_index_path.write_text(json.dumps(index, indent=1))
+        return digest
+
+    def key(self, video_path, weights, imgsz=640, conf=0.25):
+        weights = resolve_weights(weights)
+        weights_hash = file_hash(weights) if weights.exists() else weights.name
+        return f"{self.video_hash(video_path)}-{weights_hash}-{imgsz}-{conf:g}"
+
+    # ➤ Lookup / build
+    def get(self, video_path, weights, imgsz=640, conf=0.25):
+        path = self.root / self.key(video_path, weights, imgsz, conf)
+        return CacheEntry(path) if (path / "meta.json").exists() else None
+
+    def get_or_compute(self, video_path, weights, imgsz=640, conf=0.25, batch=16):
+        entry = self.get(video_path, weights, imgsz, conf)
+        if entry is not None:
+            return entry
+        return self.compute(video_path, weights, imgsz, conf, batch)
+
+    def compute(self, video_path, weights, imgsz=640, conf=0.25, batch=16, max_persons=MAX_PERSONS):
+        key = self.key(video_path, weights, imgsz, conf)
+        final = self.root / key
+        tmp = self.root / f".{key}.{os.getpid()}.tmp"
+        shutil.rmtree(tmp, ignore_errors=True)
+        tmp.mkdir(parents=True)
+
+        cap = cv2.VideoCapture(str(video_path))
+        fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+        capacity = max(int(cap.get(cv2.CAP_PROP_FRAME_COUNT)), 1) + 64     # frame count can be approximate
+        cap.release()
+
+        def allocate(capacity):
+            arrays = {
+                "keypoints": np.lib.format.open_memmap(tmp / "keypoints.npy", "w+", np.float32,
+                                                       (capacity, max_persons, 17, 3)),
+                "boxes": np.lib.format.open_memmap(tmp / "boxes.npy", "w+", np.float32, (capacity, max_persons, 4)),
+                "scores": np.lib.format.open_memmap(tmp / "scores.npy", "w+", np.float32, (capacity, max_persons)),
+            }
+            for array in arrays.values():
+                array[:] = np.nan
+            return arrays
+
+        arrays = allocate(capacity)
+        model = load_model(weights)
+        started = time.perf_counter()
+        frames = 0
+        for result in model.predict(str(video_path), stream=True, imgsz=imgsz, conf=conf, batch=batch, verbose=False):
+            if frames == capacity:                                          # grow (rare): copy into a bigger map
+                old = {name: np.array(array) for name, array in arrays.items()}
+                arrays = allocate(capacity * 2)
+                for name, array in old.items():
+                    arrays[name][:capacity] = array
+                capacity *= 2
+            n = 0 if result.keypoints is None else min(len(result.keypoints), max_persons)
+            if n:
+                order = result.boxes.conf.cpu().numpy().argsort()[::-1][:n]    # most confident first
+                arrays["keypoints"][frames, :n] = result.keypoints.data.cpu().numpy()[order]
+                arrays["boxes"][frames, :n] = result.boxes.xyxy.cpu().numpy()[order]
+                arrays["scores"][frames, :n] = result.boxes.conf.cpu().numpy()[order]
+            frames += 1
+        for array in arrays.values():
+            array.flush()
+        del arrays
+
+        meta = {"video": str(video_path), "weights": str(weights), "imgsz": imgsz, "conf": conf,
+                "frames": frames, "fps": fps, "max_persons": max_persons,
+                "seconds_to_build": round(time.perf_counter() - started, 2)}
+        (tmp / "meta.json").write_text(json.dumps(meta, indent=2))
+        shutil.rmtree(final, ignore_errors=True)
+        tmp.rename(final)
+        return CacheEntry(final)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build / inspect the pose keypoint cache")
+    parser.add_argument("inputs", nargs="+", help="Videos or directories of videos")
+    parser.add_argument("--weights", default="yolo11n-pose.pt", help="Pose weights (default: yolo11n-pose.pt)")
+    parser.add_argument("--imgsz", type=int, default=640)
+    parser.add_argument("--conf", type=float, default=0.25)
+    args = parser.parse_args()
+
+    cache = KeypointCache()
+    for item in map(Path, args.inputs):
+        for video in (sorted(item.glob("*.mp4")) if item.is_dir() else [item]):
+            started = time.perf_counter()
+            hit = cache.get(video, args.weights, args.imgsz, args.conf) is not None
+            entry = cache.get_or_compute(video, args.weights, args.imgsz, args.conf)
+            status = "hit" if hit else "built"
+            print(f"{'⚡' if hit else '✅'} {video.name}: {entry.frames} frames [{status}] "
+                  f"in {time.perf_counter() - started:.2f}s → {entry.path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+motion_gate.py
+--------------
+Adaptive inference scheduler: only run YOLO when the scene actually changes.
+
+✅ Cheap motion score on a downscaled grayscale frame (frame difference or MOG2 background subtraction).
+✅ The model runs when motion crosses a threshold or a max interval expires (so slow changes are still caught).
+✅ Between model calls the last detections are propagated through the tracker (tracker.py).
+✅ Reports the fraction of frames skipped and the CPU time saved.
+
+Usage:
+    gate = MotionGate(lambda frame: detections_from_result(model(frame)[0]), threshold=0.01)
+    tracks = gate(frame)          # (N, 7) tracks, like IntervalTracker
+    print(gate.report())
+"""
+import time
+
+import cv2
+import numpy as np
+
+from tracker import ByteTracker
+
+
+class MotionGate:
+    def __init__(self, detect, threshold=0.01, max_interval=30, method="diff", width=160,
+                 pixel_threshold=25, tracker=None):
+        """
+        detect:          frame → (N, 6) detections (x1, y1, x2, y2, score, class_id)
+        threshold:       fraction of changed pixels that triggers a model call
+        max_interval:    force a model call at least every N frames
+        method:          "diff" (vs. the frame at the last model call) or "mog2"
+        """
+        self.detect = detect
+        self.threshold = threshold
+        self.max_interval = max_interval
+        self.method = method
+        self.width = width
+        self.pixel_threshold = pixel_threshold
+        self.tracker = tracker or ByteTracker(max_age=max(30, max_interval + 1))
+        self._reference = None
+        self._subtractor = cv2.createBackgroundSubtractorMOG2(history=300, detectShadows=False) \
+            if method == "mog2" else None
+        self._since_model = 0
+        self.last_score = 0.0
+        self.stats = {"frames": 0, "model_calls": 0, "model_cpu_s": 0.0, "model_wall_s": 0.0, "gate_cpu_s": 0.0}
+
+    def _small_gray(self, frame):
+        height, width = frame.shape[:2]
+        size = (self.width, max(1, int(height * self.width / width)))
+        small = cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+        return cv2.GaussianBlur(cv2.cvtColor(small, cv2.COLOR_BGR2GRAY), (5, 5), 0)
+
+    def motion_score(self, frame):
+        """Fraction of (downscaled) pixels that changed."""
+        gray = self._small_gray(frame)
+        if self._subtractor is not None:
+            mask = self._subtractor.apply(gray)
+            return float(np.count_nonzero(mask)) / mask.size, gray
+        if self._reference is None:
+            return 1.0, gray
+        diff = cv2.absdiff(gray, self._reference)
+        return float(np.count_nonzero(diff > self.pixel_threshold)) / diff.size, gray
+
+    def __call__(self, frame):
+        # CPU time of this (inference) thread only: capture / render threads of the pipeline don't count
+        gate_start = time.thread_time()
+        score, gray = self.motion_score(frame)
+        self.last_score = score
+        self.stats["frames"] += 1
+        run_model = score >= self.threshold or self._since_model >= self.max_interval
+        self.stats["gate_cpu_s"] += time.thread_time() - gate_start
+
+        if not run_model:
+            self._since_model += 1
+            return self.tracker.propagate()
+
+        cpu, wall = time.thread_time(), time.perf_counter()
+        detections = self.detect(frame)
+        self.stats["model_cpu_s"] += time.thread_time() - cpu
+        self.stats["model_wall_s"] += time.perf_counter() - wall
+        self.stats["model_calls"] += 1
+        self._reference = gray
+        self._since_model = 0
+        return self.tracker.update(detections)
+
+    def report(self):
+        """Skipped fraction and estimated CPU saved (skipped frames × mean model CPU per call − gate cost)."""
+        frames, calls = self.stats["frames"], self.stats["model_calls"]
+        skipped = frames - calls
+        per_call_cpu = self.stats["model_cpu_s"] / calls if calls else 0.0
+        saved = skipped * per_call_cpu - self.stats["gate_cpu_s"]
+        return {
+            "frames": frames,
+            "model_calls": calls,
+            "skipped_fraction": round(skipped / frames, 3) if frames else 0.0,
+            "model_cpu_per_call_ms": round(per_call_cpu * 1000, 2),
+            "gate_cpu_per_frame_ms": round(self.stats["gate_cpu_s"] / frames * 1000, 3) if frames else 0.0,
+            "cpu_saved_s": round(saved, 2),
+            "cpu_saved_fraction": round(saved / (frames * per_call_cpu), 3) if frames and per_call_cpu else 0.0,
+        }
+
+
+def add_motion_gate_arguments(parser):
+    parser.add_argument("--motion-gate", type=float, metavar="THRESHOLD",
+                        help="Only run the model when this fraction of pixels changes (e.g. 0.01)")
+    parser.add_argument("--max-interval", type=int, default=30,
+                        help="With --motion-gate, run the model at least every N frames (default: 30)")
+    return parser
+
+
+def print_report(gate):
+    print("📉 Motion gate report")
+    for key, value in gate.report().items():
+        print(f"  {key}: {value}")
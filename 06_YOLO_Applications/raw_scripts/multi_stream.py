@@ -0,0 +1,229 @@
+"""
+multi_stream.py
+---------------
+Batched multi-stream YOLO inference server for many cameras.
+
+✅ One reader thread per source (video file, RTSP URL, webcam index or FakeSource).
+✅ Frames from all streams are stacked into a single batched `model.predict` call.
+✅ Max-batch / max-wait policy: a batch is flushed as soon as it is full or the oldest frame has waited long enough.
+✅ Results are routed back to per-stream consumers.
+
+Usage:
+    python multi_stream.py cam1.mp4 cam2.mp4 rtsp://10.0.0.5/stream --max-batch 8
+    python multi_stream.py --fake 16 --seconds 10       # synthetic streams, no files needed
+"""
+import argparse
+import threading
+import time
+from collections import deque
+
+import cv2
+import numpy as np
+from ultralytics import YOLO
+
+
+class FakeSource:
+    """cv2.VideoCapture stand-in that produces synthetic frames at a fixed rate."""
+
+    def __init__(self, width=640, height=480, fps=30, num_frames=None, seed=0):
+        self.width, self.height, self.fps = width, height, fps
+        self.num_frames = num_frames
+        self._rng = np.random.default_rng(seed)
+        self._index = 0
+        self._next_time = time.perf_counter()
+        self._open = True
+
+    def isOpened(self):
+        return self._open
+
+    def read(self):
+        if not self._open or (self.num_frames is not None and self._index >= self.num_frames):
+            return False, None
+        if self.fps:
+            delay = self._next_time - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            self._next_time += 1.0 / self.fps
+        frame = self._rng.integers(0, 255, (self.height, self.width, 3), dtype=np.uint8)
+        self._index += 1
+        return True, frame
+
+    def get(self, prop):
+        return {cv2.CAP_PROP_FRAME_WIDTH: self.width,
+                cv2.CAP_PROP_FRAME_HEIGHT: self.height,
+                cv2.CAP_PROP_FPS: self.fps}.get(prop, 0)
+
+    def release(self):
+        self._open = False
+
+
+def open_source(spec):
+    """Open a webcam index ("0"), a file path or an RTSP/HTTP URL."""
+    if isinstance(spec, str) and spec.isdigit():
+        spec = int(spec)
+    return cv2.VideoCapture(spec) if isinstance(spec, (int, str)) else spec
+
+
+class MultiStreamServer:
+    """
+    Collects the latest frame of every stream and runs them through one batched predict call.
+
+    consumer: callable(stream_id, frame, result) or dict {stream_id: callable(frame, result)}
+    """
+
+    def __init__(self, model, sources, consumer, max_batch=16, max_wait=0.01, **predict_kwargs):
+        self.model = model
+        self.sources = dict(sources) if isinstance(sources, dict) else dict(enumerate(sources))
+        self.consumer = consumer
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.predict_kwargs = dict(verbose=False, **predict_kwargs)
+
+        self._latest = {}          # stream_id -> (timestamp, frame), only the freshest frame is kept
+        self._pending = deque()    # stream ids with a frame waiting, in arrival order (round-robin fairness)
+        self._cond = threading.Condition()
+        self._stop = threading.Event()
+        self._alive = set()
+        self._threads = []
+        self.error = None          # exception that stopped the batcher (model or consumer), re-raised by stop()
+        self.stats = {"frames_read": 0, "frames_dropped": 0, "frames_inferred": 0, "batches": 0}
+
+    # ➤ Reader: one thread per source, never blocks on the model
+    def _read_loop(self, stream_id, cap):
+        while not self._stop.is_set():
+            ret, frame = cap.read()
+            if not ret:
+                break
+            with self._cond:
+                if stream_id in self._latest:
+                    self.stats["frames_dropped"] += 1
+                else:
+                    self._pending.append(stream_id)
+                self._latest[stream_id] = (time.perf_counter(), frame)
+                self.stats["frames_read"] += 1
+                self._cond.notify()
+        cap.release()
+        with self._cond:
+            self._alive.discard(stream_id)
+            self._cond.notify()
+
+    def _next_batch(self):
+        """Block until a batch is ready according to the max-batch / max-wait policy."""
+        with self._cond:
+            self._cond.wait_for(lambda: self._pending or not self._alive or self._stop.is_set())
+            if not self._pending:
+                return []
+            deadline = self._latest[self._pending[0]][0] + self.max_wait
+            while len(self._pending) < self.max_batch and self._alive and not self._stop.is_set():
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            batch = []
+            while self._pending and len(batch) < self.max_batch:
+                stream_id = self._pending.popleft()
+                batch.append((stream_id, self._latest.pop(stream_id)[1]))
+            return batch
+
+    def _dispatch(self, stream_id, frame, result):
+        if isinstance(self.consumer, dict):
+            handler = self.consumer.get(stream_id)
+            if handler is not None:
+                handler(frame, result)
+        else:
+            self.consumer(stream_id, frame, result)
+
+    # ➤ Batcher: stacks frames from all streams into one predict call
+    def _batch_loop(self):
+        try:
+            while not self._stop.is_set():
+                batch = self._next_batch()
+                if not batch:
+                    if not self._alive:
+                        break
+                    continue
+                stream_ids, frames = zip(*batch)
+                results = self.model.predict(list(frames), **self.predict_kwargs)
+                self.stats["batches"] += 1
+                self.stats["frames_inferred"] += len(frames)
+                for stream_id, frame, result in zip(stream_ids, frames, results):
+                    self._dispatch(stream_id, frame, result)
+        except Exception as exc:
+            self.error = exc
+            self._stop.set()                            # readers exit too; run() returns and re-raises
+
+    def start(self):
+        self._started = time.perf_counter()
+        self._alive = set(self.sources)
+        for stream_id, cap in self.sources.items():
+            thread = threading.Thread(target=self._read_loop, args=(stream_id, cap), daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        self._batcher = threading.Thread(target=self._batch_loop, daemon=True)
+        self._batcher.start()
+
+    def stop(self):
+        self._stop.set()
+        with self._cond:
+            self._cond.notify_all()
+        for thread in self._threads + [self._batcher]:
+            thread.join(timeout=1.0)
+        if self.error is not None:
+            raise self.error
+
+    def run(self, seconds=None):
+        """Serve until every source is exhausted (or `seconds` elapse) and return throughput stats."""
+        self.start()
+        try:
+            self._batcher.join(timeout=seconds)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+        return self.summary()
+
+    def summary(self):
+        elapsed = max(time.perf_counter() - self._started, 1e-9)
+        batches = max(self.stats["batches"], 1)
+        return dict(self.stats,
+                    streams=len(self.sources),
+                    elapsed_s=round(elapsed, 3),
+                    fps=round(self.stats["frames_inferred"] / elapsed, 2),
+                    mean_batch=round(self.stats["frames_inferred"] / batches, 2))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batched multi-stream YOLO inference")
+    parser.add_argument("sources", nargs="*", help="Video files, RTSP URLs or webcam indices")
+    parser.add_argument("--weights", default="yolov8n.pt", help="YOLO weights (default: yolov8n.pt)")
+    parser.add_argument("--fake", type=int, default=0, help="Add N synthetic 30 FPS streams")
+    parser.add_argument("--max-batch", type=int, default=16, help="Largest batch sent to the model")
+    parser.add_argument("--max-wait", type=float, default=0.01, help="Max seconds a frame waits for a batch")
+    parser.add_argument("--imgsz", type=int, default=640, help="Inference size")
+    parser.add_argument("--seconds", type=float, default=None, help="Stop after N seconds")
+    args = parser.parse_args()
+
+    sources = {spec: open_source(spec) for spec in args.sources}
+    sources.update({f"fake{i}": FakeSource(seed=i) for i in range(args.fake)})
+    if not sources:
+        parser.error("give at least one source or --fake N")
+
+    per_stream = {stream_id: 0 for stream_id in sources}
+
+    def count_detections(stream_id, frame, result):
+        per_stream[stream_id] += 1
+
+    model = YOLO(args.weights)
+    server = MultiStreamServer(model, sources, count_detections,
+                               max_batch=args.max_batch, max_wait=args.max_wait, imgsz=args.imgsz)
+    summary = server.run(seconds=args.seconds)
+
+    print("📊 Multi-stream summary")
+    for key, value in summary.items():
+        print(f"  {key}: {value}")
+    for stream_id, frames in per_stream.items():
+        print(f"  [{stream_id}] frames served: {frames}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,38 +1,74 @@
+import argparse
+import sys
+from pathlib import Path
+
 import cv2
-from ultralytics import YOLO
+
+from backends import add_backend_argument, load_model
+from counting import IntervalAggregator, LineZoneCounter, parse_points
+from pipeline import ThreadedPipeline
+from tracker import IntervalTracker, detections_from_result, draw_tracks
+from video_writer import add_writer_arguments, writer_from_args
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))   # repo root, for cv_utils
+from cv_utils.frame_source import add_source_argument, source_from_args
+
+parser = argparse.ArgumentParser(description="YOLOv8 line-crossing and zone counting")
+parser.add_argument("--line", action="append", default=[], metavar="NAME=x1,y1,x2,y2",
+                    help="Directional counting line in normalized coords (repeatable)")
+parser.add_argument("--zone", action="append", default=[], metavar="NAME=x1,y1,x2,y2,...",
+                    help="Polygon counting zone in normalized coords (repeatable)")
+parser.add_argument("--interval", type=float, default=60.0, help="Aggregation interval in seconds (default: 60)")
+parser.add_argument("--log", default="counts.npz", help="Columnar count log (.npz or .parquet)")
+parser.add_argument("--detect-every", type=int, default=1, help="Run the detector every k frames")
+add_backend_argument(parser)
+add_writer_arguments(parser)
+add_source_argument(parser)
+args = parser.parse_args()
+
+lines = dict(spec.split("=", 1) for spec in args.line) or {"line": "0,0.5,1,0.5"}
+zones = dict(spec.split("=", 1) for spec in args.zone)
 
 # Load the YOLOv8 model
-model = YOLO('yolov8n.pt')
+model = load_model('yolov8n.pt', args.backend)
 
 # Initialize the video capture object
-cap = cv2.VideoCapture(0)
+cap = source_from_args(args)
 
-if not cap.isOpened():
-    print("Error: Could not open video stream.")
-    exit()
+# Count tracked IDs instead of raw boxes, so an object is only counted once
+tracker = IntervalTracker(lambda frame: detections_from_result(model(frame)[0]),
+                          detect_every=args.detect_every)
+counter = LineZoneCounter(lines={name: parse_points(points) for name, points in lines.items()},
+                          zones={name: parse_points(points) for name, points in zones.items()},
+                          max_age=tracker.tracker.max_age)
+aggregator = IntervalAggregator(counter, interval=args.interval)
 
-while True:
-    ret, frame = cap.read()
-    if not ret:
-        print("Error: Could not read frame.")
-        break
 
-    # Perform inference on the frame
-    results = model(frame)
+def track_and_count(frame):
+    # Track, then update line crossings / zone entries on the inference thread, so frames dropped
+    # before rendering are still counted; recorded footage is bucketed by video time
+    tracks = tracker(frame)
+    timestamp = None if cap.live else pipeline.timestamp / 1000
+    aggregator.add(counter.update(tracks, frame.shape), timestamp)
+    return tracks
 
-    # Count the number of detected objects
-    num_objects = len(results[0].boxes)
 
-    # Annotate the frame with the count
-    annotated_frame = results[0].plot()
-    cv2.putText(annotated_frame, f'Count: {num_objects}', (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
+def render(frame, tracks):
+    # Annotate the frame with tracks, lines, zones and totals
+    annotated_frame = draw_tracks(frame.copy(), tracks, model.names)
+    counter.draw(annotated_frame)
+    cv2.putText(annotated_frame, f'Tracked: {len(tracks)}', (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
+    return annotated_frame
 
-    # Display the annotated frame
-    cv2.imshow('YOLOv8 Object Counting', annotated_frame)
 
-    # Exit on pressing 'q'
-    if cv2.waitKey(1) & 0xFF == ord('q'):
-        break
+# Capture, tracking and display run on separate threads
+pipeline = ThreadedPipeline(
+    cap,
+    infer=track_and_count,
+    render=render,
+    window_name='YOLOv8 Object Counting',
+    writer=writer_from_args(args, cap),  # Optional non-blocking recording (--save)
+)
+pipeline.run()
 
-cap.release()
-cv2.destroyAllWindows()
\ No newline at end of file
+print(f"Saved per-interval counts to {aggregator.save(args.log)}")
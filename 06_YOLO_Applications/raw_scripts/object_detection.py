@@ -1,34 +1,92 @@
-import cv2
-from ultralytics import YOLO
+import argparse
+import sys
+from pathlib import Path
+
+from backends import add_backend_argument, load_model
+from motion_gate import MotionGate, add_motion_gate_arguments, print_report
+from pipeline import ThreadedPipeline
+from renderer import Instances, Renderer
+from result_stream import ResultPublisher, add_publish_argument
+from roi import add_roi_arguments, roi_from_args
+from tiling import add_tiling_arguments, tiler_from_args
+from tracker import detections_from_result, draw_tracks
+from video_writer import add_writer_arguments, writer_from_args
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))   # repo root, for cv_utils
+from cv_utils.frame_source import add_source_argument, source_from_args
+
+parser = argparse.ArgumentParser(description="YOLOv8 object detection")
+add_backend_argument(parser)
+add_writer_arguments(parser)
+add_publish_argument(parser)
+add_motion_gate_arguments(parser)
+add_tiling_arguments(parser)
+add_roi_arguments(parser)
+add_source_argument(parser)
+args = parser.parse_args()
+if args.tile and (args.roi or args.roi_config):
+    parser.error('--tile and --roi/--roi-config are mutually exclusive')
 
 # Load the YOLOv8 model
-model = YOLO('yolov8n.pt')
+model = load_model('yolov8n.pt', args.backend)
 
-# Initialize the video capture object
-cap = cv2.VideoCapture(0)
+# Draws into the captured frame in place instead of allocating a new image like results[0].plot()
+renderer = Renderer(model.names)
 
-if not cap.isOpened():
-    print("Error: Could not open video stream.")
-    exit()
+# Optionally publish raw results to shared memory for other processes (counting, dashboards, alerts)
+publisher = ResultPublisher(args.publish) if args.publish else None
 
-while True:
-    ret, frame = cap.read()
-    if not ret:
-        print("Error: Could not read frame.")
-        break
+# High-resolution cameras: optionally run the model on overlapping tiles instead of one letterboxed frame
+tiler = tiler_from_args(model, args)
 
+# Doorway/shelf cameras: optionally analyse only the ROI polygons, at the smallest imgsz that fits --min-object
+roi = roi_from_args(model, args)
+predict = roi or tiler
+
+
+def infer(frame):
     # Perform inference on the frame
-    results = model(frame)
+    instances = predict(frame) if predict else Instances.from_result(model(frame)[0])
+    if publisher:
+        publisher.publish(instances.boxes, instances.scores, instances.classes)
+    return instances
+
 
+def infer_gated(frame):
+    # Tracks come from YOLO when the scene moved, from the motion model otherwise
+    tracks = gate(frame)
+    if publisher:
+        publisher.publish(tracks[:, :4], tracks[:, 5], tracks[:, 6], track_ids=tracks[:, 4])
+    return tracks
+
+
+# Static scenes: optionally run YOLO only when enough pixels change
+gate = None
+if args.motion_gate is not None:
+    detect = predict.detections if predict else (lambda frame: detections_from_result(model(frame)[0]))
+    gate = MotionGate(detect, threshold=args.motion_gate, max_interval=args.max_interval)
+
+
+def render(frame, output):
     # Annotate the frame
-    annotated_frame = results[0].plot()
+    frame = draw_tracks(frame, output, model.names) if gate else renderer.draw(frame, output)
+    return roi.draw(frame) if roi else frame
+
 
-    # Display the annotated frame
-    cv2.imshow('YOLOv8 Detection', annotated_frame)
+# Initialize the video capture object
+cap = source_from_args(args)
 
-    # Exit on pressing 'q'
-    if cv2.waitKey(1) & 0xFF == ord('q'):
-        break
+# Capture, inference and display run on separate threads
+pipeline = ThreadedPipeline(
+    cap,
+    infer=infer_gated if gate else infer,
+    render=render,
+    window_name='YOLOv8 Detection',
+    writer=writer_from_args(args, cap),  # Optional non-blocking recording (--save)
+)
+pipeline.run()
 
-cap.release()
-cv2.destroyAllWindows()
\ No newline at end of file
+if gate:
+    print_report(gate)
+if publisher:
+    publisher.close()
@@ -1,34 +1,55 @@
-import cv2
-from ultralytics import YOLO
+import argparse
+import sys
+from pathlib import Path
+
+from backends import add_backend_argument, load_model
+from pipeline import ThreadedPipeline
+from renderer import Renderer
+from roi import add_roi_arguments, roi_from_args
+from tiling import add_tiling_arguments, tiler_from_args
+from video_writer import add_writer_arguments, writer_from_args
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))   # repo root, for cv_utils
+from cv_utils.frame_source import add_source_argument, source_from_args
+
+parser = argparse.ArgumentParser(description="YOLOv8 object segmentation")
+add_backend_argument(parser)
+add_writer_arguments(parser)
+add_tiling_arguments(parser)
+add_roi_arguments(parser)
+add_source_argument(parser)
+args = parser.parse_args()
+if args.tile and (args.roi or args.roi_config):
+    parser.error('--tile and --roi/--roi-config are mutually exclusive')
 
 # Load the YOLOv8 segmentation model
-model = YOLO('yolov8n-seg.pt')
+model = load_model('yolov8n-seg.pt', args.backend)
 
-# Initialize the video capture object
-cap = cv2.VideoCapture(0)
-
-if not cap.isOpened():
-    print("Error: Could not open video stream.")
-    exit()
+# Draws into the captured frame in place instead of allocating a new image like results[0].plot()
+renderer = Renderer(model.names)
 
-while True:
-    ret, frame = cap.read()
-    if not ret:
-        print("Error: Could not read frame.")
-        break
+# High-resolution cameras: optionally run the model on overlapping tiles instead of one letterboxed frame
+tiler = tiler_from_args(model, args)
 
-    # Perform inference on the frame
-    results = model(frame)
+# Doorway/shelf cameras: optionally analyse only the ROI polygons, at the smallest imgsz that fits --min-object
+roi = roi_from_args(model, args)
 
-    # Annotate the frame
-    annotated_frame = results[0].plot()
 
-    # Display the annotated frame
-    cv2.imshow('YOLOv8 Segmentation', annotated_frame)
+def render(frame, output):
+    # Annotate the frame (accepts a Results object or tiled/ROI Instances)
+    frame = renderer.draw(frame, output)
+    return roi.draw(frame) if roi else frame
 
-    # Exit on pressing 'q'
-    if cv2.waitKey(1) & 0xFF == ord('q'):
-        break
 
-cap.release()
-cv2.destroyAllWindows()
\ No newline at end of file
+# Initialize the video capture object
+cap = source_from_args(args)
+
+# Capture, inference and display run on separate threads
+pipeline = ThreadedPipeline(
+    cap,
+    infer=roi or tiler or (lambda frame: model(frame)[0]),  # Perform inference on the frame
+    render=render,
+    window_name='YOLOv8 Segmentation',
+    writer=writer_from_args(args, cap),  # Optional non-blocking recording (--save)
+)
+pipeline.run()
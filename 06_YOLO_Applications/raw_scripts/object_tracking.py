@@ -1,38 +1,39 @@
-import cv2
-from ultralytics import YOLO
+import argparse
+import sys
+from pathlib import Path
+
+from backends import add_backend_argument, load_model
+from pipeline import ThreadedPipeline
+from tracker import IntervalTracker, detections_from_result, draw_tracks
+from video_writer import add_writer_arguments, writer_from_args
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))   # repo root, for cv_utils
+from cv_utils.frame_source import add_source_argument, source_from_args
+
+parser = argparse.ArgumentParser(description="YOLOv8 multi-object tracking")
+parser.add_argument("--detect-every", type=int, default=3,
+                    help="Run the detector every k frames, propagate tracks in between (default: 3)")
+add_backend_argument(parser)
+add_writer_arguments(parser)
+add_source_argument(parser)
+args = parser.parse_args()
 
 # Load the YOLOv8 model
-model = YOLO('yolov8n.pt')
+model = load_model('yolov8n.pt', args.backend)
 
 # Initialize the video capture object
-cap = cv2.VideoCapture(0)
-
-if not cap.isOpened():
-    print("Error: Could not open video stream.")
-    exit()
-
-tracker = cv2.TrackerKCF_create()
-
-while True:
-    ret, frame = cap.read()
-    if not ret:
-        print("Error: Could not read frame.")
-        break
-
-    # Perform inference on the frame
-    results = model(frame)
-
-    # Annotate the frame
-    annotated_frame = results[0].plot()
-
-    # Display the annotated frame
-    cv2.imshow('YOLOv8 Tracking', annotated_frame)
-
-    # Exit on pressing 'q'
-    if cv2.waitKey(1) & 0xFF == ord('q'):
-        break
-
-cap.release()
-cv2.destroyAllWindows()
-
-
+cap = source_from_args(args)
+
+# Detection every k frames, Kalman propagation on the frames in between
+tracker = IntervalTracker(lambda frame: detections_from_result(model(frame)[0]),
+                          detect_every=args.detect_every)
+
+# Capture, tracking and display run on separate threads
+pipeline = ThreadedPipeline(
+    cap,
+    infer=tracker,  # Detect or propagate, returns tracks with persistent IDs
+    render=lambda frame, tracks: draw_tracks(frame.copy(), tracks, model.names),  # Annotate the frame
+    window_name='YOLOv8 Tracking',
+    writer=writer_from_args(args, cap),  # Optional non-blocking recording (--save)
+)
+pipeline.run()
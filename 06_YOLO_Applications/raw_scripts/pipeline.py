@@ -0,0 +1,184 @@
+"""
+pipeline.py
+-----------
+Threaded capture → inference → render pipeline shared by the YOLO raw_scripts.
+
+✅ Capture, inference and annotation/display each run on their own worker.
+✅ Stages are linked by bounded drop-oldest queues, so the camera never waits on the model.
+✅ End-to-end throughput is limited by the slowest stage, not the sum of all three.
+✅ Replayable sources (cv_utils.FrameSource files / folders / replays) run lossless: stages wait
+   instead of dropping, so every frame is processed and runs are comparable.
+✅ Optional AsyncVideoWriter records the annotated frames without blocking the display loop.
+
+Usage:
+    pipeline = ThreadedPipeline(cv2.VideoCapture(0),
+                                infer=lambda frame: model(frame, verbose=False),
+                                render=lambda frame, results: results[0].plot(),
+                                window_name='YOLOv8 Detection')
+    pipeline.run()
+"""
+import threading
+import time
+from collections import deque
+
+import cv2
+
+
+class DropOldestQueue:
+    """Bounded queue that discards its oldest item instead of blocking the producer."""
+
+    def __init__(self, maxsize=1):
+        self._items = deque(maxlen=maxsize)
+        self._cond = threading.Condition()
+        self.dropped = 0
+        self.closed = False
+
+    def put(self, item, block=False):
+        """Append an item; with block=True wait for space instead of dropping the oldest."""
+        with self._cond:
+            if block:
+                self._cond.wait_for(lambda: len(self._items) < self._items.maxlen or self.closed)
+            if len(self._items) == self._items.maxlen:
+                self.dropped += 1
+            self._items.append(item)
+            self._cond.notify_all()
+
+    def get(self, timeout=None):
+        """Return the next item, or None on timeout / once closed and drained."""
+        with self._cond:
+            self._cond.wait_for(lambda: self._items or self.closed, timeout)
+            if not self._items:
+                return None
+            item = self._items.popleft()
+            self._cond.notify_all()                     # wake a producer blocked on a full queue
+            return item
+
+    def close(self):
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+    def __len__(self):
+        return len(self._items)
+
+
+class ThreadedPipeline:
+    """
+    Three-stage pipeline:
+    - capture thread: cap.read() → frame queue
+    - inference thread: infer(frame) → result queue; infer may read `pipeline.timestamp`, the source
+      timestamp (ms, CAP_PROP_POS_MSEC) of the frame it was called with
+    - main thread: render(frame, results) → cv2.imshow (HighGUI must stay on the main thread)
+      and, if a writer is given, writer.write(annotated) (encoded on the writer's own thread)
+    """
+
+    def __init__(self, cap, infer, render, window_name="YOLOv8", queue_size=1, quit_key="q", writer=None):
+        self.cap = cap
+        self.infer = infer
+        self.render = render
+        self.window_name = window_name
+        self.quit_key = quit_key
+        self.writer = writer
+        self.writer_stats = None
+        # Live cameras drop stale frames; replayable sources (FrameSource.live == False) never drop
+        self.lossless = not getattr(cap, "live", True)
+        self.frames = DropOldestQueue(queue_size)
+        self.results = DropOldestQueue(queue_size)
+        self.counts = {"captured": 0, "inferred": 0, "rendered": 0}
+        self._stop = threading.Event()
+        self._threads = []
+        self.error = None                               # first exception raised by a worker, re-raised by run()
+        self.timestamp = 0.0                            # source ms of the frame being inferred (inference thread)
+
+    # ➤ Stage 1: capture
+    def _capture_loop(self):
+        try:
+            while not self._stop.is_set():
+                ret, frame = self.cap.read()
+                if not ret:
+                    print("End of stream." if self.lossless else "Error: Could not read frame.")
+                    break
+                item = (self.counts["captured"], time.perf_counter(), self.cap.get(cv2.CAP_PROP_POS_MSEC), frame)
+                self.frames.put(item, block=self.lossless)
+                self.counts["captured"] += 1
+        except Exception as exc:
+            self.error = self.error or exc
+            self.results.close()                        # nothing more will arrive: let run() stop
+        finally:
+            self.frames.close()
+
+    # ➤ Stage 2: inference
+    def _inference_loop(self):
+        try:
+            while not self._stop.is_set():
+                item = self.frames.get(timeout=0.1)
+                if item is None:
+                    if self.frames.closed:
+                        break
+                    continue
+                index, stamp, self.timestamp, frame = item
+                results = self.infer(frame)
+                self.results.put((index, stamp, frame, results), block=self.lossless)
+                self.counts["inferred"] += 1
+        except Exception as exc:
+            self.error = self.error or exc
+            self.frames.close()                         # unblock a lossless capture waiting for space
+        finally:
+            self.results.close()
+
+    def start(self):
+        """Start the capture and inference workers."""
+        for target in (self._capture_loop, self._inference_loop):
+            thread = threading.Thread(target=target, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self):
+        self._stop.set()
+        self.frames.close()
+        self.results.close()
+        for thread in self._threads:
+            thread.join(timeout=1.0)
+        self.cap.release()
+        if self.writer is not None and self.writer_stats is None:
+            self.writer_stats = self.writer.close()
+            print(f"Recorded {self.writer_stats['written']} frames to {len(self.writer_stats['files'])} file(s), "
+                  f"{self.writer_stats['dropped']} dropped (encoder behind)")
+        cv2.destroyAllWindows()
+
+    def stats(self):
+        """Per-stage frame counts plus frames dropped between stages."""
+        stats = dict(self.counts,
+                     dropped_before_infer=self.frames.dropped,
+                     dropped_before_render=self.results.dropped)
+        if self.writer is not None:
+            stats["recording"] = self.writer_stats or dict(self.writer.stats)
+        return stats
+
+    # ➤ Stage 3: annotate + display (runs on the caller's thread)
+    def run(self):
+        if not self.cap.isOpened():
+            print("Error: Could not open video stream.")
+            return
+        self.start()
+        try:
+            while True:
+                item = self.results.get(timeout=0.05)
+                if item is None and self.results.closed:
+                    break
+                if item is not None:
+                    index, stamp, frame, results = item
+                    annotated_frame = self.render(frame, results)
+                    cv2.imshow(self.window_name, annotated_frame)
+                    if self.writer is not None:
+                        self.writer.write(annotated_frame)
+                    self.counts["rendered"] += 1
+
+                # Exit on pressing the quit key
+                if cv2.waitKey(1) & 0xFF == ord(self.quit_key):
+                    break
+        finally:
+            self.stop()
+        if self.error is not None:
+            raise self.error
+        return self.stats()
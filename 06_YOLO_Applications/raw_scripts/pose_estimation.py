@@ -1,34 +1,64 @@
-import cv2
-from ultralytics import YOLO
+import argparse
+import sys
+from pathlib import Path
+
+from backends import add_backend_argument, load_model
+from pipeline import ThreadedPipeline
+from renderer import Instances, Renderer
+from result_stream import ResultPublisher, add_publish_argument
+from roi import add_roi_arguments, roi_from_args
+from video_writer import add_writer_arguments, writer_from_args
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))   # repo root, for cv_utils
+from cv_utils.frame_source import add_source_argument, source_from_args
+
+parser = argparse.ArgumentParser(description="YOLOv8 pose estimation")
+add_backend_argument(parser)
+add_writer_arguments(parser)
+add_publish_argument(parser)
+add_roi_arguments(parser)
+add_source_argument(parser)
+args = parser.parse_args()
 
 # Load the YOLOv8 pose estimation model
-model = YOLO('yolov8n-pose.pt')
+model = load_model('yolov8n-pose.pt', args.backend)
 
-# Initialize the video capture object
-cap = cv2.VideoCapture(0)
+# Draws into the captured frame in place instead of allocating a new image like results[0].plot()
+renderer = Renderer(model.names)
 
-if not cap.isOpened():
-    print("Error: Could not open video stream.")
-    exit()
+# Optionally publish raw results to shared memory for other processes (counting, dashboards, alerts)
+publisher = ResultPublisher(args.publish) if args.publish else None
 
-while True:
-    ret, frame = cap.read()
-    if not ret:
-        print("Error: Could not read frame.")
-        break
+# Optionally analyse only the ROI polygons, at the smallest imgsz that fits --min-object
+roi = roi_from_args(model, args)
 
+
+def infer(frame):
     # Perform inference on the frame
-    results = model(frame)
+    instances = roi(frame) if roi else Instances.from_result(model(frame)[0])
+    if publisher:
+        publisher.publish(instances.boxes, instances.scores, instances.classes, keypoints=instances.keypoints)
+    return instances
+
 
+def render(frame, instances):
     # Annotate the frame
-    annotated_frame = results[0].plot()
+    frame = renderer.draw(frame, instances)
+    return roi.draw(frame) if roi else frame
 
-    # Display the annotated frame
-    cv2.imshow('YOLOv8 Pose Estimation', annotated_frame)
 
-    # Exit on pressing 'q'
-    if cv2.waitKey(1) & 0xFF == ord('q'):
-        break
+# Initialize the video capture object
+cap = source_from_args(args)
+
+# Capture, inference and display run on separate threads
+pipeline = ThreadedPipeline(
+    cap,
+    infer=infer,
+    render=render,
+    window_name='YOLOv8 Pose Estimation',
+    writer=writer_from_args(args, cap),  # Optional non-blocking recording (--save)
+)
+pipeline.run()
 
-cap.release()
-cv2.destroyAllWindows()
\ No newline at end of file
+if publisher:
+    publisher.close()
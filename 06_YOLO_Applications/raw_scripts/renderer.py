@@ -0,0 +1,234 @@
+"""
+renderer.py
+-----------
+Fast annotation renderer that replaces `results[0].plot()` in the hot loops of the YOLO raw_scripts.
+
+✅ Draws into a preallocated frame buffer (or the frame itself) instead of allocating a new image every frame.
+✅ All instance masks are blended with a single vectorized alpha composite (label map → color LUT).
+✅ Boxes and skeletons are drawn with one cv2.polylines call per color, not one call per instance.
+✅ Label text is rendered once into cached sprites and blitted afterwards.
+✅ Micro-benchmark: per-frame render cost for 1, 10 and 100 instances (vs. Results.plot() when available).
+
+Usage:
+    renderer = Renderer(model.names)
+    annotated = renderer.draw(frame, results[0])
+
+    python renderer.py --bench
+"""
+import argparse
+import time
+
+import cv2
+import numpy as np
+
+# COCO-17 skeleton (0-indexed keypoint pairs), same layout Ultralytics uses for pose models
+SKELETON = np.array([[15, 13], [13, 11], [16, 14], [14, 12], [11, 12], [5, 11], [6, 12], [5, 6], [5, 7],
+                     [6, 8], [7, 9], [8, 10], [1, 2], [0, 1], [0, 2], [1, 3], [2, 4], [3, 5], [4, 6]])
+
+
+def make_palette(n=80, seed=3):
+    """Distinct BGR colors, one per class id."""
+    hues = (np.arange(n) * 37 + seed * 11) % 180
+    hsv = np.stack([hues, np.full(n, 200), np.full(n, 255)], axis=1).astype(np.uint8)[None]
+    return cv2.cvtColor(hsv, cv2.COLOR_HSV2BGR)[0]
+
+
+class Instances:
+    """Plain-array view of one frame's results: boxes (N, 4), classes, scores, polygons, keypoints (N, K, 3)."""
+
+    def __init__(self, boxes, classes, scores, polygons=None, keypoints=None):
+        self.boxes = np.asarray(boxes, dtype=np.float32).reshape(-1, 4)
+        self.classes = np.asarray(classes, dtype=np.int64).reshape(-1)
+        self.scores = np.asarray(scores, dtype=np.float32).reshape(-1)
+        self.polygons = polygons
+        self.keypoints = keypoints
+
+    def __len__(self):
+        return len(self.boxes)
+
+    @classmethod
+    def from_result(cls, result):
+        boxes = result.boxes
+        polygons = result.masks.xy if result.masks is not None else None
+        keypoints = result.keypoints.data.cpu().numpy() if result.keypoints is not None else None
+        return cls(boxes.xyxy.cpu().numpy(), boxes.cls.cpu().numpy(), boxes.conf.cpu().numpy(), polygons, keypoints)
+
+
+class Renderer:
+    def __init__(self, names=None, alpha=0.45, thickness=2, font_scale=0.5, show_labels=True, in_place=True):
+        self.names = names or {}
+        self.alpha = alpha
+        self.thickness = thickness
+        self.font_scale = font_scale
+        self.show_labels = show_labels
+        self.in_place = in_place
+        self.palette = make_palette(max(80, len(self.names)))
+        self._lut = np.zeros((1, 256, 3), dtype=np.uint8)                  # label 0 = background
+        self._lut[0, 1:] = self.palette[np.arange(255) % len(self.palette)]
+        self._buffer = None
+        self._labels = None
+        self._sprites = {}
+
+    # ➤ Buffers
+    def _target(self, frame):
+        if self.in_place:
+            return frame
+        if self._buffer is None or self._buffer.shape != frame.shape:
+            self._buffer = np.empty_like(frame)
+        np.copyto(self._buffer, frame)
+        return self._buffer
+
+    def _label_map(self, shape):
+        if self._labels is None or self._labels.shape != shape:
+            self._labels = np.zeros(shape, dtype=np.uint8)
+        return self._labels
+
+    # ➤ Masks: one composite for all instances
+    def draw_masks(self, image, polygons, classes):
+        polygons = [poly.astype(np.int32) for poly in polygons if len(poly)]
+        if not polygons:
+            return image
+        # Only the rows covered by the masks are touched (a row band stays contiguous for in-place cv2 ops)
+        points = np.concatenate(polygons)
+        y0 = max(int(points[:, 1].min()), 0)
+        y1 = min(int(points[:, 1].max()) + 1, image.shape[0])
+        if y1 <= y0:
+            return image
+        labels = self._label_map(image.shape[:2])[y0:y1]
+        labels.fill(0)
+        for poly, class_id in zip(polygons, classes):
+            cv2.fillPoly(labels, [poly - (0, y0)], int(class_id) % 255 + 1)
+        band = image[y0:y1]
+        overlay = cv2.LUT(cv2.cvtColor(labels, cv2.COLOR_GRAY2BGR), self._lut)   # label map → colors
+        blended = cv2.addWeighted(band, 1 - self.alpha, overlay, self.alpha, 0)
+        cv2.copyTo(blended, cv2.compare(labels, 0, cv2.CMP_GT), band)
+        return image
+
+    # ➤ Boxes: one polylines call per class color
+    def draw_boxes(self, image, boxes, classes):
+        corners = np.stack([boxes[:, [0, 1]], boxes[:, [2, 1]], boxes[:, [2, 3]], boxes[:, [0, 3]]], axis=1)
+        corners = corners.astype(np.int32)
+        for class_id in np.unique(classes):
+            color = tuple(int(c) for c in self.palette[class_id % len(self.palette)])
+            cv2.polylines(image, list(corners[classes == class_id]), True, color, self.thickness)
+        return image
+
+    def draw_keypoints(self, image, keypoints, min_conf=0.5):
+        visible = keypoints[..., 2] >= min_conf if keypoints.shape[-1] == 3 else np.ones(keypoints.shape[:2], bool)
+        pairs = keypoints[:, SKELETON, :2]                                  # (N, E, 2, 2)
+        ok = visible[:, SKELETON].all(axis=2)                               # (N, E)
+        segments = pairs[ok].astype(np.int32)
+        if len(segments):
+            cv2.polylines(image, list(segments), False, (255, 255, 255), self.thickness)
+        for x, y in keypoints[visible][:, :2].astype(np.int32):
+            cv2.circle(image, (int(x), int(y)), 3, (0, 0, 255), -1)
+        return image
+
+    # ➤ Labels: cached sprites
+    def _sprite(self, text, color):
+        key = (text, color)
+        sprite = self._sprites.get(key)
+        if sprite is None:
+            (w, h), baseline = cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, self.font_scale, 1)
+            sprite = np.empty((h + baseline + 4, w + 4, 3), dtype=np.uint8)
+            sprite[:] = color
+            cv2.putText(sprite, text, (2, h + 2), cv2.FONT_HERSHEY_SIMPLEX, self.font_scale,
+                        (255, 255, 255), 1, cv2.LINE_AA)
+            self._sprites[key] = sprite
+        return sprite
+
+    def draw_labels(self, image, boxes, classes, scores):
+        height, width = image.shape[:2]
+        for (x1, y1, _, _), class_id, score in zip(boxes.astype(np.int32), classes, scores):
+            name = self.names.get(int(class_id), str(class_id)) if isinstance(self.names, dict) else str(class_id)
+            color = tuple(int(c) for c in self.palette[class_id % len(self.palette)])
+            sprite = self._sprite(f"{name} {score:.1f}", color)          # 1 decimal keeps the cache small
+            h, w = sprite.shape[:2]
+            y = min(max(y1 - h, 0), height - h)
+            x = min(max(x1, 0), width - w)
+            if x >= 0 and y >= 0:
+                image[y:y + h, x:x + w] = sprite
+        return image
+
+    def draw(self, frame, result):
+        """Annotate `frame` with a YOLO Results object or an Instances view."""
+        instances = result if isinstance(result, Instances) else Instances.from_result(result)
+        image = self._target(frame)
+        if not len(instances):
+            return image
+        if instances.polygons is not None:
+            self.draw_masks(image, instances.polygons, instances.classes)
+        self.draw_boxes(image, instances.boxes, instances.classes)
+        if instances.keypoints is not None:
+            self.draw_keypoints(image, instances.keypoints)
+        if self.show_labels:
+            self.draw_labels(image, instances.boxes, instances.classes, instances.scores)
+        return image
+
+
+# ➤ Micro-benchmark
+def synthetic_instances(n, width=1280, height=720, seed=0):
+    rng = np.random.default_rng(seed)
+    xy = rng.uniform([0, 0], [width - 120, height - 160], (n, 2))
+    wh = rng.uniform([40, 60], [120, 160], (n, 2))
+    boxes = np.concatenate([xy, xy + wh], axis=1)
+    theta = np.linspace(0, 2 * np.pi, 32, endpoint=False)
+    polygons = [np.stack([cx + w / 2 * np.cos(theta), cy + h / 2 * np.sin(theta)], axis=1).astype(np.float32)
+                for cx, cy, w, h in zip(xy[:, 0] + wh[:, 0] / 2, xy[:, 1] + wh[:, 1] / 2, wh[:, 0], wh[:, 1])]
+    keypoints = np.concatenate([xy[:, None] + rng.uniform(0, 1, (n, 17, 2)) * wh[:, None],
+                                np.ones((n, 17, 1))], axis=2).astype(np.float32)
+    return Instances(boxes, rng.integers(0, 80, n), rng.uniform(0.3, 1, n), polygons, keypoints)
+
+
+def time_it(fn, repeats):
+    fn()                                                                    # warm caches / sprites
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    return (time.perf_counter() - start) / repeats * 1000
+
+
+def ultralytics_plot_fn(frame, instances):
+    """Equivalent Results.plot() call for comparison, or None if ultralytics/torch are unavailable."""
+    try:
+        import torch
+        from ultralytics.engine.results import Results
+    except ImportError:
+        return None
+    h, w = frame.shape[:2]
+    data = np.concatenate([instances.boxes, instances.scores[:, None], instances.classes[:, None]], axis=1)
+    masks = np.zeros((len(instances), h, w), dtype=np.uint8)
+    for mask, poly in zip(masks, instances.polygons):
+        cv2.fillPoly(mask, [poly.astype(np.int32)], 1)
+    result = Results(frame, path="bench", names={i: str(i) for i in range(80)},
+                     boxes=torch.from_numpy(data), masks=torch.from_numpy(masks),
+                     keypoints=torch.from_numpy(instances.keypoints))
+    return result.plot
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Renderer micro-benchmark")
+    parser.add_argument("--bench", action="store_true", help="Run the micro-benchmark")
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    parser.add_argument("--repeats", type=int, default=50)
+    args = parser.parse_args()
+    if not args.bench:
+        parser.print_help()
+        return
+
+    frame = np.full((args.height, args.width, 3), 90, dtype=np.uint8)
+    renderer = Renderer({i: str(i) for i in range(80)})
+    print(f"📊 Render cost per frame at {args.width}x{args.height} (ms)")
+    print(f"{'instances':>10}{'Renderer':>12}{'Results.plot':>15}")
+    for n in (1, 10, 100):
+        instances = synthetic_instances(n, args.width, args.height)
+        work = frame.copy()
+        ours = time_it(lambda: renderer.draw(work, instances), args.repeats)
+        plot = ultralytics_plot_fn(frame, instances)
+        theirs = f"{time_it(plot, args.repeats):.2f}" if plot else "n/a"
+        print(f"{n:>10}{ours:>12.2f}{theirs:>15}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+"""
+rep_counter.py
+--------------
+Vectorized workout rep counter — an offline replacement for the frame-by-frame `solutions.AIGym`
+loop in notebooks/Yolo_3_Workout_Video.ipynb.
+
+✅ Takes pose keypoints for a whole clip (T × 17 × 3) and computes joint angles for all frames in one NumPy pass.
+✅ Rep state with hysteresis (separate up/down thresholds), also vectorized.
+✅ Returns per-rep timings (start, bottom, end, duration, deepest angle).
+✅ Presets for the four demo_videos/ exercises; scores them offline without rendering any video.
+
+Usage:
+    python rep_counter.py demo_videos/Pushups.demo.video.mp4
+    python rep_counter.py demo_videos/ --weights yolo11m-pose.pt
+"""
+import argparse
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+# Same keypoint triplets / angles as the AIGym cells in the workout notebook
+EXERCISES = {
+    "pushups": {"kpts": (5, 7, 9), "up_angle": 145.0, "down_angle": 90.0},        # shoulder-elbow-wrist
+    "squats": {"kpts": (5, 11, 13), "up_angle": 145.0, "down_angle": 90.0},        # shoulder-hip-knee
+    "legpress": {"kpts": (11, 13, 15), "up_angle": 145.0, "down_angle": 90.0},     # hip-knee-ankle
+    "legextension": {"kpts": (11, 13, 15), "up_angle": 145.0, "down_angle": 100.0},
+}
+
+# COCO left ↔ right keypoint mirror (used to pick the better-visible side)
+MIRROR = np.array([0, 2, 1, 4, 3, 6, 5, 8, 7, 10, 9, 12, 11, 14, 13, 16, 15])
+
+
+def joint_angles(keypoints, kpts, min_conf=0.3):
+    """
+    Angle in degrees at kpts[1] for every frame: (T, 17, 3) → (T,).
+    Frames where any of the three keypoints is missing or below min_conf are NaN.
+    """
+    a, b, c = (keypoints[:, k, :2] for k in kpts)
+    ba, bc = a - b, c - b
+    angle = np.abs(np.degrees(np.arctan2(bc[:, 1], bc[:, 0]) - np.arctan2(ba[:, 1], ba[:, 0])))
+    angle = np.where(angle > 180.0, 360.0 - angle, angle)
+    if keypoints.shape[2] > 2:
+        visible = (keypoints[:, list(kpts), 2] >= min_conf).all(axis=1)
+        angle = np.where(visible, angle, np.nan)
+    return angle
+
+
+def best_side_angles(keypoints, kpts, min_conf=0.3):
+    """Compute angles on both body sides and keep the side with higher mean keypoint confidence."""
+    mirrored = tuple(int(MIRROR[k]) for k in kpts)
+    if keypoints.shape[2] < 3:
+        return joint_angles(keypoints, kpts, min_conf)
+    conf = np.nanmean(keypoints[:, list(kpts), 2]), np.nanmean(keypoints[:, list(mirrored), 2])
+    return joint_angles(keypoints, kpts if conf[0] >= conf[1] else mirrored, min_conf)
+
+
+def smooth(values, window=5):
+    """NaN-aware moving average."""
+    if window <= 1:
+        return values
+    kernel = np.ones(window)
+    valid = ~np.isnan(values)
+    sums = np.convolve(np.where(valid, values, 0.0), kernel, mode="same")
+    counts = np.convolve(valid.astype(float), kernel, mode="same")
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(counts > 0, sums / counts, np.nan)
+
+
+def hysteresis_states(angles, up_angle, down_angle):
+    """
+    Per-frame state: +1 (up), -1 (down), 0 (unknown yet).
+    Angles between the two thresholds keep the previous state, so jitter can't double count.
+    """
+    raw = np.where(angles >= up_angle, 1, np.where(angles <= down_angle, -1, 0))
+    decided = np.where(raw != 0, np.arange(len(raw)), -1)
+    last = np.maximum.accumulate(decided)                                # index of last decided frame
+    return np.where(last >= 0, raw[np.maximum(last, 0)], 0)
+
+
+def count_reps(keypoints, exercise="pushups", fps=30.0, kpts=None, up_angle=None, down_angle=None,
+               smoothing=5, min_conf=0.3):
+    """
+    keypoints: (T, 17, 2|3) array for one person (NaN / low confidence where not visible).
+    Returns (reps, angles) where reps is a list of dicts with per-rep timings.
+    """
+    preset = EXERCISES[exercise]
+    kpts = kpts or preset["kpts"]
+    up_angle = preset["up_angle"] if up_angle is None else up_angle
+    down_angle = preset["down_angle"] if down_angle is None else down_angle
+
+    angles = smooth(best_side_angles(np.asarray(keypoints, dtype=np.float64), kpts, min_conf), smoothing)
+    states = hysteresis_states(angles, up_angle, down_angle)
+    changes = np.flatnonzero(np.diff(states)) + 1
+    went_down = changes[states[changes] == -1]                           # first frame at or below down_angle
+    came_up = changes[states[changes] == 1]
+
+    # States alternate after the first decision, so each descent pairs with the next up-transition
+    next_up = np.searchsorted(came_up, went_down)
+    complete = next_up < len(came_up)
+    went_down, ends = went_down[complete], came_up[next_up[complete]]
+
+    # A rep starts where the descent leaves the top: the last frame at or above up_angle before it went down
+    frames = np.arange(len(angles))
+    last_up = np.maximum.accumulate(np.where(angles >= up_angle, frames, -1))
+    left_top = last_up[np.maximum(went_down - 1, 0)]
+    starts = np.where(left_top >= 0, left_top, went_down)
+
+    reps = []
+    filled = np.where(np.isnan(angles), np.inf, angles)
+    for number, (start, end) in enumerate(zip(starts, ends), 1):
+        bottom = start + int(np.argmin(filled[start:end]))
+        reps.append({"rep": number, "start_frame": int(start), "bottom_frame": int(bottom),
+                     "end_frame": int(end), "duration_s": round(float(end - start) / fps, 3),
+                     "min_angle": round(float(angles[bottom]), 1)})
+    return reps, angles
+
+
+# ➤ Keypoint extraction (one YOLO pose pass, no rendering)
+def primary_person(result):
+    """(17, 3) keypoints of the most confident person in a frame, NaN if nobody was found."""
+    if result.keypoints is None or len(result.keypoints) == 0:
+        return np.full((17, 3), np.nan, dtype=np.float32)
+    best = int(result.boxes.conf.argmax())
+    return result.keypoints.data[best].cpu().numpy()
+
+
+def extract_keypoints(video_path, weights="yolo11n-pose.pt", imgsz=640, batch=16, use_cache=True):
+    """Pose keypoints for a whole video as (keypoints T×17×3, fps); cached runs skip YOLO entirely."""
+    if use_cache:
+        from keypoint_cache import KeypointCache
+        entry = KeypointCache().get_or_compute(video_path, weights, imgsz=imgsz, batch=batch)
+        return entry.primary_person(), entry.fps
+
+    from backends import load_model
+    model = load_model(weights)
+    cap = cv2.VideoCapture(str(video_path))
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    cap.release()
+    keypoints = [primary_person(r) for r in model.predict(str(video_path), stream=True, imgsz=imgsz,
+                                                          batch=batch, verbose=False)]
+    return np.stack(keypoints) if keypoints else np.empty((0, 17, 3), dtype=np.float32), fps
+
+
+def exercise_for(video_path):
+    """Pick the preset from a demo video's file name (e.g. 'Squats.demo.video.mp4' → 'squats')."""
+    stem = Path(video_path).name.split(".")[0].lower()
+    return stem if stem in EXERCISES else "pushups"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline workout rep counting from YOLO pose keypoints")
+    parser.add_argument("inputs", nargs="+", help="Workout videos or directories")
+    parser.add_argument("--exercise", choices=sorted(EXERCISES), help="Preset (default: guessed from file name)")
+    parser.add_argument("--weights", default="yolo11n-pose.pt", help="Pose weights (default: yolo11n-pose.pt)")
+    parser.add_argument("--up", type=float, help="Override the 'up' angle threshold")
+    parser.add_argument("--down", type=float, help="Override the 'down' angle threshold")
+    parser.add_argument("--no-cache", action="store_true", help="Always re-run the pose model")
+    args = parser.parse_args()
+
+    videos = []
+    for item in map(Path, args.inputs):
+        videos += sorted(item.glob("*.mp4")) if item.is_dir() else [item]
+
+    for video in videos:
+        exercise = args.exercise or exercise_for(video)
+        started = time.perf_counter()
+        keypoints, fps = extract_keypoints(video, args.weights, use_cache=not args.no_cache)
+        extracted = time.perf_counter()
+        reps, _ = count_reps(keypoints, exercise, fps, up_angle=args.up, down_angle=args.down)
+        scored = time.perf_counter()
+
+        clip_seconds = len(keypoints) / fps
+        print(f"\n🏋️ {video.name} [{exercise}]: {len(reps)} reps in {clip_seconds:.1f}s of video")
+        print(f"   pose pass {extracted - started:.1f}s, rep scoring {(scored - extracted) * 1000:.2f} ms")
+        for rep in reps:
+            print(f"   #{rep['rep']:>2}  frames {rep['start_frame']:>5}-{rep['end_frame']:<5} "
+                  f"{rep['duration_s']:>5.2f}s  deepest {rep['min_angle']}°")
+
+
+if __name__ == "__main__":
+    main()
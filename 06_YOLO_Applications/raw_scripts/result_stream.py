@@ -0,0 +1,204 @@
+"""
+result_stream.py
+----------------
+Result-stream schema and zero-copy shared-memory publisher for YOLO detections.
+
+✅ Compact struct-of-arrays frame record (fixed-dtype NumPy): boxes, scores, classes, track ids, keypoints.
+✅ ResultPublisher writes each frame into a `multiprocessing.shared_memory` ring buffer.
+✅ Any number of ResultSubscriber processes read the same memory — no pickling, no sockets.
+✅ Per-slot sequence numbers (seqlock) so readers never see a half-written frame and can detect overruns.
+
+Usage:
+    # producer (e.g. object_detection.py --publish yolo)
+    publisher = ResultPublisher("yolo")
+    publisher.publish_result(results[0])
+
+    # consumers, in other processes
+    python result_stream.py yolo
+"""
+import argparse
+import sys
+import time
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+MAGIC = 0x594F4C4F                     # "YOLO"
+MAX_DETECTIONS = 100
+NUM_KEYPOINTS = 17
+_OWNED = set()                         # streams published from this process
+
+HEADER_DTYPE = np.dtype([("magic", "u4"), ("slots", "u4"), ("max_det", "u4"), ("num_kpts", "u4"),
+                         ("head", "u8"), ("pad", "u1", 40)])                # 64 bytes, one cache line
+
+
+def frame_dtype(max_det=MAX_DETECTIONS, num_kpts=NUM_KEYPOINTS):
+    """Fixed-size struct-of-arrays record for one frame's results."""
+    return np.dtype([
+        ("seq", "u8"),                  # seqlock: odd while being written
+        ("frame", "u8"),
+        ("timestamp", "f8"),
+        ("count", "u4"),
+        ("boxes", "f4", (max_det, 4)),  # xyxy, pixels
+        ("scores", "f4", (max_det,)),
+        ("classes", "i2", (max_det,)),
+        ("track_ids", "i4", (max_det,)),
+        ("keypoints", "f4", (max_det, num_kpts, 3)),
+    ], align=True)
+
+
+def _views(buf, slots, max_det, num_kpts):
+    header = np.ndarray((1,), dtype=HEADER_DTYPE, buffer=buf)[0:1]
+    ring = np.ndarray((slots,), dtype=frame_dtype(max_det, num_kpts), buffer=buf, offset=HEADER_DTYPE.itemsize)
+    return header, ring
+
+
+class ResultPublisher:
+    """Single writer: owns the shared-memory block and unlinks it on close."""
+
+    def __init__(self, name, slots=64, max_det=MAX_DETECTIONS, num_kpts=NUM_KEYPOINTS):
+        size = HEADER_DTYPE.itemsize + slots * frame_dtype(max_det, num_kpts).itemsize
+        try:
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            # A previous publisher crashed without unlinking; take the block over
+            stale = shared_memory.SharedMemory(name=name)
+            stale.close()
+            stale.unlink()
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        _OWNED.add(self.shm.name)
+        self.header, self.ring = _views(self.shm.buf, slots, max_det, num_kpts)
+        self.header["magic"], self.header["slots"] = MAGIC, slots
+        self.header["max_det"], self.header["num_kpts"] = max_det, num_kpts
+        self.header["head"] = 0
+        self.slots, self.max_det, self.num_kpts = slots, max_det, num_kpts
+        self.frames = 0
+
+    def publish(self, boxes, scores, classes, keypoints=None, track_ids=None, frame=None, timestamp=None):
+        """Write one frame of results into the next ring slot (arrays are truncated to max_det)."""
+        n = min(len(boxes), self.max_det)
+        seq = int(self.header["head"][0])
+        slot = self.ring[seq % self.slots:seq % self.slots + 1]
+        slot["seq"] = 2 * seq + 1                                           # writing
+        slot["frame"] = self.frames if frame is None else frame
+        slot["timestamp"] = time.time() if timestamp is None else timestamp
+        slot["count"] = n
+        record = slot[0]
+        record["boxes"][:n] = boxes[:n]
+        record["scores"][:n] = scores[:n]
+        record["classes"][:n] = classes[:n]
+        record["track_ids"][:n] = -1 if track_ids is None else track_ids[:n]
+        record["keypoints"][:n] = 0                                         # slots are reused: clear stale keypoints
+        if keypoints is not None:
+            k = min(keypoints.shape[1], self.num_kpts)
+            record["keypoints"][:n, :k, :keypoints.shape[2]] = keypoints[:n, :k]
+        slot["seq"] = 2 * seq + 2                                           # done
+        self.header["head"] = seq + 1
+        self.frames += 1
+        return seq
+
+    def publish_result(self, result, frame=None):
+        """Publish an Ultralytics Results object; returns it so it can wrap model calls."""
+        boxes = result.boxes
+        track_ids = boxes.id.cpu().numpy() if boxes.id is not None else None
+        keypoints = result.keypoints.data.cpu().numpy() if result.keypoints is not None else None
+        self.publish(boxes.xyxy.cpu().numpy(), boxes.conf.cpu().numpy(), boxes.cls.cpu().numpy(),
+                     keypoints=keypoints, track_ids=track_ids, frame=frame)
+        return result
+
+    def close(self):
+        del self.header, self.ring                                          # release buffer exports first
+        self.shm.close()
+        self.shm.unlink()
+        _OWNED.discard(self.shm.name)
+
+
+class ResultSubscriber:
+    """Reader: attaches to an existing stream by name; many subscribers can run at once."""
+
+    def __init__(self, name):
+        self.shm = shared_memory.SharedMemory(name=name)
+        if sys.version_info < (3, 13) and self.shm.name not in _OWNED:
+            # Readers must not unlink the block when they exit (bpo-39959)
+            resource_tracker.unregister(self.shm._name, "shared_memory")
+        header = np.ndarray((1,), dtype=HEADER_DTYPE, buffer=self.shm.buf)[0]
+        if header["magic"] != MAGIC:
+            raise ValueError(f"Shared memory '{name}' is not a YOLO result stream")
+        self.slots = int(header["slots"])
+        self.header, self.ring = _views(self.shm.buf, self.slots, int(header["max_det"]), int(header["num_kpts"]))
+        self.next_seq = int(self.header["head"][0])
+        self.lost = 0
+
+    def _read(self, seq):
+        slot = self.ring[seq % self.slots]
+        before = slot["seq"]
+        record = slot.copy()                                                # one memcpy of the fixed-size record
+        if before != 2 * seq + 2 or slot["seq"] != before:
+            return None                                                     # overwritten or mid-write
+        return record
+
+    def latest(self):
+        """Most recent complete frame record, or None if nothing has been published yet."""
+        head = int(self.header["head"][0])
+        return self._read(head - 1) if head else None
+
+    def poll(self):
+        """All complete records published since the last poll (skipping any lost to overruns)."""
+        head = int(self.header["head"][0])
+        if head - self.next_seq > self.slots:
+            self.lost += head - self.slots - self.next_seq
+            self.next_seq = head - self.slots
+        records = []
+        for seq in range(self.next_seq, head):
+            record = self._read(seq)
+            if record is None:
+                self.lost += 1
+            else:
+                records.append(record)
+        self.next_seq = head
+        return records
+
+    @staticmethod
+    def unpack(record):
+        """Trim a record's fixed-size arrays to the detections it actually holds."""
+        n = int(record["count"])
+        return {"frame": int(record["frame"]), "timestamp": float(record["timestamp"]),
+                "boxes": record["boxes"][:n], "scores": record["scores"][:n], "classes": record["classes"][:n],
+                "track_ids": record["track_ids"][:n], "keypoints": record["keypoints"][:n]}
+
+    def close(self):
+        del self.header, self.ring
+        self.shm.close()
+
+
+def add_publish_argument(parser):
+    parser.add_argument("--publish", metavar="NAME",
+                        help="Publish results to the shared-memory stream NAME (read with result_stream.py NAME)")
+    return parser
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Print results from a shared-memory YOLO result stream")
+    parser.add_argument("name", help="Stream name given to --publish")
+    parser.add_argument("--interval", type=float, default=0.05, help="Polling interval in seconds")
+    args = parser.parse_args()
+
+    subscriber = ResultSubscriber(args.name)
+    print(f"👂 Listening on '{args.name}' ({subscriber.slots} slots). Ctrl+C to stop.")
+    try:
+        while True:
+            for record in subscriber.poll():
+                frame = ResultSubscriber.unpack(record)
+                latency = (time.time() - frame["timestamp"]) * 1000
+                print(f"frame {frame['frame']:>6}: {len(frame['boxes']):>3} detections, "
+                      f"classes {sorted(set(frame['classes'].tolist()))}, {latency:.1f} ms old")
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(f"Lost frames (reader too slow): {subscriber.lost}")
+        subscriber.close()
+
+
+if __name__ == "__main__":
+    main()
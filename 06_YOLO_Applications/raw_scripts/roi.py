@@ -0,0 +1,150 @@
+"""
+roi.py
+------
+Region-of-interest cropping and dynamic input resolution for the YOLO raw_scripts.
+
+✅ Per-source ROI polygons (normalized coordinates, from the command line or a JSON config).
+✅ Only the polygon's bounding rectangle is sent to the model; pixels outside the polygon are grayed out.
+✅ Dynamic imgsz: the smallest stride-aligned input size that keeps the configured minimum object size detectable.
+✅ Boxes, mask polygons and keypoints are mapped back to full-frame coordinates.
+
+Latency scales with ROI area instead of sensor resolution.
+
+Config (rois.json):
+    {"0":                      {"polygons": [[[0.3, 0.2], [0.7, 0.2], [0.7, 1.0], [0.3, 1.0]]], "min_object": 24},
+     "rtsp://cam2/stream":     {"polygons": [[[0.0, 0.5], [1.0, 0.5], [1.0, 1.0], [0.0, 1.0]]]}}
+
+Usage:
+    python object_detection.py --roi 0.3,0.2,0.7,0.2,0.7,1,0.3,1 --min-object 24
+    python pose_estimation.py --roi-config rois.json --source-name 0
+"""
+import json
+import math
+
+import cv2
+import numpy as np
+
+from counting import parse_points
+from renderer import Instances
+
+LETTERBOX_GRAY = 114                   # same fill value Ultralytics uses for padding
+
+
+def dynamic_imgsz(long_side, min_object=None, model_min_px=16, stride=32, min_size=160, max_size=1280):
+    """
+    Smallest stride-aligned input size at which an object of `min_object` source pixels still
+    spans `model_min_px` pixels at the model input. Without a minimum object size the crop is kept
+    at native resolution (capped at max_size).
+    """
+    scale = model_min_px / min_object if min_object else 1.0
+    size = math.ceil(long_side * scale / stride) * stride
+    return int(min(max(size, min_size), max_size))
+
+
+def load_roi_config(path, source):
+    """(polygons, min_object) for one source from a rois.json file."""
+    with open(path) as f:
+        config = json.load(f)
+    entry = config.get(str(source))
+    if entry is None:
+        raise KeyError(f"No ROI configured for source '{source}' in {path}")
+    return [np.asarray(poly, dtype=np.float64) for poly in entry["polygons"]], entry.get("min_object")
+
+
+class ROICropper:
+    def __init__(self, model, polygons, min_object=None, model_min_px=16, mask_outside=True, **predict_kwargs):
+        """
+        polygons:       list of (K, 2) normalized polygons; the model sees their joint bounding rectangle
+        min_object:     smallest object to detect, in source pixels (drives the dynamic imgsz)
+        mask_outside:   gray out pixels inside the rectangle but outside the polygons
+        """
+        self.model = model
+        self.polygons = [np.asarray(poly, dtype=np.float64) for poly in polygons]
+        self.min_object = min_object
+        self.model_min_px = model_min_px
+        self.mask_outside = mask_outside
+        self.predict_kwargs = dict(predict_kwargs, verbose=False)
+        self._shape = None
+
+    def _prepare(self, shape):
+        """Pixel polygons, crop rectangle, polygon mask and imgsz for one frame size (cached)."""
+        if self._shape == shape:
+            return
+        height, width = shape[:2]
+        self.pixel_polygons = [np.round(poly * (width, height)).astype(np.int32) for poly in self.polygons]
+        x, y, w, h = cv2.boundingRect(np.concatenate(self.pixel_polygons))
+        x1, y1 = max(x, 0), max(y, 0)
+        x2, y2 = min(x + w, width), min(y + h, height)
+        self.rect = (x1, y1, x2, y2)
+        self.offset = np.array([x1, y1], dtype=np.float32)
+        self.mask = np.zeros((y2 - y1, x2 - x1), dtype=np.uint8)
+        cv2.fillPoly(self.mask, [poly - (x1, y1) for poly in self.pixel_polygons], 255)
+        self._buffer = np.full((y2 - y1, x2 - x1) + shape[2:], LETTERBOX_GRAY, dtype=np.uint8)
+        self.imgsz = dynamic_imgsz(max(x2 - x1, y2 - y1), self.min_object, self.model_min_px)
+        self._shape = shape
+
+    def crop(self, frame):
+        """Model input for this frame: a view of the ROI rectangle, or a masked copy of it."""
+        self._prepare(frame.shape)
+        x1, y1, x2, y2 = self.rect
+        view = frame[y1:y2, x1:x2]
+        if not self.mask_outside:
+            return view
+        cv2.copyTo(view, self.mask, self._buffer)                  # outside pixels keep the gray fill
+        return self._buffer
+
+    def to_frame(self, result):
+        """Crop-space Results → full-frame Instances, dropping objects centered outside the polygons."""
+        boxes = result.boxes
+        if boxes is None or len(boxes) == 0:
+            return Instances(np.empty((0, 4)), [], [])
+        xyxy = boxes.xyxy.cpu().numpy() + np.tile(self.offset, 2)
+        centers = ((xyxy[:, :2] + xyxy[:, 2:]) / 2 - self.offset).astype(int)
+        centers = np.clip(centers, 0, [self.mask.shape[1] - 1, self.mask.shape[0] - 1])
+        inside = self.mask[centers[:, 1], centers[:, 0]] > 0
+        polygons = [poly + self.offset for poly in result.masks.xy] if result.masks is not None else None
+        keypoints = None
+        if result.keypoints is not None:
+            keypoints = result.keypoints.data.cpu().numpy().copy()
+            keypoints[..., :2] += self.offset
+            keypoints = keypoints[inside]
+        return Instances(xyxy[inside], boxes.cls.cpu().numpy()[inside], boxes.conf.cpu().numpy()[inside],
+                         [p for p, keep in zip(polygons, inside) if keep] if polygons is not None else None,
+                         keypoints)
+
+    def __call__(self, frame):
+        crop = self.crop(frame)
+        return self.to_frame(self.model(crop, imgsz=self.imgsz, **self.predict_kwargs)[0])
+
+    def detections(self, frame):
+        """(N, 6) array of x1, y1, x2, y2, score, class_id — the tracker's input format."""
+        instances = self(frame)
+        return np.concatenate([instances.boxes, instances.scores[:, None],
+                               instances.classes[:, None].astype(np.float32)], axis=1)
+
+    def draw(self, frame, color=(0, 200, 255)):
+        """Outline the ROI polygons on the frame."""
+        if self._shape is not None:
+            cv2.polylines(frame, self.pixel_polygons, True, color, 2)
+        return frame
+
+
+def add_roi_arguments(parser):
+    parser.add_argument("--roi", action="append", type=parse_points, metavar="X,Y,...",
+                        help="Normalized ROI polygon (repeatable); only this region is analysed")
+    parser.add_argument("--roi-config", metavar="JSON", help="Per-source ROI polygons file (see roi.py)")
+    parser.add_argument("--source-name", help="Key of this camera in --roi-config (default: --source, else 0)")
+    parser.add_argument("--min-object", type=float, metavar="PX",
+                        help="Smallest object size in source pixels; picks the smallest imgsz that keeps it")
+    return parser
+
+
+def roi_from_args(model, args):
+    """ROICropper configured from add_roi_arguments(), or None when no ROI was given."""
+    if args.roi_config:
+        source_name = args.source_name or getattr(args, "source", "0")
+        polygons, min_object = load_roi_config(args.roi_config, source_name)
+        return ROICropper(model, polygons, args.min_object or min_object)
+    if args.roi:
+        return ROICropper(model, args.roi, args.min_object)
+    return None
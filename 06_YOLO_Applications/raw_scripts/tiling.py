@@ -0,0 +1,204 @@
+"""
+tiling.py
+---------
+Tiled (sliced) inference for high-resolution frames, so small objects survive on 4K cameras
+without raising imgsz for the whole frame.
+
+✅ Cuts each frame into overlapping tiles (views, no copies) and runs them through the model as one batch.
+✅ Optional full-frame pass so large objects that span several tiles are still found.
+✅ ROI mode: a coarse full-frame pass picks regions of interest and only the tiles covering them are run.
+✅ Vectorized cross-tile NMS over all tiles at once: class-aware IoU, plus intersection-over-smaller
+   between boxes from different tiles / the full frame when one of them is cut by a tile seam.
+✅ Works for detection and segmentation models (mask polygons are shifted back to frame coordinates).
+
+Usage:
+    tiler = TiledDetector(model, tile=640, overlap=0.2)
+    instances = tiler(frame)                  # renderer.Instances in full-frame coordinates
+    annotated = Renderer(model.names).draw(frame, instances)
+"""
+import numpy as np
+
+from renderer import Instances
+
+EDGE_PENALTY = 0.5                     # ranking weight for boxes cut off by an interior tile edge
+
+
+def tile_grid(width, height, tile=640, overlap=0.2):
+    """(K, 4) xyxy tile windows covering the frame with at least `overlap` (fraction of tile) between neighbors."""
+    stride = max(int(tile * (1 - overlap)), 1)
+
+    def starts(length):
+        if length <= tile:
+            return np.array([0])
+        count = int(np.ceil((length - tile) / stride)) + 1
+        return np.linspace(0, length - tile, count).round().astype(int)
+
+    xs, ys = np.meshgrid(starts(width), starts(height))
+    x1, y1 = xs.ravel(), ys.ravel()
+    return np.stack([x1, y1, np.minimum(x1 + tile, width), np.minimum(y1 + tile, height)], axis=1)
+
+
+def overlap_matrix(a, b, metric="iou"):
+    """Pairwise IoU or intersection-over-smaller-area between (N, 4) and (M, 4) xyxy boxes → (N, M)."""
+    lt = np.maximum(a[:, None, :2], b[None, :, :2])
+    rb = np.minimum(a[:, None, 2:4], b[None, :, 2:4])
+    inter = np.clip(rb - lt, 0, None).prod(axis=2)
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    if metric == "ios":
+        denominator = np.minimum(area_a[:, None], area_b[None, :])
+    else:
+        denominator = area_a[:, None] + area_b[None, :] - inter
+    return inter / np.maximum(denominator, 1e-9)
+
+
+def nms(boxes, scores, classes, threshold=0.5, metric="iou", sources=None, seam=None, seam_threshold=0.5):
+    """
+    Class-aware matrix ("fast") NMS: a box is dropped if any higher-ranked box of the same class
+    overlaps it by more than `threshold`. One N×N overlap matrix, no Python loop over boxes.
+
+    sources / seam (optional, per box): which pass a box came from (tile or full frame) and whether it
+    is cut by a tile seam. Pairs from different passes where either box is cut are also merged when
+    their intersection-over-smaller exceeds `seam_threshold`, so a truncated half folds into the whole
+    box without IOS-suppressing overlapping objects in general (e.g. people in a crowd).
+    Returns the kept indices, best first.
+    """
+    if len(boxes) == 0:
+        return np.empty(0, dtype=int)
+    order = np.argsort(-scores, kind="stable")
+    ranked = boxes[order]
+    suppress = overlap_matrix(ranked, ranked, metric) > threshold
+    if sources is not None and seam is not None:
+        source, cut = sources[order], seam[order]
+        across_seam = (source[:, None] != source[None, :]) & (cut[:, None] | cut[None, :])
+        suppress |= across_seam & (overlap_matrix(ranked, ranked, "ios") > seam_threshold)
+    suppress &= classes[order][:, None] == classes[order][None, :]
+    suppress = np.triu(suppress, k=1)                               # row i only suppresses lower-ranked j > i
+    return order[~suppress.any(axis=0)]
+
+
+def cut_by_tile_edge(boxes, windows, frame_width, frame_height, margin=2):
+    """True for boxes touching a tile border that is not also a frame border (i.e. likely truncated)."""
+    near = np.abs(boxes - windows) <= margin
+    inner = np.stack([windows[:, 0] > 0, windows[:, 1] > 0,
+                      windows[:, 2] < frame_width, windows[:, 3] < frame_height], axis=1)
+    return (near & inner).any(axis=1)
+
+
+class TiledDetector:
+    def __init__(self, model, tile=640, overlap=0.2, full_frame=True, roi=False, roi_conf=0.1, roi_margin=0.5,
+                 conf=0.25, nms_threshold=0.5, metric="iou", seam_threshold=0.5, **predict_kwargs):
+        """
+        tile / overlap:  tile size in pixels and overlap as a fraction of the tile
+        full_frame:      also run the model once on the whole (letterboxed) frame
+        roi:             only run tiles that cover boxes from a coarse full-frame pass at roi_conf
+        roi_margin:      grow each coarse box by this fraction of its size before picking tiles
+        metric:          overlap metric of the general merge ("iou"; "ios" would also drop occluded objects)
+        seam_threshold:  intersection-over-smaller above which a box cut by a tile seam is merged into an
+                         overlapping box from another tile or the full-frame pass
+        """
+        self.model = model
+        self.tile = tile
+        self.overlap = overlap
+        self.full_frame = full_frame or roi
+        self.roi = roi
+        self.roi_conf = roi_conf
+        self.roi_margin = roi_margin
+        self.conf = conf
+        self.nms_threshold = nms_threshold
+        self.metric = metric
+        self.seam_threshold = seam_threshold
+        self.predict_kwargs = dict(predict_kwargs, verbose=False)
+        self._grid = {}
+        self.last_tiles = 0
+
+    def windows(self, width, height):
+        key = (width, height)
+        if key not in self._grid:
+            self._grid[key] = tile_grid(width, height, self.tile, self.overlap)
+        return self._grid[key]
+
+    def select_windows(self, windows, boxes, width, height):
+        """Tiles that intersect any (expanded) region of interest."""
+        if len(boxes) == 0:
+            return windows[:0]
+        grow = (boxes[:, 2:4] - boxes[:, :2]) * self.roi_margin / 2
+        rois = np.concatenate([boxes[:, :2] - grow, boxes[:, 2:4] + grow], axis=1)
+        rois = np.clip(rois, 0, [width, height, width, height])
+        hit = (overlap_matrix(windows.astype(np.float32), rois, "ios") > 0).any(axis=1)
+        return windows[hit]
+
+    @staticmethod
+    def _collect(result, offset):
+        boxes = result.boxes
+        if boxes is None or len(boxes) == 0:
+            return None
+        xyxy = boxes.xyxy.cpu().numpy() + np.tile(offset, 2)
+        polygons = [poly + offset for poly in result.masks.xy] if result.masks is not None else None
+        return xyxy, boxes.conf.cpu().numpy(), boxes.cls.cpu().numpy(), polygons
+
+    def __call__(self, frame):
+        height, width = frame.shape[:2]
+        windows = self.windows(width, height)
+        parts, part_windows, part_sources = [], [], []              # source 0 = full frame, k = k-th tile
+
+        if self.full_frame:
+            coarse_conf = self.roi_conf if self.roi else self.conf
+            coarse = self._collect(self.model(frame, conf=coarse_conf, **self.predict_kwargs)[0], np.zeros(2))
+            if self.roi:
+                windows = self.select_windows(windows, coarse[0] if coarse else np.empty((0, 4)), width, height)
+            if coarse:
+                keep = coarse[1] >= self.conf
+                coarse = (coarse[0][keep], coarse[1][keep], coarse[2][keep],
+                          [p for p, k in zip(coarse[3], keep) if k] if coarse[3] is not None else None)
+                parts.append(coarse)
+                part_windows.append(np.tile([0, 0, width, height], (len(coarse[0]), 1)))
+                part_sources.append(np.zeros(len(coarse[0]), dtype=int))
+
+        self.last_tiles = len(windows)
+        if len(windows):
+            crops = [frame[y1:y2, x1:x2] for x1, y1, x2, y2 in windows]       # views into the frame
+            results = self.model(crops, imgsz=self.tile, conf=self.conf, **self.predict_kwargs)
+            for index, (window, result) in enumerate(zip(windows, results), start=1):
+                part = self._collect(result, window[:2].astype(np.float32))
+                if part:
+                    parts.append(part)
+                    part_windows.append(np.tile(window, (len(part[0]), 1)))
+                    part_sources.append(np.full(len(part[0]), index))
+
+        if not parts:
+            return Instances(np.empty((0, 4)), [], [])
+        boxes = np.concatenate([p[0] for p in parts])
+        scores = np.concatenate([p[1] for p in parts])
+        classes = np.concatenate([p[2] for p in parts])
+        has_masks = all(p[3] is not None for p in parts)
+        polygons = [poly for p in parts for poly in p[3]] if has_masks else None
+
+        # Rank truncated boxes below whole ones, so the merge keeps the complete view of an object
+        truncated = cut_by_tile_edge(boxes, np.concatenate(part_windows), width, height)
+        rank = np.where(truncated, scores * EDGE_PENALTY, scores)
+        keep = nms(boxes, rank, classes, self.nms_threshold, self.metric,
+                   sources=np.concatenate(part_sources), seam=truncated, seam_threshold=self.seam_threshold)
+        return Instances(boxes[keep], classes[keep], scores[keep],
+                         [polygons[i] for i in keep] if polygons is not None else None)
+
+    def detections(self, frame):
+        """(N, 6) array of x1, y1, x2, y2, score, class_id — the tracker's input format."""
+        instances = self(frame)
+        return np.concatenate([instances.boxes, instances.scores[:, None],
+                               instances.classes[:, None].astype(np.float32)], axis=1)
+
+
+def add_tiling_arguments(parser):
+    parser.add_argument("--tile", type=int, metavar="SIZE", help="Tiled inference with SIZE×SIZE tiles (e.g. 640)")
+    parser.add_argument("--tile-overlap", type=float, default=0.2, help="Tile overlap fraction (default: 0.2)")
+    parser.add_argument("--tile-roi", action="store_true",
+                        help="Only tile regions found by a coarse full-frame pass")
+    return parser
+
+
+def tiler_from_args(model, args):
+    """TiledDetector configured from add_tiling_arguments(), or None when --tile is not set."""
+    if not args.tile:
+        return None
+    return TiledDetector(model, tile=args.tile, overlap=args.tile_overlap, roi=args.tile_roi)
@@ -0,0 +1,243 @@
+"""
+tracker.py
+----------
+Vectorized ByteTrack/SORT-style multi-object tracker for the YOLO raw_scripts.
+
+✅ Constant-velocity Kalman filter over [cx, cy, w, h], batched over all tracks with NumPy.
+✅ IoU association (class-gated) solved in one Hungarian call, no per-box Python loops.
+✅ ByteTrack two-stage matching: confident detections first, then low-score ones for leftover tracks.
+✅ IntervalTracker runs the detector every k frames and propagates tracks with the motion model in between.
+
+Tracks are returned as an (N, 7) float array: x1, y1, x2, y2, track_id, score, class_id.
+"""
+import cv2
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+
+# Kalman noise as a fraction of box height (same weighting as ByteTrack / DeepSORT)
+STD_POSITION = 1.0 / 20
+STD_VELOCITY = 1.0 / 160
+
+_F = np.eye(8, dtype=np.float64)
+_F[:4, 4:] = np.eye(4)                 # x' = x + v  (dt = 1 frame)
+_DIAG = np.arange(8)
+
+
+def xyxy_to_cxcywh(boxes):
+    wh = boxes[:, 2:4] - boxes[:, 0:2]
+    return np.concatenate([boxes[:, 0:2] + wh / 2, wh], axis=1)
+
+
+def cxcywh_to_xyxy(boxes):
+    half = boxes[:, 2:4] / 2
+    return np.concatenate([boxes[:, 0:2] - half, boxes[:, 0:2] + half], axis=1)
+
+
+def iou_matrix(a, b):
+    """Pairwise IoU between (N, 4) and (M, 4) xyxy boxes → (N, M)."""
+    lt = np.maximum(a[:, None, :2], b[None, :, :2])
+    rb = np.minimum(a[:, None, 2:4], b[None, :, 2:4])
+    inter = np.clip(rb - lt, 0, None).prod(axis=2)
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    return inter / np.maximum(area_a[:, None] + area_b[None, :] - inter, 1e-9)
+
+
+def associate(track_boxes, track_classes, detections, iou_threshold):
+    """
+    Match tracks to detections by IoU (only within the same class).
+    Returns (matched_track_idx, matched_det_idx, unmatched_track_idx, unmatched_det_idx).
+    """
+    n, m = len(track_boxes), len(detections)
+    if n == 0 or m == 0:
+        empty = np.empty(0, dtype=int)
+        return empty, empty, np.arange(n), np.arange(m)
+    iou = iou_matrix(track_boxes, detections[:, :4])
+    iou[track_classes[:, None] != detections[None, :, 5]] = 0.0
+    rows, cols = linear_sum_assignment(-iou)
+    keep = iou[rows, cols] >= iou_threshold
+    rows, cols = rows[keep], cols[keep]
+    return (rows, cols,
+            np.setdiff1d(np.arange(n), rows, assume_unique=True),
+            np.setdiff1d(np.arange(m), cols, assume_unique=True))
+
+
+def detections_from_result(result):
+    """YOLO Results → (N, 6) array of x1, y1, x2, y2, score, class_id."""
+    if result.boxes is None or len(result.boxes) == 0:
+        return np.empty((0, 6), dtype=np.float32)
+    boxes = result.boxes
+    return np.concatenate([boxes.xyxy.cpu().numpy(),
+                           boxes.conf.cpu().numpy()[:, None],
+                           boxes.cls.cpu().numpy()[:, None]], axis=1)
+
+
+class ByteTracker:
+    """Multi-object tracker whose per-track state lives in flat NumPy arrays."""
+
+    def __init__(self, high_threshold=0.5, low_threshold=0.1, new_track_threshold=0.6,
+                 match_iou=0.3, low_match_iou=0.5, max_age=30, min_hits=3):
+        self.high_threshold = high_threshold
+        self.low_threshold = low_threshold
+        self.new_track_threshold = new_track_threshold
+        self.match_iou = match_iou
+        self.low_match_iou = low_match_iou
+        self.max_age = max_age
+        self.min_hits = min_hits
+        self.frame = 0
+        self.detection_steps = 0
+        self._next_id = 1
+        self.mean = np.empty((0, 8))
+        self.cov = np.empty((0, 8, 8))
+        self.ids = np.empty(0, dtype=np.int64)
+        self.scores = np.empty(0)
+        self.classes = np.empty(0)
+        self.hits = np.empty(0, dtype=np.int64)
+        self.since_update = np.empty(0, dtype=np.int64)
+        self.matched = np.empty(0, dtype=bool)
+
+    def __len__(self):
+        return len(self.ids)
+
+    # ➤ Kalman filter, batched over tracks
+    @staticmethod
+    def _noise(heights, scale):
+        std = np.repeat(heights[:, None], 8, axis=1) * scale
+        cov = np.zeros((len(heights), 8, 8))
+        cov[:, _DIAG, _DIAG] = std ** 2
+        return cov
+
+    def _kalman_predict(self):
+        if not len(self):
+            return
+        heights = self.mean[:, 3]
+        self.mean = self.mean @ _F.T
+        self.cov = _F @ self.cov @ _F.T + self._noise(heights, np.r_[[STD_POSITION] * 4, [STD_VELOCITY] * 4])
+
+    def _kalman_update(self, idx, measurements):
+        mean, cov = self.mean[idx], self.cov[idx]
+        r = (STD_POSITION * mean[:, 3]) ** 2
+        innovation_cov = cov[:, :4, :4] + r[:, None, None] * np.eye(4)
+        gain = cov[:, :, :4] @ np.linalg.inv(innovation_cov)              # (K, 8, 4)
+        residual = measurements - mean[:, :4]
+        self.mean[idx] = mean + (gain @ residual[:, :, None])[:, :, 0]
+        self.cov[idx] = cov - gain @ cov[:, :4, :]
+
+    def _initiate(self, detections):
+        n = len(detections)
+        measurement = xyxy_to_cxcywh(detections[:, :4])
+        heights = measurement[:, 3]
+        std = np.concatenate([np.repeat(2 * STD_POSITION * heights[:, None], 4, axis=1),
+                              np.repeat(10 * STD_VELOCITY * heights[:, None], 4, axis=1)], axis=1)
+        cov = np.zeros((n, 8, 8))
+        cov[:, _DIAG, _DIAG] = std ** 2
+        self.mean = np.concatenate([self.mean, np.concatenate([measurement, np.zeros((n, 4))], axis=1)])
+        self.cov = np.concatenate([self.cov, cov])
+        self.ids = np.concatenate([self.ids, np.arange(self._next_id, self._next_id + n)])
+        self._next_id += n
+        self.scores = np.concatenate([self.scores, detections[:, 4]])
+        self.classes = np.concatenate([self.classes, detections[:, 5]])
+        self.hits = np.concatenate([self.hits, np.ones(n, dtype=np.int64)])
+        self.since_update = np.concatenate([self.since_update, np.zeros(n, dtype=np.int64)])
+        self.matched = np.concatenate([self.matched, np.ones(n, dtype=bool)])
+
+    def _apply_matches(self, track_idx, detections):
+        self._kalman_update(track_idx, xyxy_to_cxcywh(detections[:, :4]))
+        self.scores[track_idx] = detections[:, 4]
+        self.hits[track_idx] += 1
+        self.since_update[track_idx] = 0
+        self.matched[track_idx] = True
+
+    def _prune(self):
+        keep = self.since_update <= self.max_age
+        if keep.all():
+            return
+        for name in ("mean", "cov", "ids", "scores", "classes", "hits", "since_update", "matched"):
+            setattr(self, name, getattr(self, name)[keep])
+
+    def _step(self):
+        self.frame += 1
+        self._kalman_predict()
+        self.since_update += 1
+
+    def boxes(self):
+        return cxcywh_to_xyxy(self.mean[:, :4])
+
+    # ➤ Public API
+    def update(self, detections):
+        """Advance one frame and associate a fresh (N, 6) detection array."""
+        detections = np.asarray(detections, dtype=np.float64).reshape(-1, 6)
+        self._step()
+        self.detection_steps += 1
+        self.matched[:] = False
+
+        scores = detections[:, 4]
+        high = detections[scores >= self.high_threshold]
+        low = detections[(scores >= self.low_threshold) & (scores < self.high_threshold)]
+
+        # Stage 1: confident detections vs. all tracks
+        boxes = self.boxes()
+        t1, d1, rest_tracks, rest_high = associate(boxes, self.classes, high, self.match_iou)
+        self._apply_matches(t1, high[d1])
+
+        # Stage 2: low-score detections rescue tracks left over from stage 1
+        t2, d2, _, _ = associate(boxes[rest_tracks], self.classes[rest_tracks], low, self.low_match_iou)
+        self._apply_matches(rest_tracks[t2], low[d2])
+
+        # Unmatched confident detections start new tracks
+        fresh = high[rest_high]
+        self._initiate(fresh[fresh[:, 4] >= self.new_track_threshold])
+        self._prune()
+        return self.tracks()
+
+    def propagate(self):
+        """Advance one frame with the motion model only (no detector call)."""
+        self._step()
+        self._prune()
+        return self.tracks()
+
+    def tracks(self):
+        """Confirmed tracks that matched a detection at the last detection step."""
+        confirmed = (self.hits >= self.min_hits) | (self.detection_steps <= self.min_hits)
+        mask = confirmed & self.matched
+        return np.concatenate([self.boxes()[mask],
+                               self.ids[mask, None].astype(np.float64),
+                               self.scores[mask, None],
+                               self.classes[mask, None]], axis=1)
+
+
+class IntervalTracker:
+    """Run `detect(frame)` every `detect_every` frames and propagate tracks in between."""
+
+    def __init__(self, detect, tracker=None, detect_every=3):
+        self.detect = detect
+        self.tracker = tracker or ByteTracker(max_age=max(30, 3 * detect_every))
+        self.detect_every = max(1, detect_every)
+        self.index = 0
+        self.detector_calls = 0
+
+    def __call__(self, frame):
+        if self.index % self.detect_every == 0:
+            tracks = self.tracker.update(self.detect(frame))
+            self.detector_calls += 1
+        else:
+            tracks = self.tracker.propagate()
+        self.index += 1
+        return tracks
+
+
+def track_color(track_id):
+    """Stable BGR color per track id."""
+    hue = int(track_id * 37) % 180
+    return tuple(int(c) for c in cv2.cvtColor(np.uint8([[[hue, 220, 255]]]), cv2.COLOR_HSV2BGR)[0, 0])
+
+
+def draw_tracks(frame, tracks, names=None):
+    """Draw track boxes with 'id:label' captions onto `frame` in place."""
+    for x1, y1, x2, y2, track_id, score, class_id in tracks:
+        color = track_color(track_id)
+        label = names[int(class_id)] if names else str(int(class_id))
+        cv2.rectangle(frame, (int(x1), int(y1)), (int(x2), int(y2)), color, 2)
+        cv2.putText(frame, f"#{int(track_id)} {label}", (int(x1), max(int(y1) - 6, 12)),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 2)
+    return frame
@@ -0,0 +1,128 @@
+"""
+video_writer.py
+---------------
+Asynchronous video writer for annotated output, so encoding never blocks the analysis loop.
+
+✅ Frames go through a bounded queue and are encoded on a background thread
+   (cv2.VideoWriter releases the GIL while encoding, so a thread is enough).
+✅ Live mode drops frames when the encoder falls behind and counts them; offline mode (block=True) never drops.
+✅ Segment rotation: start a new file every N seconds (wall clock for cameras, video time for files).
+✅ Opened lazily on the first frame, so the output size always matches the annotated frames.
+
+Usage:
+    writer = AsyncVideoWriter("recordings/cam0.mp4", fps=30, segment_seconds=600)
+    writer.write(annotated_frame)          # returns immediately
+    print(writer.close())                  # flushes the queue, returns frame / drop counts
+
+    python object_detection.py --save recordings/cam0.mp4 --segment-minutes 10
+"""
+import queue
+import threading
+import time
+from pathlib import Path
+
+import cv2
+
+
+class AsyncVideoWriter:
+    def __init__(self, path, fps=30.0, fourcc="mp4v", queue_size=64, block=False, segment_seconds=None,
+                 clock="wall"):
+        """
+        block:            wait for queue space instead of dropping (use for offline processing)
+        segment_seconds:  rotate to a new file (<stem>_000.mp4, <stem>_001.mp4, ...) after this long
+        clock:            "wall" (elapsed real time) or "video" (frames / fps) for segment rotation
+        """
+        self.path = Path(path)
+        self.fps = fps
+        self.fourcc = cv2.VideoWriter_fourcc(*fourcc)
+        self.block = block
+        self.segment_seconds = segment_seconds
+        self.clock = clock
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.stats = {"written": 0, "dropped": 0, "segments": 0}
+        self.files = []
+        self._writer = None
+        self._segment_start = None
+        self._segment_frames = 0
+        self._thread = threading.Thread(target=self._encode_loop, daemon=True)
+        self._thread.start()
+
+    def write(self, frame, copy=False):
+        """
+        Queue a frame for encoding. The frame must not be modified afterwards (pass copy=True if the
+        caller reuses its buffer, e.g. Renderer(in_place=False)). Returns False if it was dropped.
+        """
+        item = (frame.copy() if copy else frame, time.monotonic())
+        if self.block:
+            self.queue.put(item)
+            return True
+        try:
+            self.queue.put_nowait(item)
+            return True
+        except queue.Full:
+            self.stats["dropped"] += 1
+            return False
+
+    # ➤ Background encoding
+    def _segment_path(self):
+        if not self.segment_seconds:
+            return self.path
+        return self.path.with_name(f"{self.path.stem}_{self.stats['segments']:03d}{self.path.suffix}")
+
+    def _open(self, frame, stamp):
+        if self._writer is not None:
+            self._writer.release()
+        path = self._segment_path()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        height, width = frame.shape[:2]
+        self._writer = cv2.VideoWriter(str(path), self.fourcc, self.fps, (width, height))
+        self.files.append(str(path))
+        self.stats["segments"] += 1
+        self._segment_start = stamp
+        self._segment_frames = 0
+
+    def _segment_elapsed(self, stamp):
+        if self.clock == "video":
+            return self._segment_frames / self.fps
+        return stamp - self._segment_start
+
+    def _encode_loop(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                break
+            frame, stamp = item
+            if self._writer is None or (self.segment_seconds and
+                                        self._segment_elapsed(stamp) >= self.segment_seconds):
+                self._open(frame, stamp)
+            self._writer.write(frame)
+            self._segment_frames += 1
+            self.stats["written"] += 1
+        if self._writer is not None:
+            self._writer.release()
+
+    def close(self):
+        """Encode everything still queued, release the file and return the stats."""
+        self.queue.put(None)
+        self._thread.join()
+        return dict(self.stats, files=self.files)
+
+
+def add_writer_arguments(parser):
+    parser.add_argument("--save", metavar="PATH", help="Record the annotated stream to PATH (e.g. out.mp4)")
+    parser.add_argument("--segment-minutes", type=float, help="With --save, start a new file every N minutes")
+    return parser
+
+
+def writer_from_args(args, cap=None):
+    """
+    AsyncVideoWriter for --save (fps taken from the capture if it reports one), or None.
+    Replayable sources (cap.live == False) record every frame and rotate segments on video time.
+    """
+    if not args.save:
+        return None
+    fps = (cap.get(cv2.CAP_PROP_FPS) if cap is not None else 0) or 30.0
+    segment_seconds = args.segment_minutes * 60 if args.segment_minutes else None
+    live = getattr(cap, "live", True)
+    return AsyncVideoWriter(args.save, fps=fps, segment_seconds=segment_seconds,
+                            block=not live, clock="wall" if live else "video")
@@ -0,0 +1,20 @@
+"""
+cv_utils
+Small shared helpers for the OpenCV (04_*), MediaPipe (05_*) and YOLO (06_*) scripts.
+
+The scripts live in nested project folders, so each one adds the repository root to sys.path:
+
+    sys.path.append(str(Path(__file__).resolve().parents[2]))
+    from cv_utils import PerfMeter, open_source
+"""
+from .frame_source import FrameSource, open_source, record_replay, source_from_argv
+from .hand_tracker import RoiHandTracker
+from .landmark_batch import load_landmarks, run_batch
+from .landmark_service import LandmarkClient, LandmarkService
+from .landmarks import HolisticLandmarks, LandmarkArrays, landmarks_to_array
+from .mesh_draw import MeshRenderer, face_mesh_renderer
+from .perf import PerfMeter
+
+__all__ = ["FrameSource", "HolisticLandmarks", "LandmarkArrays", "LandmarkClient", "LandmarkService", "MeshRenderer",
+           "PerfMeter", "RoiHandTracker", "face_mesh_renderer", "landmarks_to_array", "load_landmarks", "open_source",
+           "record_replay", "run_batch", "source_from_argv"]
@@ -0,0 +1,353 @@
+"""
+frame_source.py
+One frame source for every demo: webcam, video file, image directory or recorded replay archive.
+
+Features:
+- FrameSource is a drop-in for cv2.VideoCapture (read / isOpened / get / set / release)
+- Background thread prefetches frames into a small queue for every kind of source
+- Live sources (webcams, or realtime=True) drop the oldest frame when the consumer falls behind;
+  files, image folders and replays never drop, so every run sees exactly the same frames
+- Replay archives (.npz): losslessly encoded frames + their original timestamps, recorded from any source
+- add_source_argument() / source_from_args() for argparse scripts, source_from_argv() for the others
+
+Usage:
+    cap = FrameSource(0)                          # webcam
+    cap = FrameSource("clip.mp4")                 # video file
+    cap = FrameSource("frames/")                  # directory of images (sorted by name)
+    cap = FrameSource("session.npz")              # replay archive
+
+    python -m cv_utils.frame_source record 0 session.npz --seconds 10
+    python -m cv_utils.frame_source info session.npz
+    python pose_landmarks.py session.npz          # any 04/05 script: first argument is the source
+    python pose_landmarks.py service:             # frames + landmarks from a running landmark service
+"""
+import argparse
+import sys
+import threading
+import time
+from collections import deque
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+IMAGE_SUFFIXES = {".jpg", ".jpeg", ".png", ".bmp", ".webp", ".tif", ".tiff"}
+REPLAY_SUFFIX = ".npz"
+SERVICE_PREFIX = "service:"                             # see landmark_service.py
+
+
+def source_kind(source):
+    """'camera', 'images', 'replay' or 'video' (files and stream URLs) for a source spec."""
+    if isinstance(source, int) or (isinstance(source, str) and source.isdigit()):
+        return "camera"
+    path = Path(source)
+    if path.is_dir():
+        return "images"
+    if path.suffix.lower() == REPLAY_SUFFIX:
+        return "replay"
+    return "video"
+
+
+class FrameSource:
+    def __init__(self, source=0, prefetch=4, loop=False, realtime=False, fps=30.0):
+        """
+        source:    webcam index, video path/URL, image directory or replay archive (.npz)
+        prefetch:  frames decoded ahead of the consumer
+        loop:      restart files / folders / replays at the end (timestamps keep increasing)
+        realtime:  pace files / folders / replays by their timestamps and drop frames like a camera
+        fps:       frame rate assumed for image directories
+        """
+        self.source = int(source) if isinstance(source, str) and source.isdigit() else source
+        self.kind = source_kind(self.source)
+        self.loop = loop
+        self.realtime = realtime
+        self.live = self.kind == "camera" or realtime
+        self.cap = None
+        self.timestamp = 0.0                            # ms, of the frame returned by the last read()
+        self.position = 0                               # frames returned so far
+        self.stats = {"read": 0, "dropped": 0}
+
+        if self.kind in ("camera", "video"):
+            self.cap = cv2.VideoCapture(self.source)
+            self._opened = self.cap.isOpened()
+            self.fps = self.cap.get(cv2.CAP_PROP_FPS) or fps
+            self.frame_count = max(int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT)), 0)
+        elif self.kind == "images":
+            self.files = sorted(p for p in Path(self.source).iterdir() if p.suffix.lower() in IMAGE_SUFFIXES)
+            self._opened = bool(self.files)
+            self.fps = fps
+            self.frame_count = len(self.files)
+        else:
+            self._load_replay(fps)
+        self._size = self._probe_size()
+
+        self._items = deque()
+        self._capacity = max(prefetch, 1)
+        self._cond = threading.Condition()
+        self._done = not self._opened                  # nothing to read: read() returns (False, None)
+        self._stopped = False
+        self._thread = threading.Thread(target=self._reader_loop, daemon=True)
+        if self._opened:
+            self._thread.start()
+
+    # ➤ Source kinds: each yields (timestamp_ms, frame)
+    def _load_replay(self, fps):
+        try:
+            with np.load(self.source) as archive:
+                self._data = archive["data"]
+                self._offsets = archive["offsets"]
+                self._timestamps = archive["timestamps"]
+                self._shape = tuple(archive["shape"])
+                self.fps = float(archive["fps"]) or fps
+        except (OSError, KeyError, ValueError):
+            self._opened = False
+            self._timestamps = np.empty(0)
+            self.fps = fps
+        else:
+            self._opened = len(self._timestamps) > 0
+        self.frame_count = len(self._timestamps)
+
+    def _probe_size(self):
+        if self.cap is not None:
+            return None                                 # asked from the capture (may be changed by set())
+        if self.kind == "images" and self.files:
+            image = cv2.imread(str(self.files[0]))
+            return (image.shape[1], image.shape[0]) if image is not None else (0, 0)
+        if self.kind == "replay" and self._opened:
+            return self._shape[1], self._shape[0]
+        return 0, 0
+
+    def _capture_frames(self):
+        started = time.perf_counter()
+        while True:
+            ok, frame = self.cap.read()
+            if not ok:
+                return
+            if self.kind == "camera":
+                yield (time.perf_counter() - started) * 1000, frame
+            else:
+                yield self.cap.get(cv2.CAP_PROP_POS_MSEC), frame
+
+    def _image_frames(self):
+        for index, path in enumerate(self.files):
+            frame = cv2.imread(str(path))
+            if frame is not None:
+                yield index * 1000 / self.fps, frame
+
+    def _replay_frames(self):
+        for index, timestamp in enumerate(self._timestamps):
+            encoded = self._data[self._offsets[index]:self._offsets[index + 1]]
+            yield float(timestamp), cv2.imdecode(encoded, cv2.IMREAD_COLOR)
+
+    def _frames(self):
+        produce = {"camera": self._capture_frames, "video": self._capture_frames,
+                   "images": self._image_frames, "replay": self._replay_frames}[self.kind]
+        offset = 0.0
+        while True:
+            last = None
+            for timestamp, frame in produce():
+                last = timestamp
+                yield offset + timestamp, frame
+            if not self.loop or self.kind == "camera" or last is None:
+                return
+            offset += last + 1000 / self.fps
+            if self.cap is not None:
+                self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+
+    # ➤ Prefetch thread
+    def _reader_loop(self):
+        paced_start = None
+        for timestamp, frame in self._frames():
+            if self.realtime and self.kind != "camera":
+                if paced_start is None:
+                    paced_start = time.perf_counter() - timestamp / 1000
+                delay = paced_start + timestamp / 1000 - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            with self._cond:
+                if self.live:
+                    if len(self._items) == self._capacity:
+                        self._items.popleft()           # keep latency low: the newest frame wins
+                        self.stats["dropped"] += 1
+                else:
+                    self._cond.wait_for(lambda: len(self._items) < self._capacity or self._stopped)
+                if self._stopped:
+                    return
+                self._items.append((timestamp, frame))
+                self._cond.notify_all()
+        with self._cond:
+            self._done = True
+            self._cond.notify_all()
+
+    # ➤ cv2.VideoCapture-compatible API
+    def isOpened(self):
+        # False once a finite source is drained, so `while cap.isOpened(): ... continue` loops still end
+        with self._cond:
+            exhausted = self._done and not self._items
+        return self._opened and not self._stopped and not exhausted
+
+    def read(self, image=None):
+        """(True, frame) for the next frame, (False, None) at the end. Copies into `image` if shapes match."""
+        with self._cond:
+            self._cond.wait_for(lambda: self._items or self._done or self._stopped)
+            if not self._items:
+                return False, None
+            timestamp, frame = self._items.popleft()
+            self._cond.notify_all()
+        self.timestamp = timestamp
+        self.position += 1
+        self.stats["read"] += 1
+        if image is not None and image.shape == frame.shape:
+            np.copyto(image, frame)
+            frame = image
+        return True, frame
+
+    def get(self, prop):
+        if prop == cv2.CAP_PROP_POS_FRAMES:
+            return float(self.position)
+        if prop == cv2.CAP_PROP_POS_MSEC:
+            return self.timestamp
+        if prop == cv2.CAP_PROP_FPS:
+            return self.fps
+        if prop == cv2.CAP_PROP_FRAME_COUNT:
+            return float(self.frame_count)
+        if self.cap is not None:
+            return self.cap.get(prop)
+        if prop == cv2.CAP_PROP_FRAME_WIDTH:
+            return float(self._size[0])
+        if prop == cv2.CAP_PROP_FRAME_HEIGHT:
+            return float(self._size[1])
+        return 0.0
+
+    def set(self, prop, value):
+        """Forwarded to the webcam/video capture (e.g. resolution); other sources are read-only."""
+        return self.cap.set(prop, value) if self.cap is not None else False
+
+    def release(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        if self._thread.is_alive():
+            self._thread.join(timeout=1.0)
+        if self.cap is not None:
+            self.cap.release()
+
+    def __iter__(self):
+        while True:
+            ok, frame = self.read()
+            if not ok:
+                return
+            yield frame
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+def open_source(source=0, **kwargs):
+    """
+    FrameSource for a spec; objects that already look like a capture are passed through.
+    "service:" / "service:<name>" attaches to a running landmark service (frames + landmarks).
+    """
+    if hasattr(source, "read"):
+        return source
+    if isinstance(source, str) and source.startswith(SERVICE_PREFIX):
+        from .landmark_service import LandmarkClient
+        return LandmarkClient(source[len(SERVICE_PREFIX):])
+    return FrameSource(source, **kwargs)
+
+
+# ➤ Replay archives
+def record_replay(source, path, max_frames=None, seconds=None, encoding=".png", show=False):
+    """
+    Record frames + timestamps from any source into a replay archive (.npz).
+    PNG keeps the frames bit-exact; encoding=".jpg" is ~5x smaller but lossy.
+    """
+    cap = open_source(source, prefetch=8)
+    chunks, offsets, timestamps, shape = [], [0], [], None
+    try:
+        for frame in cap:
+            ok, encoded = cv2.imencode(encoding, frame)
+            if not ok:
+                raise ValueError(f"Could not encode frame as {encoding}")
+            chunks.append(encoded.reshape(-1))
+            offsets.append(offsets[-1] + encoded.size)
+            timestamps.append(cap.get(cv2.CAP_PROP_POS_MSEC))
+            shape = frame.shape
+            if show:
+                cv2.imshow("Recording (ESC to stop)", frame)
+                if cv2.waitKey(1) & 0xFF == 27:
+                    break
+            if max_frames and len(timestamps) >= max_frames:
+                break
+            if seconds and timestamps[-1] - timestamps[0] >= seconds * 1000:
+                break
+    finally:
+        fps = cap.get(cv2.CAP_PROP_FPS)
+        cap.release()
+        if show:
+            cv2.destroyAllWindows()
+    if not timestamps:
+        raise IOError(f"No frames read from {source!r}")
+    timestamps = np.asarray(timestamps, dtype=np.float64)
+    with open(path, "wb") as f:                         # file handle: np.savez would append .npz to the name
+        np.savez(f, data=np.concatenate(chunks), offsets=np.asarray(offsets, dtype=np.int64),
+                 timestamps=timestamps - timestamps[0], shape=np.asarray(shape), fps=fps,
+                 encoding=encoding)
+    return len(timestamps)
+
+
+# ➤ Command-line helpers
+def source_from_argv(default=0):
+    """First command-line argument as the source (for scripts without argparse), else `default`."""
+    return sys.argv[1] if len(sys.argv) > 1 else default
+
+
+def add_source_argument(parser):
+    parser.add_argument("--source", default="0",
+                        help="Webcam index, video file, image directory, replay archive "
+                             "or service:<name> for a landmark service (default: 0)")
+    parser.add_argument("--loop", action="store_true", help="Restart file/folder/replay sources at the end")
+    parser.add_argument("--realtime", action="store_true",
+                        help="Play file/folder/replay sources at their recorded speed, dropping frames like a camera")
+    return parser
+
+
+def source_from_args(args):
+    return open_source(args.source, loop=args.loop, realtime=args.realtime)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record and inspect replay archives")
+    commands = parser.add_subparsers(dest="command", required=True)
+    record = commands.add_parser("record", help="Record a source into a replay archive")
+    record.add_argument("source", help="Webcam index, video file or image directory")
+    record.add_argument("out", help="Replay archive to write (.npz)")
+    record.add_argument("--frames", type=int, help="Stop after N frames")
+    record.add_argument("--seconds", type=float, help="Stop after N seconds of source time")
+    record.add_argument("--jpg", action="store_true", help="Store JPEG instead of lossless PNG")
+    record.add_argument("--show", action="store_true", help="Preview while recording (ESC stops)")
+    info = commands.add_parser("info", help="Describe a replay archive")
+    info.add_argument("archive")
+    args = parser.parse_args()
+
+    if args.command == "record":
+        if source_kind(args.source) == "camera" and not (args.frames or args.seconds or args.show):
+            parser.error("recording a webcam needs --frames, --seconds or --show")
+        count = record_replay(args.source, args.out, args.frames, args.seconds,
+                              ".jpg" if args.jpg else ".png", args.show)
+        print(f"💾 Recorded {count} frames to {args.out}")
+    else:
+        with np.load(args.archive) as archive:
+            timestamps = archive["timestamps"]
+            height, width = archive["shape"][:2]
+            size_mb = archive["data"].nbytes / 1e6
+            print(f"🎞️ {args.archive}: {len(timestamps)} frames, {width}x{height}, "
+                  f"{timestamps[-1] / 1000:.2f} s, {float(archive['fps']):.1f} FPS, "
+                  f"{archive['encoding']} {size_mb:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+hand_tracker.py
+ROI-tracking wrapper around MediaPipe Hands for the gesture apps (swipe game, air cursor, painters).
+
+Calling hands.process() on the full webcam frame pays for a full-size color conversion and image
+copy into the graph every iteration, and palm detection scans the whole frame whenever tracking drops.
+RoiHandTracker crops to the last known hand box plus a margin, downsamples large crops, and goes back
+to full-frame detection only when the hand is lost or every N frames (to pick up new hands).
+
+Features:
+- Drop-in for Hands.process(): multi_hand_landmarks / multi_handedness come back in full-frame
+  normalized coordinates, so gesture math and mp_drawing.draw_landmarks work unchanged
+- process_bgr(frame): converts only the crop to RGB
+- Sticky crop window: it only moves when the hand nears its edge or changes size a lot, which keeps
+  MediaPipe's own landmark tracking inside the crop valid
+- Hand lost in the crop → full-frame detection on the same frame, so no gesture frame is skipped
+- stats / close(): how many frames ran on the crop vs the full frame
+
+Usage:
+    hands = RoiHandTracker(max_num_hands=1, min_detection_confidence=0.7)
+    results = hands.process_bgr(frame)            # instead of hands.process(cv2.cvtColor(frame, ...))
+    hands.close()                                 # prints the crop / full-frame split
+"""
+import cv2
+import numpy as np
+
+from .landmarks import landmarks_to_array
+
+CROP_STEP = 32                                          # crop sides are rounded up to this (fewer size changes)
+
+
+class RoiHandTracker:
+    def __init__(self, max_num_hands=1, min_detection_confidence=0.5, min_tracking_confidence=0.5,
+                 tracking=True, margin=0.5, max_side=384, min_side=96, redetect_every=30):
+        """
+        tracking:       False = plain full-frame Hands every frame (for comparison)
+        margin:         crop padding around the hand box on each side, as a fraction of its longer side
+        max_side:       crops larger than this many pixels are downsampled before inference
+        min_side:       smallest crop, so far-away hands still give palm detection some context
+        redetect_every: full-frame detection at least every N frames (new hands entering); 0 = only on loss
+        """
+        import mediapipe as mp
+        options = dict(max_num_hands=max_num_hands, min_detection_confidence=min_detection_confidence,
+                       min_tracking_confidence=min_tracking_confidence)
+        self.tracking = tracking
+        # With tracking, the full-frame graph is a detector (palm detection every call) and the crop graph
+        # keeps MediaPipe's frame-to-frame landmark tracking inside the sticky crop
+        self.full = mp.solutions.hands.Hands(static_image_mode=tracking, **options)
+        self.crop = mp.solutions.hands.Hands(static_image_mode=False, **options) if tracking else None
+        self.margin = margin
+        self.max_side = max_side
+        self.min_side = min_side
+        self.redetect_every = redetect_every
+        self.roi = None                                 # (x0, y0, x1, y1) pixels, or None when no hand is tracked
+        self.mode = None                                # "roi" or "full" for the last process() call
+        self.frames = 0
+        self.stats = {"roi": 0, "full": 0, "lost": 0}
+        self._last_full = 0
+
+    # ➤ Inference
+    def process(self, image, bgr=False):
+        """Hands.process() equivalent on an RGB frame (or BGR with bgr=True)."""
+        self.frames += 1
+        due = self.redetect_every and self.frames - self._last_full >= self.redetect_every
+        if self.roi is not None and not due:
+            results = self._process_crop(image, bgr)
+            if results.multi_hand_landmarks:
+                self.mode = "roi"
+                self.stats["roi"] += 1
+                self._update_roi(results, image.shape)
+                return results
+            self.stats["lost"] += 1                     # fall through: re-detect on this same frame
+        results = self.full.process(cv2.cvtColor(image, cv2.COLOR_BGR2RGB) if bgr else image)
+        self.mode = "full"
+        self.stats["full"] += 1
+        self._last_full = self.frames
+        self._update_roi(results, image.shape)
+        return results
+
+    def process_bgr(self, frame):
+        return self.process(frame, bgr=True)
+
+    def _process_crop(self, image, bgr):
+        height, width = image.shape[:2]
+        x0, y0, x1, y1 = self.roi
+        crop = image[y0:y1, x0:x1]
+        side = max(x1 - x0, y1 - y0)
+        if side > self.max_side:                        # the landmark model runs at 224 px anyway
+            scale = self.max_side / side
+            crop = cv2.resize(crop, (max(int((x1 - x0) * scale), 1), max(int((y1 - y0) * scale), 1)),
+                              interpolation=cv2.INTER_LINEAR)
+        crop = cv2.cvtColor(crop, cv2.COLOR_BGR2RGB) if bgr else np.ascontiguousarray(crop)
+        results = self.crop.process(crop)
+        # Crop-normalized → frame-normalized; z is scaled by image width like x
+        scale_x, scale_y = (x1 - x0) / width, (y1 - y0) / height
+        offset_x, offset_y = x0 / width, y0 / height
+        for hand in results.multi_hand_landmarks or []:
+            for lm in hand.landmark:
+                lm.x = offset_x + lm.x * scale_x
+                lm.y = offset_y + lm.y * scale_y
+                lm.z *= scale_x
+        return results
+
+    # ➤ Crop window
+    def _update_roi(self, results, shape):
+        if not self.tracking or not results.multi_hand_landmarks:
+            self.roi = None
+            return
+        height, width = shape[:2]
+        points = np.concatenate([landmarks_to_array(hand)[:, :2] for hand in results.multi_hand_landmarks])
+        points *= (width, height)
+        (bx0, by0), (bx1, by1) = points.min(axis=0), points.max(axis=0)
+        box_side = max(bx1 - bx0, by1 - by0, 1.0)
+        wanted = max(box_side * (1 + 2 * self.margin), self.min_side)
+        if self.roi is not None:
+            x0, y0, x1, y1 = self.roi
+            pad = 0.25 * self.margin * box_side         # hand must stay this far inside (unless at the frame edge)
+            inside = ((bx0 - pad >= x0 or x0 == 0) and (by0 - pad >= y0 or y0 == 0) and
+                      (bx1 + pad <= x1 or x1 == width) and (by1 + pad <= y1 or y1 == height))
+            if inside and 0.6 < wanted / max(x1 - x0, y1 - y0) < 1.5:
+                return
+        side = int(np.ceil(wanted / CROP_STEP) * CROP_STEP)
+        cx, cy = (bx0 + bx1) / 2, (by0 + by1) / 2
+        x0 = int(np.clip(cx - side / 2, 0, max(width - side, 0)))
+        y0 = int(np.clip(cy - side / 2, 0, max(height - side, 0)))
+        self.roi = (x0, y0, min(x0 + side, width), min(y0 + side, height))
+
+    def draw_roi(self, frame, color=(255, 200, 0)):
+        """Outline of the current crop window (blank while detecting on the full frame)."""
+        if self.roi is not None:
+            cv2.rectangle(frame, self.roi[:2], self.roi[2:], color, 1)
+        return frame
+
+    # ➤ Summary
+    def summary(self):
+        return {"frames": self.frames, **self.stats,
+                "roi_share": round(self.stats["roi"] / self.frames, 3) if self.frames else 0.0}
+
+    def close(self, verbose=True):
+        self.full.close()
+        if self.crop is not None:
+            self.crop.close()
+        summary = self.summary()
+        if verbose and self.tracking and self.frames:
+            print(f"✋ Hand ROI tracking: {summary['roi_share']:.0%} of {self.frames} frames on the crop, "
+                  f"{self.stats['full']} full-frame detections ({self.stats['lost']} after losing the hand)")
+        return summary
@@ -0,0 +1,203 @@
+"""
+landmark_batch.py
+Offline landmark extraction over recorded footage: one video or a whole directory, all cores busy.
+
+Features:
+- Any solution of the landmark service (pose, hands, holistic, face_mesh, face_detection, objectron)
+- Videos are cut into fixed-length segments; each segment runs with video-mode tracking
+  (static_image_mode=False) from a fresh graph state, so results don't depend on the worker layout
+- Segments of every video are spread over one process pool, one MediaPipe graph per worker
+- Output per video: <stem>.<solution>.npz, one compressed column per field plus frame numbers,
+  timestamps and per-field detection counts
+- load_landmarks() reads a file back as a dict of arrays + metadata
+
+Usage:
+    python -m cv_utils.landmark_batch pose footage/ --out landmarks/ --workers 4
+    python -m cv_utils.landmark_batch hands clip.mp4 --segment-seconds 30
+
+    data = load_landmarks("landmarks/clip.pose.npz")
+    data["timestamp_ms"], data["landmarks"], data["landmarks_count"]   # (F,), (F, 1, 33, 3), (F,)
+
+Tracking restarts at every segment boundary (one detection frame per segment); use longer
+segments for fewer seams, shorter ones for better load balancing.
+"""
+import argparse
+import json
+import os
+import time
+from multiprocessing import Pool
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from .landmark_service import DEFAULT_CONFIG, SOLUTIONS, add_solution_arguments, solution_config_from_args
+
+VIDEO_SUFFIXES = {".mp4", ".avi", ".mov", ".mkv", ".webm", ".m4v"}
+
+
+def find_videos(source):
+    """A video file, or every video in a directory (sorted, non-recursive)."""
+    source = Path(source)
+    if source.is_dir():
+        return sorted(p for p in source.iterdir() if p.suffix.lower() in VIDEO_SUFFIXES)
+    return [source]
+
+
+def video_segments(video_path, segment_seconds):
+    """(start, stop) frame ranges of about segment_seconds; the last one runs to the end of the file."""
+    cap = cv2.VideoCapture(str(video_path))
+    if not cap.isOpened():
+        return [], 0.0
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    cap.release()
+    length = max(int(round(segment_seconds * fps)), 1)
+    starts = list(range(0, max(frame_count, 1), length))
+    return [(start, starts[i + 1] if i + 1 < len(starts) else None) for i, start in enumerate(starts)], fps
+
+
+# ➤ Worker: one graph per process, reset for every segment
+_worker = {}
+
+
+def _init_worker(solution, config):
+    cv2.setNumThreads(1)                                # one core per process; avoid oversubscription
+    _worker["solution"] = solution
+    _worker["config"] = config
+    _worker["graph"], _worker["fields"], _worker["extract"] = SOLUTIONS[solution](config)
+
+
+def _fresh_graph():
+    """Forget tracking state between segments (they are not contiguous in time)."""
+    graph = _worker["graph"]
+    if hasattr(graph, "reset"):
+        graph.reset()
+    else:
+        graph.close()
+        _worker["graph"], _, _ = SOLUTIONS[_worker["solution"]](_worker["config"])
+    return _worker["graph"]
+
+
+def _process_segment(job):
+    video_path, start, stop, fps = job
+    graph = _fresh_graph()
+    fields, extract = _worker["fields"], _worker["extract"]
+    started = time.perf_counter()
+    cap = cv2.VideoCapture(video_path)
+    if start:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, start)
+        if abs(cap.get(cv2.CAP_PROP_POS_MSEC) - start * 1000 / fps) > 500 / fps:
+            # Inexact seek (variable frame rate, broken index): read up to the segment instead
+            cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            for _ in range(start):
+                cap.grab()
+    timestamps, rows, counts, frame = [], [], [], None
+    while stop is None or start + len(rows) < stop:
+        success, frame = cap.read(frame)
+        if not success:
+            break
+        timestamps.append(cap.get(cv2.CAP_PROP_POS_MSEC))
+        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        rgb.flags.writeable = False
+        row = {field: np.zeros(shape, dtype) for field, (shape, dtype) in fields.items()}
+        found = extract(graph.process(rgb), row)
+        rows.append(row)
+        counts.append([found[field] for field in fields])
+    cap.release()
+    columns = {field: np.stack([row[field] for row in rows]) if rows else np.zeros((0, *shape), dtype)
+               for field, (shape, dtype) in fields.items()}
+    counts = np.asarray(counts, dtype=np.uint8).reshape(-1, len(fields))
+    for i, field in enumerate(fields):
+        columns[f"{field}_count"] = counts[:, i]
+    columns["timestamp_ms"] = np.asarray(timestamps, dtype=np.float64)
+    columns["frame"] = np.arange(start, start + len(rows), dtype=np.int64)
+    return video_path, start, columns, time.perf_counter() - started
+
+
+# ➤ Output: one compressed column per field
+def output_path(video_path, solution, out_dir=None):
+    video_path = Path(video_path)
+    return Path(out_dir or video_path.parent) / f"{video_path.stem}.{solution}.npz"
+
+
+def write_landmarks(path, columns, meta):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as f:                          # file handle: np.savez would append .npz to the name
+        np.savez_compressed(f, meta=np.array(json.dumps(meta)), **columns)
+    os.replace(tmp, path)
+
+
+def load_landmarks(path):
+    """Columns of a batch output file as a dict of arrays; "meta" is the decoded metadata dict."""
+    with np.load(path) as data:
+        columns = {key: data[key] for key in data.files}
+    columns["meta"] = json.loads(str(columns["meta"]))
+    return columns
+
+
+def run_batch(source, solution="pose", out_dir=None, workers=None, segment_seconds=20.0, **config):
+    """Landmarks for every video in `source`; returns the written file paths."""
+    if solution not in SOLUTIONS:
+        raise ValueError(f"Unknown solution '{solution}'; choose from {sorted(SOLUTIONS)}")
+    config = {**DEFAULT_CONFIG, **config}
+    videos = find_videos(source)
+    if not videos:
+        print(f"❌ No videos found in {source}")
+        return []
+    jobs, info = [], {}
+    for video in videos:
+        segments, fps = video_segments(video, segment_seconds)
+        if not segments:
+            print(f"⚠️  Skipping {video}: could not open it")
+            continue
+        info[str(video)] = {"fps": fps, "segments": len(segments), "parts": {}}
+        jobs += [(str(video), start, stop, fps) for start, stop in segments]
+    if not jobs:
+        return []
+    workers = min(workers or os.cpu_count() or 1, len(jobs))
+    print(f"🎞️  {solution}: {len(info)} video(s), {len(jobs)} segments of {segment_seconds:g}s on {workers} worker(s)")
+
+    started, written, frames = time.perf_counter(), [], 0
+    with Pool(workers, initializer=_init_worker, initargs=(solution, config)) as pool:
+        # Unordered: a video's file is written as soon as its last segment is done
+        for video, start, columns, seconds in pool.imap_unordered(_process_segment, jobs):
+            entry = info[video]
+            entry["parts"][start] = columns
+            count = len(columns["frame"])
+            frames += count
+            print(f"  ✅ {Path(video).name} frames {start}-{start + count - 1}: {count / max(seconds, 1e-6):.1f} FPS")
+            if len(entry["parts"]) < entry["segments"]:
+                continue
+            parts = [entry["parts"][key] for key in sorted(entry["parts"])]
+            merged = {key: np.concatenate([part[key] for part in parts]) for key in parts[0]}
+            path = output_path(video, solution, out_dir)
+            write_landmarks(path, merged, {"video": Path(video).name, "solution": solution, "config": config,
+                                           "fps": entry["fps"], "frames": len(merged["frame"]),
+                                           "segment_seconds": segment_seconds})
+            entry["parts"] = {}
+            written.append(path)
+            print(f"  💾 {path} ({len(merged['frame'])} frames)")
+    elapsed = time.perf_counter() - started
+    print(f"📊 {frames} frames in {elapsed:.1f}s ({frames / max(elapsed, 1e-6):.1f} FPS overall)")
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a MediaPipe solution over recorded videos in parallel")
+    parser.add_argument("solution", choices=sorted(SOLUTIONS))
+    parser.add_argument("source", help="Video file or directory of videos")
+    parser.add_argument("--out", default=None, help="Output directory (default: next to each video)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument("--segment-seconds", type=float, default=20.0,
+                        help="Segment length; tracking restarts at each segment (default: 20)")
+    add_solution_arguments(parser)
+    args = parser.parse_args()
+    run_batch(args.source, args.solution, out_dir=args.out, workers=args.workers,
+              segment_seconds=args.segment_seconds, **solution_config_from_args(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,474 @@
+"""
+landmark_service.py
+One process owns the camera and runs MediaPipe once per frame; any number of apps read the results.
+
+Running hand_landmarks.py, pose_landmarks.py and face_landmarks.py side by side otherwise opens the
+webcam three times and runs three graphs. The service publishes every frame together with the
+landmark arrays of the configured solutions in one shared-memory block, so inference is paid once
+per frame no matter how many clients are listening.
+
+Features:
+- Solutions: hands, face_mesh, pose, holistic, face_detection, objectron (any combination)
+- Block layout described by a JSON header: clients need no configuration beyond the service name
+- Sequence counter (seqlock): readers never see a half-written frame and never block the service
+- LandmarkClient is a cv2.VideoCapture-like source, so any 04/05 script can take "service:" as source
+- Heartbeat: clients end (read() → False) when the service exits or stalls
+
+Usage:
+    python -m cv_utils.landmark_service hands face_mesh pose --source 0
+    python hand_landmarks.py service:            # in other terminals: frames + landmarks from the service
+    python pose_landmarks.py service:
+
+    cap = LandmarkClient()
+    ok, frame = cap.read()
+    cap.results["hands"]["landmarks"]            # (n_hands, 21, 3) normalized x, y, z for this frame
+    cap.pixels("hands")                          # (n_hands, 21, 2) int32 pixel coordinates
+"""
+import argparse
+import json
+import os
+import time
+from multiprocessing import shared_memory
+
+import cv2
+import numpy as np
+
+from .frame_source import open_source
+from .landmarks import FACE_LANDMARKS, HAND_LANDMARKS, POSE_LANDMARKS, landmarks_to_array
+from .perf import PerfMeter
+
+DEFAULT_NAME = "cv_landmarks"
+MAGIC = 0x4C4D4B53                                      # "LMKS"
+ALIGN = 64
+# int64 state slots at the start of the block
+_MAGIC, _LAYOUT_BYTES, _SEQ, _FRAME_INDEX, _TIMESTAMP_US, _HEARTBEAT_NS, _CLOSED = range(7)
+_STATE_SLOTS = 8
+
+
+def _aligned(offset):
+    return (offset + ALIGN - 1) // ALIGN * ALIGN
+
+
+# ➤ Solutions: MediaPipe graph + the arrays its results are published in
+def _fill(landmark_lists, xyz, visibility=None):
+    """Landmark list(s) → rows of xyz (and visibility); returns how many rows were filled."""
+    if landmark_lists is None:
+        return 0
+    if hasattr(landmark_lists, "landmark"):
+        landmark_lists = [landmark_lists]
+    count = min(len(landmark_lists), len(xyz))
+    for i in range(count):
+        landmarks_to_array(landmark_lists[i], xyz[i], None if visibility is None else visibility[i])
+    return count
+
+
+def _hands(config):
+    import mediapipe as mp
+    n = config["max_hands"]
+    graph = mp.solutions.hands.Hands(max_num_hands=n, min_detection_confidence=config["min_detection_confidence"],
+                                     min_tracking_confidence=config["min_tracking_confidence"])
+    fields = {"landmarks": ((n, HAND_LANDMARKS, 3), "f4"),
+              "right": ((n,), "u1"),                     # 1 = "Right" hand in MediaPipe's handedness
+              "score": ((n,), "f4")}
+
+    def extract(results, out):
+        count = _fill(results.multi_hand_landmarks, out["landmarks"])
+        for i, handedness in enumerate((results.multi_handedness or [])[:count]):
+            label = handedness.classification[0]
+            out["right"][i] = label.label == "Right"
+            out["score"][i] = label.score
+        return dict.fromkeys(fields, count)
+    return graph, fields, extract
+
+
+def _face_mesh(config):
+    import mediapipe as mp
+    n = config["max_faces"]
+    graph = mp.solutions.face_mesh.FaceMesh(max_num_faces=n, refine_landmarks=config["refine_landmarks"],
+                                            min_detection_confidence=config["min_detection_confidence"],
+                                            min_tracking_confidence=config["min_tracking_confidence"])
+    points = FACE_LANDMARKS + 10 if config["refine_landmarks"] else FACE_LANDMARKS     # + iris points
+    fields = {"landmarks": ((n, points, 3), "f4")}
+
+    def extract(results, out):
+        return {"landmarks": _fill(results.multi_face_landmarks, out["landmarks"])}
+    return graph, fields, extract
+
+
+def _pose(config):
+    import mediapipe as mp
+    graph = mp.solutions.pose.Pose(min_detection_confidence=config["min_detection_confidence"],
+                                   min_tracking_confidence=config["min_tracking_confidence"])
+    fields = {"landmarks": ((1, POSE_LANDMARKS, 3), "f4"), "visibility": ((1, POSE_LANDMARKS), "f4")}
+
+    def extract(results, out):
+        return dict.fromkeys(fields, _fill(results.pose_landmarks, out["landmarks"], out["visibility"]))
+    return graph, fields, extract
+
+
+def _holistic(config):
+    import mediapipe as mp
+    graph = mp.solutions.holistic.Holistic(min_detection_confidence=config["min_detection_confidence"],
+                                           min_tracking_confidence=config["min_tracking_confidence"])
+    fields = {"face": ((1, FACE_LANDMARKS, 3), "f4"),
+              "pose": ((1, POSE_LANDMARKS, 3), "f4"), "pose_visibility": ((1, POSE_LANDMARKS), "f4"),
+              "left_hand": ((1, HAND_LANDMARKS, 3), "f4"), "right_hand": ((1, HAND_LANDMARKS, 3), "f4")}
+
+    def extract(results, out):
+        pose = _fill(results.pose_landmarks, out["pose"], out["pose_visibility"])
+        return {"face": _fill(results.face_landmarks, out["face"]), "pose": pose, "pose_visibility": pose,
+                "left_hand": _fill(results.left_hand_landmarks, out["left_hand"]),
+                "right_hand": _fill(results.right_hand_landmarks, out["right_hand"])}
+    return graph, fields, extract
+
+
+def _face_detection(config):
+    import mediapipe as mp
+    n = config["max_faces"]
+    graph = mp.solutions.face_detection.FaceDetection(min_detection_confidence=config["min_detection_confidence"])
+    fields = {"boxes": ((n, 4), "f4"),                   # relative xmin, ymin, width, height
+              "keypoints": ((n, 6, 2), "f4"),            # eyes, nose tip, mouth, ear tragions
+              "score": ((n,), "f4")}
+
+    def extract(results, out):
+        detections = (results.detections or [])[:n]
+        for i, detection in enumerate(detections):
+            location = detection.location_data
+            box = location.relative_bounding_box
+            out["boxes"][i] = box.xmin, box.ymin, box.width, box.height
+            out["keypoints"][i, :len(location.relative_keypoints)] = [(k.x, k.y) for k in location.relative_keypoints]
+            out["score"][i] = detection.score[0]
+        return dict.fromkeys(fields, len(detections))
+    return graph, fields, extract
+
+
+def _objectron(config):
+    import mediapipe as mp
+    n = config["max_objects"]
+    graph = mp.solutions.objectron.Objectron(static_image_mode=False, max_num_objects=n,
+                                             min_detection_confidence=config["min_detection_confidence"],
+                                             min_tracking_confidence=0.8, model_name=config["objectron_model"])
+    fields = {"landmarks": ((n, 9, 3), "f4"),            # projected box corners + center, normalized
+              "rotation": ((n, 3, 3), "f4"), "translation": ((n, 3), "f4")}
+
+    def extract(results, out):
+        objects = (results.detected_objects or [])[:n]
+        for i, obj in enumerate(objects):
+            landmarks_to_array(obj.landmarks_2d, out["landmarks"][i])
+            out["rotation"][i] = obj.rotation
+            out["translation"][i] = obj.translation
+        return dict.fromkeys(fields, len(objects))
+    return graph, fields, extract
+
+
+SOLUTIONS = {"hands": _hands, "face_mesh": _face_mesh, "pose": _pose, "holistic": _holistic,
+             "face_detection": _face_detection, "objectron": _objectron}
+DEFAULT_CONFIG = {"max_hands": 2, "max_faces": 2, "max_objects": 5, "refine_landmarks": False,
+                  "objectron_model": "Cup", "min_detection_confidence": 0.5, "min_tracking_confidence": 0.5}
+
+
+# ➤ Shared-memory block
+def _attach(name):
+    """Attach without handing the block to this process's resource tracker (it would unlink it on exit)."""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)          # Python 3.13+
+    except TypeError:
+        block = shared_memory.SharedMemory(name=name)
+        if os.name == "posix":
+            from multiprocessing import resource_tracker
+            resource_tracker.unregister(block._name, "shared_memory")
+        return block
+
+
+class _SharedBlock:
+    """[int64 state][layout JSON][frame][field arrays][per-field counts], every part 64-byte aligned."""
+
+    def __init__(self, shm, layout):
+        self.shm = shm
+        self.layout = layout
+        self.state = np.ndarray((_STATE_SLOTS,), np.int64, shm.buf)
+        self.frame = np.ndarray(tuple(layout["frame"]["shape"]), np.uint8, shm.buf, layout["frame"]["offset"])
+        self.arrays = {key: np.ndarray(tuple(spec["shape"]), spec["dtype"], shm.buf, spec["offset"])
+                       for key, spec in layout["fields"].items()}
+        self.counts = np.ndarray((len(layout["fields"]),), np.int32, shm.buf, layout["counts_offset"])
+
+    @classmethod
+    def create(cls, name, frame_shape, fields, **info):
+        """fields: {"solution/field": (shape, dtype)}; a stale block with the same name is replaced."""
+        header = _aligned(_STATE_SLOTS * 8)
+        layout = {"frame": {"shape": list(frame_shape)}, "fields": {}, **info}
+        # Offsets depend on the JSON length and vice versa: reserve generous room for the JSON
+        draft = json.dumps({**layout, "fields": {k: {"shape": list(s), "dtype": d, "offset": 2 ** 40}
+                                                   for k, (s, d) in fields.items()},
+                            "counts_offset": 2 ** 40}).encode()
+        offset = _aligned(header + len(draft) + 256)
+        layout["frame"]["offset"] = offset
+        offset = _aligned(offset + int(np.prod(frame_shape)))
+        for key, (shape, dtype) in fields.items():
+            layout["fields"][key] = {"shape": list(shape), "dtype": dtype, "offset": offset}
+            offset = _aligned(offset + int(np.prod(shape)) * np.dtype(dtype).itemsize)
+        layout["counts_offset"] = offset
+        size = offset + 4 * len(fields)
+        try:
+            stale = shared_memory.SharedMemory(name=name)   # left behind by a killed service
+            stale.close()
+            stale.unlink()
+        except FileNotFoundError:
+            pass
+        shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        encoded = json.dumps(layout).encode()
+        shm.buf[header:header + len(encoded)] = encoded
+        block = cls(shm, layout)
+        block.state[:] = 0
+        block.state[_LAYOUT_BYTES] = len(encoded)
+        block.state[_MAGIC] = MAGIC                      # last: the block is ready to attach
+        return block
+
+    @classmethod
+    def attach(cls, name):
+        shm = _attach(name)
+        magic, layout_bytes = np.frombuffer(shm.buf[:16], np.int64).tolist()
+        if magic != MAGIC:
+            shm.close()
+            raise FileNotFoundError(f"Shared memory '{name}' is not ready yet")
+        header = _aligned(_STATE_SLOTS * 8)
+        layout = json.loads(bytes(shm.buf[header:header + layout_bytes]))
+        return cls(shm, layout)
+
+    def close(self, unlink=False):
+        self.state = self.frame = self.arrays = self.counts = None      # views must go before the buffer
+        self.shm.close()
+        if unlink:
+            self.shm.unlink()
+
+
+# ➤ Service
+class LandmarkService:
+    def __init__(self, solutions=("hands",), source=0, name=DEFAULT_NAME, flip=True, **config):
+        """
+        solutions: names from SOLUTIONS, each run once per frame
+        source:    anything open_source() accepts (webcam index, video, replay archive, ...)
+        flip:      mirror frames before inference (the 05_* scripts' default view); clients see flipped frames
+        config:    overrides for DEFAULT_CONFIG (max_hands, max_faces, refine_landmarks, ...)
+        """
+        unknown = set(solutions) - set(SOLUTIONS)
+        if unknown:
+            raise ValueError(f"Unknown solution(s) {sorted(unknown)}; choose from {sorted(SOLUTIONS)}")
+        self.solutions = list(dict.fromkeys(solutions))
+        self.source = source
+        self.name = name
+        self.flip = flip
+        self.config = {**DEFAULT_CONFIG, **config}
+        self.block = None
+
+    def serve(self, show=False, max_frames=None):
+        """Capture → infer every solution → publish, until the source ends, ESC (with show) or Ctrl+C."""
+        graphs = [(solution, *SOLUTIONS[solution](self.config)) for solution in self.solutions]
+        # Results are extracted into private staging arrays, then copied into the block in one short write
+        staging = {solution: {field: np.zeros(shape, dtype) for field, (shape, dtype) in fields.items()}
+                   for solution, _, fields, _ in graphs}
+        fields = {f"{solution}/{field}": spec for solution, _, specs, _ in graphs for field, spec in specs.items()}
+        cap = open_source(self.source)
+        perf = PerfMeter("landmark_service")
+        print(f"📡 Landmark service '{self.name}': {', '.join(self.solutions)} (clients: source 'service:{self.name}')")
+        try:
+            while cap.isOpened() and (max_frames is None or perf.frames < max_frames):
+                success, frame = cap.read()
+                if not success:
+                    break
+                perf.lap("capture")
+                if self.flip:
+                    frame = cv2.flip(frame, 1)
+                rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+                rgb.flags.writeable = False
+                perf.lap("convert")
+
+                counts = {}
+                for solution, graph, _, extract in graphs:
+                    found = extract(graph.process(rgb), staging[solution])
+                    counts.update({f"{solution}/{field}": count for field, count in found.items()})
+                perf.lap("infer")
+
+                if self.block is None:
+                    self.block = _SharedBlock.create(self.name, frame.shape, fields, solutions=self.solutions,
+                                                     mirrored=self.flip, fps=cap.get(cv2.CAP_PROP_FPS) or 30.0)
+                self._publish(frame, staging, counts, perf.frames, getattr(cap, "timestamp", 0.0))
+                perf.lap("publish")
+
+                if show:
+                    preview = perf.draw(frame.copy(), origin=(10, 30))
+                    cv2.imshow("Landmark Service", preview)
+                    if cv2.waitKey(1) & 0xFF == 27:
+                        break
+                perf.tick()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            cap.release()
+            for _, graph, _, _ in graphs:
+                graph.close()
+            if self.block is not None:
+                self.block.state[_CLOSED] = 1
+                self.block.close(unlink=True)
+                self.block = None
+            if show:
+                cv2.destroyAllWindows()
+            perf.close()
+
+    def _publish(self, frame, staging, counts, frame_index, timestamp_ms):
+        block = self.block
+        if frame.shape != block.frame.shape:             # source changed resolution mid-stream
+            frame = cv2.resize(frame, (block.frame.shape[1], block.frame.shape[0]))
+        block.state[_SEQ] += 1                           # odd: write in progress
+        np.copyto(block.frame, frame)
+        for i, key in enumerate(block.layout["fields"]):
+            solution, field = key.split("/", 1)
+            np.copyto(block.arrays[key], staging[solution][field])
+            block.counts[i] = counts[key]
+        block.state[_FRAME_INDEX] = frame_index
+        block.state[_TIMESTAMP_US] = int(timestamp_ms * 1000)
+        block.state[_HEARTBEAT_NS] = time.time_ns()
+        block.state[_SEQ] += 1                           # even: consistent again
+
+
+# ➤ Client
+class LandmarkClient:
+    live = True                                          # behaves like a camera: only the newest frame counts
+
+    def __init__(self, name=DEFAULT_NAME, timeout=5.0):
+        """
+        name:    service name (python -m cv_utils.landmark_service ... --name)
+        timeout: seconds to wait for the service to start, and for a new frame before giving up
+        """
+        self.name = name or DEFAULT_NAME
+        self.timeout = timeout
+        self.block = None
+        self.results = {}                                # {solution: {field: array}} for the last frame read
+        self.frame_index = -1
+        self.timestamp = 0.0                             # ms, source timestamp of the last frame read
+        deadline = time.monotonic() + timeout
+        while self.block is None:
+            try:
+                self.block = _SharedBlock.attach(self.name)
+            except FileNotFoundError:
+                if time.monotonic() > deadline:
+                    print(f"❌ No landmark service '{self.name}' (start one with: "
+                          f"python -m cv_utils.landmark_service hands --name {self.name})")
+                    return
+                time.sleep(0.05)
+        self.solutions = self.block.layout["solutions"]
+        self.mirrored = self.block.layout["mirrored"]
+        self._seq = 0
+
+    def isOpened(self):
+        return self.block is not None
+
+    def read(self, image=None):
+        """(True, frame) for the next frame the service publishes, (False, None) once it stops."""
+        if self.block is None:
+            return False, None
+        state = self.block.state
+        deadline = time.monotonic() + self.timeout
+        while True:
+            seq = int(state[_SEQ])
+            if state[_CLOSED] or time.monotonic() > deadline:
+                state = None                             # drop the view so the block can be closed
+                self.release()
+                return False, None
+            if seq % 2 or seq == self._seq:
+                time.sleep(0.0005)
+                continue
+            frame = np.empty_like(self.block.frame) if image is None or image.shape != self.block.frame.shape else image
+            np.copyto(frame, self.block.frame)
+            counts = self.block.counts.copy()
+            arrays = [(key, array[:counts[i]].copy()) for i, (key, array) in enumerate(self.block.arrays.items())]
+            frame_index, timestamp = int(state[_FRAME_INDEX]), int(state[_TIMESTAMP_US]) / 1000
+            if int(state[_SEQ]) == seq:                  # nothing was written while copying
+                break
+        self._seq = seq
+        self.frame_index, self.timestamp = frame_index, timestamp
+        self.results = {solution: {} for solution in self.solutions}
+        for key, array in arrays:
+            solution, field = key.split("/", 1)
+            self.results[solution][field] = array
+        return True, frame
+
+    def pixels(self, solution, field="landmarks"):
+        """(n, K, 2) int32 pixel coordinates of a landmark field for the last frame read."""
+        if solution not in self.results:
+            raise KeyError(f"Landmark service '{self.name}' does not run '{solution}' "
+                           f"(it runs: {', '.join(self.solutions)})")
+        xyz = self.results[solution][field]
+        height, width = self.block.frame.shape[:2] if self.block is not None else (0, 0)
+        return (xyz[..., :2] * (width, height)).astype(np.int32)
+
+    def get(self, prop):
+        if self.block is None:
+            return 0.0
+        if prop == cv2.CAP_PROP_FRAME_WIDTH:
+            return float(self.block.frame.shape[1])
+        if prop == cv2.CAP_PROP_FRAME_HEIGHT:
+            return float(self.block.frame.shape[0])
+        if prop == cv2.CAP_PROP_FPS:
+            return float(self.block.layout["fps"])
+        if prop == cv2.CAP_PROP_POS_FRAMES:
+            return float(self.frame_index + 1)
+        return 0.0
+
+    def set(self, prop, value):
+        return False
+
+    def release(self):
+        if self.block is not None:
+            self.block.close()
+            self.block = None
+
+    def __iter__(self):
+        while True:
+            success, frame = self.read()
+            if not success:
+                return
+            yield frame
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+    def __del__(self):
+        self.release()
+
+
+def add_solution_arguments(parser):
+    """Per-solution options shared by the service and the offline batch runner."""
+    parser.add_argument("--max-hands", type=int, default=DEFAULT_CONFIG["max_hands"])
+    parser.add_argument("--max-faces", type=int, default=DEFAULT_CONFIG["max_faces"])
+    parser.add_argument("--max-objects", type=int, default=DEFAULT_CONFIG["max_objects"])
+    parser.add_argument("--refine-landmarks", action="store_true", help="FaceMesh iris landmarks (478 points)")
+    parser.add_argument("--objectron-model", default=DEFAULT_CONFIG["objectron_model"],
+                        choices=["Shoe", "Chair", "Cup", "Camera"])
+    return parser
+
+
+def solution_config_from_args(args):
+    return {"max_hands": args.max_hands, "max_faces": args.max_faces, "max_objects": args.max_objects,
+            "refine_landmarks": args.refine_landmarks, "objectron_model": args.objectron_model}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run MediaPipe once per frame and share the landmarks")
+    parser.add_argument("solutions", nargs="+", choices=sorted(SOLUTIONS))
+    parser.add_argument("--source", default="0", help="Webcam index, video file, image directory or replay archive")
+    parser.add_argument("--name", default=DEFAULT_NAME, help="Shared memory name clients attach to")
+    parser.add_argument("--no-flip", action="store_true", help="Publish frames unmirrored")
+    parser.add_argument("--show", action="store_true", help="Preview window with FPS and stage timings")
+    add_solution_arguments(parser)
+    args = parser.parse_args()
+    service = LandmarkService(args.solutions, source=args.source, name=args.name, flip=not args.no_flip,
+                              **solution_config_from_args(args))
+    service.serve(show=args.show)
+
+
+if __name__ == "__main__":
+    main()
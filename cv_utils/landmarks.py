@@ -0,0 +1,148 @@
+"""
+landmarks.py
+MediaPipe landmark results → preallocated NumPy arrays, without a Python loop per landmark.
+
+Features:
+- landmarks_to_array(): one (Normalized)LandmarkList → (K, 3) float32 x, y, z
+  decoded straight from the serialized protobuf bytes (one C-level serialize + a strided view),
+  with a per-landmark fallback for layouts it does not recognise
+- LandmarkArrays: (N, K, 3) float32 buffers for hands / faces / poses, reused every frame,
+  plus (N, K, 2) int32 pixel coordinates projected in one vectorized op and (N, K) visibility
+- HolisticLandmarks: face, pose and both hands of a Holistic result in one update()
+
+Usage:
+    hands = LandmarkArrays(HAND_LANDMARKS, max_items=2)
+    xyz, px = hands.update(results.multi_hand_landmarks, frame.shape)
+    index_tips = px[:, 8]                       # (n_hands, 2) pixel coordinates
+"""
+import numpy as np
+
+HAND_LANDMARKS = 21
+FACE_LANDMARKS = 468                                    # 478 with refine_landmarks=True (iris)
+POSE_LANDMARKS = 33
+
+# Each landmark is serialized as: 0x0A <len> then one (tag byte + little-endian float32) per set field
+_LANDMARK_TAG = 0x0A
+_FIELD_NAMES = {0x0D: "x", 0x15: "y", 0x1D: "z", 0x25: "visibility", 0x2D: "presence"}
+_layouts = {}                                           # payload length → (dtype, expected tags) cache
+
+
+def _layout(payload):
+    """Structured dtype matching one serialized landmark, or None if it is not all float fields."""
+    if len(payload) % 5:
+        return None
+    tags = bytes(payload[0::5])
+    if any(tag not in _FIELD_NAMES for tag in tags) or not {0x0D, 0x15, 0x1D} <= set(tags):
+        return None
+    fields = [("tag", "u1"), ("len", "u1")]
+    for tag in tags:
+        fields += [(f"t_{_FIELD_NAMES[tag]}", "u1"), (_FIELD_NAMES[tag], "<f4")]
+    return np.dtype(fields), tags
+
+
+def _decode_serialized(data, out, visibility=None):
+    """Fill `out` (K, 3) (and `visibility` (K,)) from serialized landmark bytes; False if the layout isn't the fixed one."""
+    if len(data) < 2 or data[0] != _LANDMARK_TAG or data[1] >= 0x80:
+        return False
+    length = data[1]
+    if length not in _layouts:
+        _layouts[length] = _layout(data[2:2 + length])
+    layout = _layouts[length]
+    if layout is None or len(data) % (length + 2) or len(data) // (length + 2) != len(out):
+        return False
+    dtype, tags = layout
+    records = np.frombuffer(data, dtype=dtype)
+    # Every record must have the same header and field tags, or the strided view would be misaligned
+    if (records["tag"] != _LANDMARK_TAG).any() or (records["len"] != length).any():
+        return False
+    for tag in tags:
+        if (records[f"t_{_FIELD_NAMES[tag]}"] != tag).any():
+            return False
+    out[:, 0] = records["x"]
+    out[:, 1] = records["y"]
+    out[:, 2] = records["z"]
+    if visibility is not None:
+        visibility[:] = records["visibility"] if "visibility" in dtype.names else 1.0
+    return True
+
+
+def landmarks_to_array(landmark_list, out=None, visibility=None):
+    """
+    (K, 3) float32 array of x, y, z for a NormalizedLandmarkList / LandmarkList.
+    Pass `out` to fill a preallocated buffer (it must have K rows), and a (K,) `visibility`
+    buffer to also get each landmark's visibility (1.0 where the model does not set it).
+    """
+    if out is None:
+        out = np.empty((len(landmark_list.landmark), 3), dtype=np.float32)
+    if not _decode_serialized(landmark_list.SerializeToString(), out, visibility):
+        for i, lm in enumerate(landmark_list.landmark):
+            out[i] = lm.x, lm.y, lm.z
+            if visibility is not None:
+                visibility[i] = lm.visibility if lm.HasField("visibility") else 1.0
+    return out
+
+
+class LandmarkArrays:
+    """
+    Reused buffers for up to `max_items` landmark sets of K points (hands, faces or poses).
+
+    update() returns views of the filled rows: xyz (n, K, 3) normalized float32 and
+    px (n, K, 2) int32 pixel coordinates; visibility[:n] holds the (n, K) visibility scores.
+    Views are overwritten by the next update().
+    """
+
+    def __init__(self, num_landmarks=HAND_LANDMARKS, max_items=1):
+        self.num_landmarks = num_landmarks
+        self.max_items = max_items
+        self.xyz = np.zeros((max_items, num_landmarks, 3), dtype=np.float32)
+        self.px = np.zeros((max_items, num_landmarks, 2), dtype=np.int32)
+        self.visibility = np.ones((max_items, num_landmarks), dtype=np.float32)
+        self._scaled = np.zeros((max_items, num_landmarks, 2), dtype=np.float32)
+        self.count = 0
+
+    def _resize(self, num_landmarks):
+        # e.g. FaceMesh(refine_landmarks=True) returns 478 points instead of 468
+        self.__init__(num_landmarks, self.max_items)
+
+    def update(self, landmark_lists, frame_shape=None):
+        """
+        landmark_lists: results.multi_hand_landmarks / multi_face_landmarks (may be None),
+                        or a single list such as results.pose_landmarks
+        frame_shape:    image.shape, for the pixel projection (skipped when None)
+        """
+        if landmark_lists is None:
+            landmark_lists = []
+        elif hasattr(landmark_lists, "landmark"):
+            landmark_lists = [landmark_lists]
+        count = min(len(landmark_lists), self.max_items)
+        if count and len(landmark_lists[0].landmark) != self.num_landmarks:
+            self._resize(len(landmark_lists[0].landmark))
+        for i in range(count):
+            landmarks_to_array(landmark_lists[i], self.xyz[i], self.visibility[i])
+        self.count = count
+        if frame_shape is not None and count:
+            height, width = frame_shape[:2]
+            # int() truncation, like the per-landmark int(lm.x * w) it replaces
+            np.multiply(self.xyz[:count, :, :2], (width, height), out=self._scaled[:count])
+            np.copyto(self.px[:count], self._scaled[:count], casting="unsafe")
+        return self.xyz[:count], self.px[:count]
+
+    def __len__(self):
+        return self.count
+
+
+class HolisticLandmarks:
+    """Face, pose and hand arrays for one Holistic result; each part is empty (n=0) when not detected."""
+
+    def __init__(self):
+        self.face = LandmarkArrays(FACE_LANDMARKS)
+        self.pose = LandmarkArrays(POSE_LANDMARKS)
+        self.left_hand = LandmarkArrays(HAND_LANDMARKS)
+        self.right_hand = LandmarkArrays(HAND_LANDMARKS)
+
+    def update(self, results, frame_shape=None):
+        self.face.update(results.face_landmarks, frame_shape)
+        self.pose.update(results.pose_landmarks, frame_shape)
+        self.left_hand.update(results.left_hand_landmarks, frame_shape)
+        self.right_hand.update(results.right_hand_landmarks, frame_shape)
+        return self
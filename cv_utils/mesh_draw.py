@@ -0,0 +1,266 @@
+"""
+mesh_draw.py
+Batched landmark drawing for dense meshes (FaceMesh tessellation / contours / irises, Holistic face).
+
+mp_drawing.draw_landmarks() projects every landmark and issues one cv2.line() per connection from
+Python — about 2.5k calls per face for FACEMESH_TESSELATION. Here the connection index arrays are
+built once, and all edges sharing a color/thickness go to OpenCV in a single cv2.polylines() call
+on the vectorized pixel coordinates from LandmarkArrays.
+
+Features:
+- ConnectionLayer: connections + a BGR color, a DrawingSpec, or a per-connection style dict
+  (mp_drawing_styles.get_default_face_mesh_contours_style())
+- PointLayer: the landmark dots, also in one call
+- MeshRenderer: draws the layers for each face; with lod_width, faces narrower than that many
+  pixels (far from the camera) get the contour layers only
+- face_mesh_renderer(): the tessellation + contours (+ irises) setup used by the face scripts
+- Benchmark of the draw cost per face, before and after:
+      python -m cv_utils.mesh_draw --faces 2 --width 250
+
+Usage:
+    faces = LandmarkArrays(FACE_LANDMARKS, max_items=2)
+    renderer = face_mesh_renderer(mp.solutions.face_mesh, lod_width=120)
+    _, px = faces.update(results.multi_face_landmarks, frame.shape)
+    renderer.draw(frame, px)
+"""
+import argparse
+import time
+
+import cv2
+import numpy as np
+
+DEFAULT_COLOR = (224, 224, 224)                         # mp_drawing.DrawingSpec() default
+DEFAULT_POINT_COLOR = (0, 0, 255)                       # mp_drawing's default landmark color
+
+
+def _color_thickness(spec, thickness=1):
+    """(color, thickness) from a DrawingSpec-like object or a plain BGR tuple."""
+    if hasattr(spec, "color"):
+        return tuple(int(c) for c in spec.color), int(spec.thickness)
+    return tuple(int(c) for c in spec), int(thickness)
+
+
+class ConnectionLayer:
+    def __init__(self, connections, spec=DEFAULT_COLOR, thickness=1):
+        """
+        connections: (start, end) landmark index pairs, e.g. mp_face_mesh.FACEMESH_TESSELATION
+        spec:        BGR color (with `thickness`), a DrawingSpec, or a {connection: DrawingSpec} dict
+        """
+        groups = {}
+        for connection in sorted(connections):
+            style = spec.get(connection, DEFAULT_COLOR) if isinstance(spec, dict) else spec
+            groups.setdefault(_color_thickness(style, thickness), []).append(connection)
+        # One (E, 2) index array per color/thickness → one cv2.polylines() call each
+        self.groups = [(color, width, np.array(edges, dtype=np.intp).reshape(-1, 2))
+                       for (color, width), edges in groups.items()]
+        self.max_index = max((int(edges.max()) for _, _, edges in self.groups if len(edges)), default=-1)
+
+    def draw(self, image, points, visible=None):
+        """
+        points:  (K, 2) int32 pixel coordinates of one face / hand / pose
+        visible: optional (K,) bool — edges touching a hidden point are skipped
+        """
+        if self.max_index >= len(points):               # e.g. iris edges on a 468-point mesh
+            return image
+        for color, thickness, edges in self.groups:
+            if visible is not None:
+                edges = edges[visible[edges].all(axis=1)]
+            if len(edges):
+                cv2.polylines(image, points[edges], False, color, thickness)
+        return image
+
+
+class PointLayer:
+    def __init__(self, spec=DEFAULT_POINT_COLOR, radius=2):
+        """spec: BGR color or a DrawingSpec (its circle_radius sets the dot size)."""
+        self.color, _ = _color_thickness(spec)
+        radius = getattr(spec, "circle_radius", radius)
+        # A zero-length line with round caps is a filled dot about `thickness` pixels across
+        self.thickness = max(2 * int(radius), 1)
+
+    def draw(self, image, points, visible=None):
+        if visible is not None:
+            points = points[visible]
+        if len(points):
+            cv2.polylines(image, np.repeat(points[:, None], 2, axis=1), False, self.color, self.thickness)
+        return image
+
+
+class MeshRenderer:
+    def __init__(self, layers, far_layers=None, lod_width=None):
+        """
+        layers:     ConnectionLayer / PointLayer list, drawn in order for every face
+        far_layers: layers for faces narrower than lod_width pixels (default: the same layers)
+        lod_width:  face width in pixels below which far_layers are used; None disables LOD
+        """
+        self.layers = list(layers)
+        self.far_layers = self.layers if far_layers is None else list(far_layers)
+        self.lod_width = lod_width
+        self.far_count = 0                              # faces drawn at the reduced level by the last draw()
+
+    def draw(self, image, pixels, visibility=None, min_visibility=0.5):
+        """
+        pixels:     (N, K, 2) or (K, 2) int32, e.g. the px returned by LandmarkArrays.update()
+        visibility: optional matching (N, K) / (K,) scores; landmarks below min_visibility are hidden
+        """
+        pixels = np.asarray(pixels)
+        if pixels.ndim == 2:
+            pixels = pixels[None]
+            visibility = None if visibility is None else np.asarray(visibility)[None]
+        height, width = image.shape[:2]
+        self.far_count = 0
+        for i, points in enumerate(pixels):
+            # Like mp_drawing, landmarks outside the image (or barely visible) take their edges with them
+            visible = (points[:, 0] >= 0) & (points[:, 0] < width) & (points[:, 1] >= 0) & (points[:, 1] < height)
+            if visibility is not None:
+                visible &= visibility[i] >= min_visibility
+            layers = self.layers
+            if self.lod_width and np.ptp(points[:, 0]) < self.lod_width:
+                layers = self.far_layers
+                self.far_count += 1
+            for layer in layers:
+                layer.draw(image, points, visible)
+        return image
+
+
+def face_mesh_renderer(mp_face_mesh, styles=None, spec=DEFAULT_COLOR, irises=False, points=None, lod_width=None):
+    """
+    Tessellation + contours (+ irises) renderer; far faces keep the contours (and irises) only.
+
+    mp_face_mesh: mp.solutions.face_mesh, or mp.solutions.holistic (same FACEMESH_* constants)
+    styles:       mp.solutions.drawing_styles for the default colored look; otherwise `spec` everywhere
+    points:       landmark DrawingSpec to draw the dots too (None = lines only)
+    """
+    contours = ConnectionLayer(mp_face_mesh.FACEMESH_CONTOURS,
+                               styles.get_default_face_mesh_contours_style() if styles else spec)
+    layers = [ConnectionLayer(mp_face_mesh.FACEMESH_TESSELATION,
+                              styles.get_default_face_mesh_tesselation_style() if styles else spec),
+              contours]
+    far_layers = [contours]
+    if irises:
+        iris = ConnectionLayer(mp_face_mesh.FACEMESH_IRISES,
+                               styles.get_default_face_mesh_iris_connections_style() if styles else spec)
+        layers.append(iris)
+        far_layers.append(iris)
+    if points is not None:
+        layers.append(PointLayer(points))
+    return MeshRenderer(layers, far_layers, lod_width)
+
+
+# ➤ Benchmark
+def _synthetic_face(count=468):
+    """Face-sized stand-in when mediapipe is not installed: an oval of points with Delaunay edges."""
+    i = np.arange(count) + 0.5
+    radius, theta = np.sqrt(i / count), i * np.pi * (3 - np.sqrt(5))     # sunflower spiral: even spacing
+    xy = np.stack([radius * np.cos(theta) * 0.8, radius * np.sin(theta)], axis=1).astype(np.float32)
+    subdiv = cv2.Subdiv2D((-2, -2, 4, 4))
+    index = {}
+    for k, point in enumerate(xy):
+        subdiv.insert((float(point[0]), float(point[1])))
+        index[(round(float(point[0]), 4), round(float(point[1]), 4))] = k
+    tessellation = set()
+    for triangle in subdiv.getTriangleList().reshape(-1, 3, 2):
+        ids = [index.get((round(float(x), 4), round(float(y), 4))) for x, y in triangle]
+        if None not in ids:                             # skip triangles on Subdiv2D's virtual outer vertices
+            tessellation |= {tuple(sorted((ids[a], ids[b]))) for a, b in ((0, 1), (1, 2), (2, 0))}
+    hull = cv2.convexHull(xy, returnPoints=False).ravel()
+    contours = {(int(a), int(b)) for a, b in zip(hull, np.roll(hull, -1))}
+    contours |= set(sorted(tessellation)[::12])         # pad to about FACEMESH_CONTOURS' size
+    return xy, tessellation, contours
+
+
+def _per_edge_draw(image, xyz, connections, color, thickness):
+    """What draw_landmarks() does per call: project each landmark, then one cv2.line() per connection."""
+    height, width = image.shape[:2]
+    pixels = {}
+    for i, (x, y, _) in enumerate(xyz.tolist()):
+        if 0 <= x <= 1 and 0 <= y <= 1:
+            pixels[i] = (min(int(x * width), width - 1), min(int(y * height), height - 1))
+    for start, end in connections:
+        if start in pixels and end in pixels:
+            cv2.line(image, pixels[start], pixels[end], color, thickness)
+
+
+def _time_per_face(draw, faces, repeat):
+    draw()                                              # warm-up
+    start = time.perf_counter()
+    for _ in range(repeat):
+        draw()
+    return (time.perf_counter() - start) * 1000 / (repeat * faces)
+
+
+def benchmark(faces=2, face_width=250, frame_size=(1280, 720), repeat=100):
+    """Prints the draw cost per face: draw_landmarks / per-edge loop vs batched vs LOD contours."""
+    width, height = frame_size
+    try:
+        import mediapipe as mp
+        from mediapipe.framework.formats import landmark_pb2
+        tessellation, contours = mp.solutions.face_mesh.FACEMESH_TESSELATION, mp.solutions.face_mesh.FACEMESH_CONTOURS
+        xy, _, _ = _synthetic_face()
+        label = "mediapipe FACEMESH_* connections"
+    except ImportError:
+        mp = None
+        xy, tessellation, contours = _synthetic_face()
+        label = "synthetic 468-point mesh (mediapipe not installed)"
+
+    # N faces side by side, face_width pixels wide, as normalized landmarks
+    xyz = np.zeros((faces, len(xy), 3), dtype=np.float32)
+    for f in range(faces):
+        center = ((f + 0.5) * width / faces, height / 2)
+        xyz[f, :, 0] = (center[0] + xy[:, 0] / 1.6 * face_width) / width
+        xyz[f, :, 1] = (center[1] + xy[:, 1] / 1.6 * face_width) / height
+    image = np.zeros((height, width, 3), dtype=np.uint8)
+    renderer = MeshRenderer([ConnectionLayer(tessellation), ConnectionLayer(contours)],
+                            far_layers=[ConnectionLayer(contours)], lod_width=face_width + 1)
+    near = MeshRenderer(renderer.layers)
+
+    def batched(mesh):
+        def draw():
+            px = (xyz[:, :, :2] * (width, height)).astype(np.int32)
+            mesh.draw(image, px)
+        return draw
+
+    def per_edge():
+        for face in xyz:
+            _per_edge_draw(image, face, tessellation, DEFAULT_COLOR, 1)
+            _per_edge_draw(image, face, contours, DEFAULT_COLOR, 1)
+
+    results = []
+    if mp is not None:
+        drawing = mp.solutions.drawing_utils
+        spec = drawing.DrawingSpec(thickness=1, circle_radius=1)
+        lists = [landmark_pb2.NormalizedLandmarkList(landmark=[landmark_pb2.NormalizedLandmark(x=x, y=y, z=z)
+                                                               for x, y, z in face.tolist()]) for face in xyz]
+
+        def draw_landmarks():
+            for landmark_list in lists:
+                drawing.draw_landmarks(image, landmark_list, tessellation, None, spec)
+                drawing.draw_landmarks(image, landmark_list, contours, None, spec)
+        results.append(("mp_drawing.draw_landmarks", _time_per_face(draw_landmarks, faces, repeat)))
+    results.append(("per-edge cv2.line loop", _time_per_face(per_edge, faces, repeat)))
+    results.append(("batched cv2.polylines", _time_per_face(batched(near), faces, repeat)))
+    results.append(("batched, LOD contours only", _time_per_face(batched(renderer), faces, repeat)))
+
+    # Same pixels as the per-edge loop?
+    reference, fast = np.zeros_like(image), np.zeros_like(image)
+    image = reference
+    per_edge()
+    image = fast
+    batched(near)()
+
+    print(f"🎨 Face mesh draw cost — {label}: {len(tessellation)} + {len(contours)} edges, "
+          f"{faces} face(s) {face_width}px wide on {width}x{height}")
+    baseline = results[0][1]
+    for name, ms in results:
+        print(f"  {name:<28} {ms:7.3f} ms/face   {baseline / ms:5.1f}x")
+    print(f"  batched output identical to the per-edge loop: {'yes' if np.array_equal(reference, fast) else 'no'}")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Draw cost per face: mp_drawing-style loop vs batched polylines")
+    parser.add_argument("--faces", type=int, default=2)
+    parser.add_argument("--width", type=int, default=250, help="face width in pixels")
+    parser.add_argument("--repeat", type=int, default=100)
+    args = parser.parse_args()
+    benchmark(args.faces, args.width, repeat=args.repeat)
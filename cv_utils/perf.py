@@ -0,0 +1,164 @@
+"""
+perf.py
+Rolling performance meter shared by the OpenCV / MediaPipe webcam scripts.
+
+Features:
+- EWMA FPS (smooth, responsive) plus rolling-window FPS over the last N frames
+- Named stage timers (capture, convert, infer, draw, display, ...) as laps or `with` blocks
+- HUD overlay: FPS line + one compact line of per-stage milliseconds
+- Optional export to CSV (one row per interval) or a Prometheus text file (.prom)
+  set with PerfMeter(export=...) or the CV_PERF_EXPORT environment variable
+
+Usage:
+    perf = PerfMeter("pose_landmarks")
+    while True:
+        ok, frame = cap.read();              perf.lap("capture")
+        results = pose.process(rgb);         perf.lap("infer")
+        perf.draw(frame)
+        cv2.imshow("Pose", frame);           perf.lap("display")
+        perf.tick()                          # end of frame
+    perf.close()                             # prints a summary, flushes the export
+"""
+import csv
+import os
+import time
+from collections import deque
+from contextlib import contextmanager
+from pathlib import Path
+
+import cv2
+
+
+class PerfMeter:
+    def __init__(self, name="app", alpha=0.1, window=120, export=None, export_every=1.0):
+        """
+        alpha:         EWMA smoothing factor (higher = reacts faster, noisier)
+        window:        frames in the rolling-window FPS
+        export:        .csv or .prom path (default: $CV_PERF_EXPORT, if set)
+        export_every:  seconds between export rows / rewrites
+        """
+        self.name = name
+        self.alpha = alpha
+        self.frame_times = deque(maxlen=window)
+        self.fps = 0.0
+        self.frames = 0
+        self.stage_ms = {}                               # EWMA per stage, insertion order = pipeline order
+        self.stage_total = {}
+        export = export or os.environ.get("CV_PERF_EXPORT")
+        self.export_path = Path(export) if export else None
+        self.export_every = export_every
+        self._csv_columns = None
+        self._last_export = time.perf_counter()
+        self._started = self._frame_start = self._lap_start = time.perf_counter()
+
+    # ➤ Stage timers
+    def _record(self, stage, ms):
+        previous = self.stage_ms.get(stage)
+        self.stage_ms[stage] = ms if previous is None else previous + self.alpha * (ms - previous)
+        self.stage_total[stage] = self.stage_total.get(stage, 0.0) + ms
+
+    def lap(self, stage):
+        """Attribute the time since the previous lap (or frame start) to `stage`."""
+        now = time.perf_counter()
+        self._record(stage, (now - self._lap_start) * 1000)
+        self._lap_start = now
+
+    @contextmanager
+    def stage(self, stage):
+        """Time a block: `with perf.stage("infer"): ...`."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            now = time.perf_counter()
+            self._record(stage, (now - start) * 1000)
+            self._lap_start = now
+
+    # ➤ Frame boundary
+    def tick(self):
+        """Mark the end of a frame: updates EWMA and rolling FPS, exports when due."""
+        now = time.perf_counter()
+        interval = now - self._frame_start
+        self._frame_start = self._lap_start = now
+        self.frames += 1
+        self.frame_times.append(now)
+        if interval > 0:
+            instant = 1.0 / interval
+            self.fps = instant if self.frames == 1 else self.fps + self.alpha * (instant - self.fps)
+        if self.export_path and now - self._last_export >= self.export_every:
+            self.export()
+            self._last_export = now
+        return self.fps
+
+    @property
+    def rolling_fps(self):
+        if len(self.frame_times) < 2:
+            return self.fps
+        return (len(self.frame_times) - 1) / (self.frame_times[-1] - self.frame_times[0])
+
+    # ➤ HUD
+    def draw(self, frame, origin=(10, 30), color=(0, 255, 0), scale=0.8, stages=True):
+        """FPS line at `origin`, per-stage milliseconds in a smaller line underneath."""
+        x, y = origin
+        cv2.putText(frame, f"FPS: {self.fps:.1f} (avg {self.rolling_fps:.1f})", (x, y),
+                    cv2.FONT_HERSHEY_SIMPLEX, scale, color, 2)
+        if stages and self.stage_ms:
+            text = " | ".join(f"{stage} {ms:.1f}" for stage, ms in self.stage_ms.items()) + " ms"
+            cv2.putText(frame, text, (x, y + int(24 * scale)), cv2.FONT_HERSHEY_SIMPLEX, 0.45 * scale / 0.8,
+                        color, 1, cv2.LINE_AA)
+        return frame
+
+    # ➤ Export / summary
+    def snapshot(self):
+        row = {"timestamp": round(time.time(), 3), "frames": self.frames,
+               "fps_ewma": round(self.fps, 2), "fps_rolling": round(self.rolling_fps, 2)}
+        row.update({f"{stage}_ms": round(ms, 3) for stage, ms in self.stage_ms.items()})
+        return row
+
+    def export(self):
+        row = self.snapshot()
+        self.export_path.parent.mkdir(parents=True, exist_ok=True)
+        if self.export_path.suffix == ".prom":
+            self._export_prometheus(row)
+            return
+        # Columns are fixed by the first row (stages have all run once by then)
+        if self._csv_columns is None:
+            self._csv_columns = list(row)
+            if not self.export_path.exists() or self.export_path.stat().st_size == 0:
+                with open(self.export_path, "w", newline="") as f:
+                    csv.DictWriter(f, self._csv_columns).writeheader()
+        with open(self.export_path, "a", newline="") as f:
+            csv.DictWriter(f, self._csv_columns, restval="", extrasaction="ignore").writerow(row)
+
+    def _export_prometheus(self, row):
+        """Node-exporter textfile format, rewritten atomically so scrapers never see half a file."""
+        label = f'app="{self.name}"'
+        lines = [
+            "# TYPE cv_fps gauge",
+            f'cv_fps{{{label},kind="ewma"}} {row["fps_ewma"]}',
+            f'cv_fps{{{label},kind="rolling"}} {row["fps_rolling"]}',
+            "# TYPE cv_frames_total counter",
+            f"cv_frames_total{{{label}}} {self.frames}",
+            "# TYPE cv_stage_milliseconds gauge",
+        ]
+        lines += [f'cv_stage_milliseconds{{{label},stage="{stage}"}} {ms:.3f}' for stage, ms in self.stage_ms.items()]
+        tmp = self.export_path.with_suffix(".prom.tmp")
+        tmp.write_text("\n".join(lines) + "\n")
+        os.replace(tmp, self.export_path)
+
+    def summary(self):
+        elapsed = time.perf_counter() - self._started
+        return {"frames": self.frames, "seconds": round(elapsed, 2),
+                "mean_fps": round(self.frames / elapsed, 2) if elapsed > 0 else 0.0,
+                "stage_mean_ms": {stage: round(total / max(self.frames, 1), 2)
+                                  for stage, total in self.stage_total.items()}}
+
+    def close(self, verbose=True):
+        """Final export plus a one-line summary of where the time went."""
+        if self.export_path:
+            self.export()
+        summary = self.summary()
+        if verbose and self.frames:
+            stages = ", ".join(f"{stage} {ms} ms" for stage, ms in summary["stage_mean_ms"].items())
+            print(f"📊 {self.name}: {summary['frames']} frames, {summary['mean_fps']} FPS avg ({stages})")
+        return summary